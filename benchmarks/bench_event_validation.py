@@ -0,0 +1,66 @@
+"""Per-event cost of the event-schema validators (common.schemas).
+
+Times valid and invalid DischargeCreated payloads and TaskCreated payloads
+through the Draft7Validator-backed ``errors`` (including the PHI-safe message
+rewrite), plus per-element filtering of a mixed Event Grid delivery. Run from
+the repo root:
+
+    python benchmarks/bench_event_validation.py --iterations 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+from common.schemas import load_event_schemas  # noqa: E402
+
+SCHEMAS_DIR = BASE_DIR / "events" / "schemas"
+CASES = {
+    "DischargeCreated valid": ("DischargeCreated", {"patientId": "P123", "encounterId": "E456", "documentId": "D789"}),
+    "DischargeCreated invalid": ("DischargeCreated", {"patientId": 123, "encounterId": "E456"}),
+    "TaskCreated valid": ("TaskCreated", {"patientId": "P123", "taskId": "T1", "category": "lab", "title": "BMP"}),
+}
+
+
+def _per_call_us(fn, payload, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(payload)
+    return 1e6 * (time.perf_counter() - started) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=1000, help="events per delivery for the batch case")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    compiled = load_event_schemas(SCHEMAS_DIR)
+    print(f"loaded {len(compiled)} schemas in {1000 * (time.perf_counter() - started):.2f} ms")
+
+    for label, (event_type, payload) in CASES.items():
+        print(f"{label:<26} {_per_call_us(compiled[event_type].errors, payload, args.iterations):6.2f} us/event")
+
+    schema = compiled["DischargeCreated"]
+    good, bad = CASES["DischargeCreated valid"][1], CASES["DischargeCreated invalid"][1]
+    delivery = [{"id": f"e{i}", "data": bad if i % 10 == 0 else good} for i in range(args.batch)]
+    rounds = max(1, args.iterations // args.batch)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        accepted = [evt for evt in delivery if not schema.errors(evt["data"], "data")]
+    elapsed = time.perf_counter() - started
+    print(
+        f"delivery of {args.batch} (10% invalid): {1e6 * elapsed / (rounds * args.batch):6.2f} us/event, "
+        f"{len(accepted)} accepted"
+    )
+
+
+if __name__ == "__main__":
+    main()
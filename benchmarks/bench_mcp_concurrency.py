@@ -0,0 +1,103 @@
+"""Concurrent MCP tool calls per replica: blocking workers vs. AsyncToolRuntime.
+
+Simulates the mcp-server tool mix (FHIR fetch, task upsert, Event Grid emit)
+with fixed network/DB latencies so the numbers reflect scheduling capacity, not
+the dependencies. Run from the repo root:
+
+    python benchmarks/bench_mcp_concurrency.py --calls 2000 --latency-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "mcp-server"))
+
+from async_runtime import AsyncToolRuntime  # noqa: E402
+
+
+class _Response:
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return {"resourceType": "DocumentReference"}
+
+
+class _LatencyClient:
+    """Async HTTP stand-in that only waits."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    async def get(self, url: str) -> _Response:
+        await asyncio.sleep(self.latency)
+        return _Response()
+
+    async def post(self, url: str, json: object, headers: dict) -> _Response:
+        await asyncio.sleep(self.latency)
+        return _Response()
+
+
+def _tool_kind(index: int) -> str:
+    return ("fetch", "upsert", "emit")[index % 3]
+
+
+def run_blocking(calls: int, workers: int, latency: float, db_latency: float) -> float:
+    def call(index: int) -> None:
+        time.sleep(db_latency if _tool_kind(index) == "upsert" else latency)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(call, range(calls)))
+    return calls / (time.perf_counter() - started)
+
+
+async def _run_async(calls: int, concurrency: int, latency: float, db_latency: float, db_workers: int) -> float:
+    runtime = AsyncToolRuntime(blocking_workers=db_workers, client=_LatencyClient(latency))
+    gate = asyncio.Semaphore(concurrency)
+
+    async def call(index: int) -> None:
+        async with gate:
+            kind = _tool_kind(index)
+            if kind == "fetch":
+                await runtime.get_json("http://fhir/DocumentReference/D789")
+            elif kind == "emit":
+                await runtime.post_json("http://eventgrid/api/events", [{}], {})
+            else:
+                await runtime.run_blocking(time.sleep, db_latency)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(calls)))
+    elapsed = time.perf_counter() - started
+    await runtime.aclose()
+    return calls / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1500)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="HTTP round trip per FHIR/Event Grid call")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="time per task upsert")
+    parser.add_argument("--sync-workers", type=int, default=8, help="blocking server worker threads")
+    parser.add_argument("--db-workers", type=int, default=8, help="AsyncToolRuntime blocking pool size")
+    parser.add_argument("--concurrency", type=int, default=500, help="in-flight async tool calls")
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    db_latency = args.db_latency_ms / 1000
+    sync_rate = run_blocking(args.calls, args.sync_workers, latency, db_latency)
+    async_rate = asyncio.run(_run_async(args.calls, args.concurrency, latency, db_latency, args.db_workers))
+
+    print(f"blocking ({args.sync_workers} workers): {sync_rate:9.1f} calls/s")
+    print(f"async ({args.concurrency} in flight, {args.db_workers} db threads): {async_rate:9.1f} calls/s")
+    print(f"speedup: {async_rate / sync_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""PHI scrubbing throughput (MB/s): compiled single pass vs. one re.sub per pattern.
+
+Builds a large discharge note from ai/samples/note1.txt with phone numbers,
+DOBs, addresses and repeated name mentions mixed into the body, then times
+``common.phi.scrub``, ``scrub_stream`` over 64 KiB chunks, and a naive
+per-pattern baseline. A second run scrubs many small notes that each carry a
+different patient name, which is the production shape: every note brings a
+name set the scanner has not seen before. Run from the repo root:
+
+    python benchmarks/bench_phi_scrub.py --megabytes 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services"))
+
+from common import phi  # noqa: E402
+
+NOTE = (Path(__file__).resolve().parent.parent / "ai" / "samples" / "note1.txt").read_text(encoding="utf-8")
+BODY_LINES = (
+    "Hospital course uncomplicated; tolerated oral diuretics and ambulated independently.\n",
+    "Echo showed EF 35%; continue guideline-directed therapy and daily weights at home.\n",
+    "Nursing called Ms. Connor at (555) 123-4567 to review the low-sodium diet.\n",
+    "DOB: 03/14/1961. Lives at 1200 Oak Tree Lane with her daughter.\n",
+    "Sarah reports no chest pain; weight stable on furosemide 40 mg daily.\n",
+    "Continue lisinopril 5 mg; recheck potassium and creatinine at the next visit.\n",
+)
+
+
+def _build_note(megabytes: float) -> str:
+    target = int(megabytes * 1024 * 1024)
+    header, body = NOTE, []
+    size = len(header)
+    index = 0
+    while size < target:
+        line = BODY_LINES[index % len(BODY_LINES)]
+        body.append(line)
+        size += len(line)
+        index += 1
+    return header + "".join(body)
+
+
+# Conventional approach: one \b-anchored re.sub per kind, then one per name.
+_NAIVE_PATTERNS = (
+    (r"(\b(?:MRN|Medical[ \t]+Record[ \t]+Number)[ \t]*[:#]?[ \t]*)[A-Za-z0-9-]*\d[A-Za-z0-9-]*", r"\1[MRN]"),
+    (r"(\b(?:DOB|Date[ \t]+of[ \t]+Birth)[ \t]*:?[ \t]*)(?:\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{2,4})", r"\1[DOB]"),
+    (r"\b\d{3}-\d{2}-\d{4}\b", "[SSN]"),
+    (r"(?<![\w-])(?:\+?1[ \t.-]?)?(?:\(\d{3}\)[ \t]?|\d{3}[ \t.-])\d{3}[ \t.-]\d{4}\b", "[PHONE]"),
+    (r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b", "[EMAIL]"),
+    (r"\b\d{1,6}(?:[ \t]+[A-Z][a-z]+){1,4}[ \t]+(?:Street|St|Avenue|Ave|Road|Rd|Lane|Ln|Drive|Dr)\b\.?", "[ADDRESS]"),
+)
+
+
+def _naive(text: str) -> str:
+    names = phi.header_names(text)
+    for pattern, replacement in _NAIVE_PATTERNS:
+        text = re.sub(pattern, replacement, text)
+    for name in names:
+        text = re.sub(rf"\b{re.escape(name)}\b", "[NAME]", text)
+    return text
+
+
+def _unique_patient_notes(count: int) -> list[str]:
+    notes = []
+    for index in range(count):
+        name = f"Pat{index:05d} Doe{index:05d}"
+        notes.append(NOTE.replace("Sarah Connor", name).replace("Sarah", name.split()[0]) + "".join(BODY_LINES))
+    return notes
+
+
+def _ms_per_note(fn, notes: list[str]) -> float:
+    started = time.perf_counter()
+    for note in notes:
+        fn(note)
+    return (time.perf_counter() - started) * 1000 / len(notes)
+
+
+def _rate(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return len(text.encode("utf-8")) / (1024 * 1024) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=4.0, help="size of the generated note")
+    parser.add_argument("--repeat", type=int, default=3, help="best-of runs per variant")
+    parser.add_argument("--patients", type=int, default=500, help="small notes with unique patient names")
+    parser.add_argument("--chunk-kib", type=int, default=64, help="chunk size for the streaming variant")
+    args = parser.parse_args()
+
+    text = _build_note(args.megabytes)
+    chunk = args.chunk_kib * 1024
+
+    def stream(note: str) -> str:
+        return "".join(phi.scrub_stream(note[i : i + chunk] for i in range(0, len(note), chunk)))
+
+    print(f"note: {len(text) / (1024 * 1024):.1f} MiB")
+    for label, fn in (("compiled", phi.scrub), (f"stream ({args.chunk_kib} KiB)", stream), ("per-pattern", _naive)):
+        print(f"{label:>18}: {_rate(fn, text, args.repeat):8.1f} MB/s")
+
+    notes = _unique_patient_notes(args.patients)
+    print(f"{args.patients} notes, unique patient names")
+    for label, fn in (("compiled", phi.scrub), ("per-pattern", _naive)):
+        print(f"{label:>18}: {_ms_per_note(fn, notes):8.3f} ms/note")
+
+
+if __name__ == "__main__":
+    main()
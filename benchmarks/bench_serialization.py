@@ -0,0 +1,86 @@
+"""Encode/decode throughput of each available JSON backend on hot-path payloads.
+
+Covers a tasks-api task list and a DocumentReference with a base64 note, which
+is what mcp_call decodes for every event. Run from the repo root:
+
+    python benchmarks/bench_serialization.py --tasks 200 --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services"))
+
+from common import serialization  # noqa: E402
+
+NOTE = (Path(__file__).resolve().parent.parent / "ai" / "samples" / "note1.txt").read_text(encoding="utf-8")
+
+
+def _task_list(count: int) -> list[dict]:
+    return [
+        {
+            "taskId": f"T{index:010d}",
+            "patientId": "P123",
+            "category": "lab",
+            "title": "Order basic metabolic panel to monitor renal function and potassium",
+            "dueDate": "2024-02-15",
+            "priority": "normal",
+            "status": "open",
+            "sourceEncounterId": "E456",
+            "createdUtc": "2024-02-12T10:00:00+00:00",
+            "updatedUtc": "2024-02-12T10:00:00+00:00",
+        }
+        for index in range(count)
+    ]
+
+
+def _document() -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": "1",
+        "result": {
+            "resourceType": "DocumentReference",
+            "id": "D789",
+            "description": "Synthetic discharge summary",
+            "content": [
+                {"attachment": {"contentType": "text/plain", "data": base64.b64encode(NOTE.encode()).decode()}}
+            ],
+        },
+    }
+
+
+def _backends() -> list[str]:
+    names = ["json"]
+    if serialization.orjson is not None:
+        names.append("orjson")
+    return names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    payloads = {"task list": _task_list(args.tasks), "DocumentReference": _document()}
+    print(f"{'backend':<8} {'payload':<18} {'encode/s':>12} {'decode/s':>12} {'MB/s dec':>9}")
+    for name in _backends():
+        codec = serialization.select_codec(name)
+        for label, payload in payloads.items():
+            encoded = codec.dumps(payload)
+            encode_s = timeit.timeit(lambda: codec.dumps(payload), number=args.iterations)
+            decode_s = timeit.timeit(lambda: codec.loads(encoded), number=args.iterations)
+            mb_per_s = len(encoded) * args.iterations / decode_s / 1e6
+            print(
+                f"{name:<8} {label:<18} {args.iterations / encode_s:>12.0f} "
+                f"{args.iterations / decode_s:>12.0f} {mb_per_s:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Cold-start cost per service: ``import app`` time, first-request latency and heaviest imports.
+
+Each run is a fresh interpreter (as after a Container Apps scale-from-zero)
+with SQLite/stub configuration in a temp directory, so nothing external is
+contacted. Services whose dependencies are not installed are reported as
+skipped. Run from the repo root:
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent / "services"
+
+# First request per service, run right after ``import app``.
+FIRST_REQUEST = {
+    "mcp-server": "app.get_task_store().upsert({'patientId': 'P1', 'title': 'BMP'})",
+    "fhir-listener": (
+        "app.app.test_client().post('/events', json=[{'id': 'v1', "
+        "'eventType': 'Microsoft.EventGrid.SubscriptionValidationEvent', 'data': {'validationCode': 'c'}}])"
+    ),
+    "tasks-api": "app.app.test_client().get('/patients/P1/tasks')",
+    "copilot": "app.app.test_client().get('/healthz')",
+}
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+{request}
+finished = time.perf_counter()
+print(json.dumps({{"import_ms": 1000 * (imported - started), "first_request_ms": 1000 * (finished - imported)}}))
+"""
+
+
+def _env(tmp: str, service: str) -> dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "PYTHONPATH": os.pathsep.join([str(SERVICES_DIR / service), str(SERVICES_DIR)]),
+            "TASK_DB_PATH": str(Path(tmp) / "tasks.db"),
+            "EVENT_STORE_PATH": str(Path(tmp) / "listener.db"),
+            "TASK_DB_MODE": "sqlite",
+            "LLM_BACKEND": "stub",
+            "LLM_ALLOW_STUB": "true",
+        }
+    )
+    return env
+
+
+def _run_once(service: str, tmp: str) -> tuple[dict | None, str]:
+    probe = _PROBE.format(request=FIRST_REQUEST[service])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=SERVICES_DIR / service,
+        env=_env(tmp, service),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        missing = [line for line in result.stderr.splitlines() if "Error" in line]
+        return None, missing[-1] if missing else result.stderr.strip()[-200:]
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def _heaviest_imports(importtime: str, limit: int) -> list[tuple[str, float]]:
+    top_level = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("   ") and not name.startswith("    "):  # modules imported directly by app
+            top_level.append((name.strip(), int(cumulative) / 1000))
+    return sorted(top_level, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per service (median reported)")
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports to list")
+    parser.add_argument("services", nargs="*", default=list(FIRST_REQUEST))
+    args = parser.parse_args()
+
+    for service in args.services:
+        samples, importtime = [], ""
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as tmp:
+                sample, importtime = _run_once(service, tmp)
+            if sample is None:
+                print(f"{service:>14}: skipped ({importtime})")
+                break
+            samples.append(sample)
+        if not samples:
+            continue
+        import_ms = statistics.median(s["import_ms"] for s in samples)
+        request_ms = statistics.median(s["first_request_ms"] for s in samples)
+        print(f"{service:>14}: import {import_ms:7.1f} ms   first request {request_ms:7.1f} ms")
+        for name, ms in _heaviest_imports(importtime, args.top):
+            print(f"{'':>16}{name:<32}{ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
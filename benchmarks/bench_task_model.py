@@ -0,0 +1,146 @@
+"""Allocations and time per task upsert/listing: legacy dict round-trips vs. the Task model.
+
+"Before" reproduces the previous code paths (``_normalize_task`` dict, then
+positional tuples; ``sqlite3.Row`` then ``_row_to_dict``) so both sides can be
+measured in one process. Run from the repo root:
+
+    python benchmarks/bench_task_model.py --count 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services"))
+
+from common.task_model import TASK_SELECT_COLUMNS, Task, rows_to_json  # noqa: E402
+
+TASK_JSON = {
+    "patientId": "P123",
+    "category": "lab",
+    "title": "Order basic metabolic panel to monitor renal function and potassium",
+    "dueDate": "2024-02-15",
+    "priority": "normal",
+    "sourceEncounterId": "E456",
+}
+
+
+def _legacy_normalize(task_json: dict[str, Any]) -> dict[str, Any]:
+    patient_id = task_json.get("patientId") or task_json.get("patient_id")
+    category = (task_json.get("category") or "other").lower()
+    title = task_json.get("title")
+    due_date = task_json.get("dueDate") or task_json.get("due_date")
+    priority = (task_json.get("priority") or "normal").lower()
+    source_encounter = task_json.get("sourceEncounterId") or task_json.get("source_encounter_id")
+    task_id = task_json.get("taskId") or task_json.get("task_id") or f"T{uuid4().hex[:10]}"
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "task_id": task_id,
+        "patient_id": patient_id,
+        "category": category,
+        "title": title,
+        "due_date": due_date,
+        "priority": priority,
+        "source_encounter_id": source_encounter,
+        "timestamp": now,
+    }
+
+
+def upsert_before(task_json: dict[str, Any]) -> tuple:
+    payload = _legacy_normalize(task_json)
+    return (
+        payload["task_id"],
+        payload["patient_id"],
+        payload["category"],
+        payload["title"],
+        payload["due_date"],
+        payload["priority"],
+        payload["source_encounter_id"],
+        payload["timestamp"],
+        payload["timestamp"],
+    )
+
+
+def upsert_after(task_json: dict[str, Any]) -> tuple:
+    return Task.from_json(task_json).upsert_params()
+
+
+def _legacy_row_to_dict(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "taskId": row["task_id"],
+        "patientId": row["patient_id"],
+        "category": row["category"],
+        "title": row["title"],
+        "dueDate": row["due_date"],
+        "priority": row["priority"],
+        "status": row["status"],
+        "sourceEncounterId": row["source_encounter_id"],
+        "createdUtc": row["created_utc"],
+        "updatedUtc": row["updated_utc"],
+    }
+
+
+def _seed(count: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute(f"create table care_tasks ({', '.join(c + ' text' for c in TASK_SELECT_COLUMNS.split(', '))})")
+    conn.executemany(
+        f"insert into care_tasks({TASK_SELECT_COLUMNS}) values ({', '.join('?' * 10)})",
+        [(f"T{i}", "P123", "lab", TASK_JSON["title"], "2024-02-15", "normal", "open", "E456", "x", "x") for i in range(count)],
+    )
+    return conn
+
+
+def list_before(conn: sqlite3.Connection) -> list:
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("select * from care_tasks").fetchall()
+    return [_legacy_row_to_dict(row) for row in rows]
+
+
+def list_after(conn: sqlite3.Connection) -> list:
+    conn.row_factory = None
+    rows = conn.execute(f"select {TASK_SELECT_COLUMNS} from care_tasks").fetchall()
+    return rows_to_json(rows)
+
+
+def _measure(fn: Callable[[], Any], units: int) -> tuple[float, float, float]:
+    """Return (allocated bytes/unit at peak, retained bytes/unit, microseconds/unit)."""
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    return (peak - baseline) / units, (current - baseline) / units, elapsed / units * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    conn = _seed(args.count)
+    cases = {
+        "upsert params (before)": lambda: [upsert_before(TASK_JSON) for _ in range(args.count)],
+        "upsert params (after)": lambda: [upsert_after(TASK_JSON) for _ in range(args.count)],
+        "list tasks (before)": lambda: list_before(conn),
+        "list tasks (after)": lambda: list_after(conn),
+    }
+    print(f"{'case':<24} {'peak B/op':>10} {'kept B/op':>10} {'us/op':>8}")
+    for label, fn in cases.items():
+        peak, kept, micros = _measure(fn, args.count)
+        print(f"{label:<24} {peak:>10.0f} {kept:>10.0f} {micros:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
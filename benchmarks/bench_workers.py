@@ -0,0 +1,145 @@
+"""Throughput of the tasks-api production server as worker processes are added.
+
+Seeds a temporary SQLite task database, starts ``python app.py`` (gunicorn
+via ``common.server``) once per ``--workers`` value, drives
+``GET /patients/<id>/tasks`` from client threads over keep-alive
+connections, then sends SIGTERM and reports how long the drain took. Needs
+flask and gunicorn installed. Run from the repo root:
+
+    python benchmarks/bench_workers.py --workers 1 2 4 --seconds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import importlib.util
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent / "services"
+sys.path.insert(0, str(SERVICES_DIR))
+
+from common.task_store import SqliteTaskStore  # noqa: E402
+
+
+def _seed(path: str, patients: int, tasks_per_patient: int) -> None:
+    store = SqliteTaskStore(path, audit_async=False)
+    for patient in range(patients):
+        for index in range(tasks_per_patient):
+            store.upsert(
+                {
+                    "patientId": f"P{patient}",
+                    "title": f"Follow-up {index}",
+                    "category": "lab",
+                    "dueDate": f"2024-03-{1 + index % 28:02d}",
+                }
+            )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/healthz")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not become ready")
+
+
+def _drive(port: int, clients: int, seconds: float, patients: int) -> int:
+    done = [0] * clients
+    stop = time.monotonic() + seconds
+
+    def client(slot: int) -> None:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        patient = slot
+        while time.monotonic() < stop:
+            conn.request("GET", f"/patients/P{patient % patients}/tasks")
+            response = conn.getresponse()
+            response.read()
+            done[slot] += 1
+            patient += clients
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(done)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=4, help="WEB_THREADS per worker")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--tasks-per-patient", type=int, default=20)
+    args = parser.parse_args()
+
+    missing = [name for name in ("flask", "gunicorn") if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"skipped: {', '.join(missing)} not installed")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "tasks.db")
+        _seed(db_path, args.patients, args.tasks_per_patient)
+        baseline = None
+        for workers in args.workers:
+            port = _free_port()
+            env = dict(os.environ)
+            env.update(
+                {
+                    "PYTHONPATH": str(SERVICES_DIR),
+                    "TASK_DB_PATH": db_path,
+                    "PORT": str(port),
+                    "WEB_CONCURRENCY": str(workers),
+                    "WEB_THREADS": str(args.threads),
+                }
+            )
+            server = subprocess.Popen(
+                [sys.executable, "app.py"],
+                cwd=SERVICES_DIR / "tasks-api",
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                _wait_ready(port)
+                requests = _drive(port, args.clients, args.seconds, args.patients)
+            finally:
+                stopping = time.perf_counter()
+                server.send_signal(signal.SIGTERM)
+                server.wait(timeout=60)
+                drain_ms = 1000 * (time.perf_counter() - stopping)
+            rate = requests / args.seconds
+            baseline = baseline or rate
+            print(
+                f"workers={workers:>2} threads={args.threads:>2}: {rate:9.0f} req/s "
+                f"({rate / baseline:4.2f}x)   SIGTERM drain {drain_ms:6.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
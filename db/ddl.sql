@@ -17,18 +17,63 @@ create table care_tasks (
   source_encounter_id varchar(64),
   status varchar(16) not null default 'open' check (status in ('open','done','cancelled')),
   created_utc datetime2 not null default sysutcdatetime(),
-  updated_utc datetime2 not null default sysutcdatetime()
+  updated_utc datetime2 not null default sysutcdatetime(),
+  -- bumped on every write; status PATCHes compare-and-swap on it
+  version int not null default 1
 );
 create index ix_care_tasks_patient_open on care_tasks(patient_id, status);
 
+-- task_audit is partitioned by month on timestamp_utc, starting at the month the
+-- schema is created. mcp-server's audit rollover job (services/mcp-server/audit_rollover.py)
+-- splits off the next month ahead of time via SQL_EXTEND_AUDIT_PARTITIONS.
+declare @audit_month datetime2 = datefromparts(year(sysutcdatetime()), month(sysutcdatetime()), 1);
+declare @audit_next datetime2 = dateadd(month, 1, @audit_month);
+create partition function pf_task_audit_monthly (datetime2)
+  as range right for values (@audit_month, @audit_next);
+create partition scheme ps_task_audit_monthly
+  as partition pf_task_audit_monthly all to ([primary]);
+
 create table task_audit (
-  audit_id bigint identity primary key,
+  audit_id bigint identity not null,
   task_id varchar(64) not null references care_tasks(task_id),
   action varchar(32) not null,
   actor varchar(128) not null,
   timestamp_utc datetime2 not null default sysutcdatetime(),
-  payload_json nvarchar(max)
+  payload_json nvarchar(max),
+  constraint pk_task_audit primary key clustered (timestamp_utc, audit_id)
+) on ps_task_audit_monthly(timestamp_utc);
+create index ix_task_audit_task_ts on task_audit(task_id, timestamp_utc);
+
+create table task_changes (
+  seq bigint identity primary key,
+  task_id varchar(64) not null,
+  patient_id varchar(64) not null,
+  action varchar(32) not null,
+  changed_utc datetime2 not null default sysutcdatetime()
+);
+create index ix_task_changes_patient_seq on task_changes(patient_id, seq);
+
+-- Maintained incrementally by task upserts/status changes; due_date is '' when unset.
+create table patient_task_summary (
+  patient_id varchar(64) not null,
+  category varchar(32) not null,
+  status varchar(16) not null,
+  due_date varchar(10) not null,
+  task_count int not null,
+  constraint pk_patient_task_summary primary key (patient_id, category, status, due_date)
+);
+
+-- Written in the same transaction as the task upsert; mcp-server's relay publishes and marks rows sent.
+create table task_outbox (
+  outbox_id bigint identity primary key,
+  event_id varchar(64) not null unique,
+  event_type varchar(64) not null,
+  subject varchar(256) not null,
+  data_json nvarchar(max) not null,
+  created_utc datetime2 not null default sysutcdatetime(),
+  sent_utc datetime2 null
 );
+create index ix_task_outbox_pending on task_outbox(outbox_id) where sent_utc is null;
 
 create table processed_events (
   event_id varchar(128) primary key,
@@ -36,3 +81,14 @@ create table processed_events (
   patient_id varchar(64) null,
   processed_utc datetime2 not null default sysutcdatetime()
 );
+
+create table dead_letter_events (
+  event_id varchar(128) primary key,
+  event_type varchar(64) not null,
+  patient_id varchar(64) null,
+  payload_json nvarchar(max) not null,
+  failure_reason nvarchar(500) not null,
+  attempts int not null,
+  first_failed_utc datetime2 not null default sysutcdatetime(),
+  last_failed_utc datetime2 not null default sysutcdatetime()
+);
@@ -0,0 +1 @@
+"""Modules shared by the discharge services; copied into each image as ``common``."""
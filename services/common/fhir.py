@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import base64
+from typing import Any
+
+
+def decode_document_text(document: dict[str, Any]) -> str:
+    """Text of the first base64 attachment of a DocumentReference that decodes as UTF-8, else ""."""
+    contents = document.get("content", []) if isinstance(document, dict) else []
+    for entry in contents:
+        attachment = entry.get("attachment") if isinstance(entry, dict) else None
+        data = attachment.get("data") if isinstance(attachment, dict) else None
+        if not data:
+            continue
+        try:
+            decoded = base64.b64decode(data).decode("utf-8")
+            if decoded:
+                return decoded
+        except Exception:
+            continue
+    return ""
+
+
+__all__ = ["decode_document_text"]
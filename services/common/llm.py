@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Optional, Protocol
+
+from common.serialization import dumps_str, loads
+
+FOLLOWUP_CATEGORIES = ("lab", "med", "visit", "other")
+FOLLOWUP_PRIORITIES = ("low", "normal", "high")
+FOLLOWUP_KEYS = frozenset({"category", "title", "dueDate", "priority"})
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class LlmBackend(Protocol):
+    """Chat-completion backend: one system prompt, one user message, text back."""
+
+    name: str
+
+    def complete(self, system: str, user: str) -> str: ...
+
+
+class LlmOutputError(ValueError):
+    """The model returned something that does not satisfy the expected schema."""
+
+
+def prompts_dir() -> Path:
+    """``PROMPTS_DIR`` if set, else ``prompts/`` next to the service (containers), else the repo's ai/prompts."""
+    configured = os.environ.get("PROMPTS_DIR")
+    if configured:
+        return Path(configured)
+    here = Path(__file__).resolve().parent
+    for candidate in (here.parent / "prompts", here.parent.parent / "ai" / "prompts"):
+        if candidate.is_dir():
+            return candidate
+    return here.parent / "prompts"
+
+
+def load_prompt(name: str, directory: Path | None = None) -> str:
+    return ((directory or prompts_dir()) / f"{name}.md").read_text(encoding="utf-8").strip()
+
+
+def prompt_hash(*parts: str) -> str:
+    """Stable short hash of everything that shapes a completion (model name, prompts)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def validate_followups(payload: Any) -> list[str]:
+    """Check a ``{"followUps": [...]}`` payload against the golden extraction schema; returns errors."""
+    if not isinstance(payload, dict):
+        return [f"payload must be an object, got {type(payload).__name__}"]
+    followups = payload.get("followUps")
+    if not isinstance(followups, list):
+        return ["followUps must be a list"]
+    errors = []
+    for index, item in enumerate(followups):
+        if not isinstance(item, dict):
+            errors.append(f"followUps[{index}] must be an object")
+            continue
+        extra = set(item) - FOLLOWUP_KEYS
+        if extra:
+            errors.append(f"followUps[{index}] has unexpected keys: {sorted(extra)}")
+        if item.get("category") not in FOLLOWUP_CATEGORIES:
+            errors.append(f"followUps[{index}].category is invalid")
+        if item.get("priority") not in FOLLOWUP_PRIORITIES:
+            errors.append(f"followUps[{index}].priority is invalid")
+        if not isinstance(item.get("title"), str) or not item["title"].strip():
+            errors.append(f"followUps[{index}].title is required")
+        due = item.get("dueDate")
+        if due is not None and not (isinstance(due, str) and _DATE.match(due)):
+            errors.append(f"followUps[{index}].dueDate must be YYYY-MM-DD or null")
+    return errors
+
+
+def parse_followups(completion: str) -> list[dict[str, Any]]:
+    """Decode and validate an extraction completion; raises LlmOutputError on any schema violation."""
+    text = completion.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        payload = loads(text)
+    except Exception as exc:
+        raise LlmOutputError(f"completion is not JSON: {exc}") from exc
+    errors = validate_followups(payload)
+    if errors:
+        raise LlmOutputError("; ".join(errors))
+    return payload["followUps"]
+
+
+BATCH_NOTE_MARKER = "### NOTE "
+BATCH_INSTRUCTIONS = (
+    "Several discharge notes follow, each starting with a line '### NOTE <id>'. "
+    'Return only {"results": {"<id>": {"followUps": [...]}}} with one entry per note id.'
+)
+
+
+def format_batch(notes: dict[str, str]) -> str:
+    """User message carrying several notes for one extraction request."""
+    return "\n".join(f"{BATCH_NOTE_MARKER}{note_id}\n{text.strip()}\n" for note_id, text in notes.items())
+
+
+def parse_batch(completion: str, note_ids: list[str]) -> dict[str, list[dict[str, Any]] | LlmOutputError]:
+    """Split a batched extraction into per-note follow-ups; a bad entry only fails its own note."""
+    try:
+        results = loads(completion.strip())["results"]
+        if not isinstance(results, dict):
+            raise TypeError("results must be an object")
+    except Exception as exc:
+        error = LlmOutputError(f"batch completion is not a results object: {exc}")
+        return {note_id: error for note_id in note_ids}
+    parsed: dict[str, list[dict[str, Any]] | LlmOutputError] = {}
+    for note_id in note_ids:
+        errors = validate_followups(results.get(note_id))
+        parsed[note_id] = LlmOutputError("; ".join(errors)) if errors else results[note_id]["followUps"]
+    return parsed
+
+
+_STUB_ITEM = re.compile(r"^\s*\d+\.\s*(?:([A-Za-z][A-Za-z ]*):)?\s*(.+)$", re.MULTILINE)
+_STUB_KINDS = (("lab", "lab"), ("visit", "visit"), ("appointment", "visit"), ("med", "med"))
+
+
+class StubLlmBackend:
+    """Deterministic local model for tests and offline runs.
+
+    Extraction prompts (those mentioning ``followUps``) get JSON built from
+    the note's numbered instruction lines, per note when the message is a
+    ``format_batch`` batch; anything else gets a bullet summary of
+    the note's labelled lines. ``latency`` simulates model time and ``calls``
+    counts completions so tests can assert on caching and coalescing.
+    """
+
+    name = "stub"
+
+    def __init__(self, *, latency: float = 0.0, responder: Optional[Callable[[str, str], str]] = None) -> None:
+        self.latency = latency
+        self.calls = 0
+        self._responder = responder
+        self._lock = Lock()
+
+    def complete(self, system: str, user: str) -> str:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self._responder is not None:
+            return self._responder(system, user)
+        if "followUps" in system and BATCH_NOTE_MARKER in user:
+            notes = user.split(BATCH_NOTE_MARKER)[1:]
+            results = {}
+            for note in notes:
+                note_id, _, text = note.partition("\n")
+                results[note_id.strip()] = {"followUps": self._followups(text)}
+            return dumps_str({"results": results})
+        if "followUps" in system:
+            return dumps_str({"followUps": self._followups(user)})
+        lines = [line.strip() for line in user.splitlines() if ":" in line and not line.lstrip()[:1].isdigit()]
+        return "\n".join(f"- {line}" for line in lines[:10])
+
+    @staticmethod
+    def _followups(note: str) -> list[dict[str, Any]]:
+        discharged = re.search(r"Discharge Date:\s*(\d{4}-\d{2}-\d{2})", note)
+        base = datetime.strptime(discharged.group(1), "%Y-%m-%d") if discharged else None
+        followups = []
+        for label, text in _STUB_ITEM.findall(note):
+            lowered = label.lower()
+            category = next((kind for prefix, kind in _STUB_KINDS if lowered.startswith(prefix)), "other")
+            due = None
+            offset = re.search(r"(\d+)\s+(day|hour|week)", text, re.IGNORECASE)
+            if base and offset:
+                unit = offset.group(2).lower()
+                days = int(offset.group(1)) * {"day": 1, "hour": 1 / 24, "week": 7}[unit]
+                due = (base + timedelta(days=days)).strftime("%Y-%m-%d")
+            title = text.split(".")[0].strip()
+            followups.append({"category": category, "title": title, "dueDate": due, "priority": "normal"})
+        return followups
+
+
+class AzureOpenAIBackend:
+    """Azure OpenAI chat completions over REST, authenticated by API key or Managed Identity."""
+
+    scope = "https://cognitiveservices.azure.com/.default"
+
+    def __init__(
+        self,
+        *,
+        endpoint: str,
+        deployment: str,
+        api_version: str = "2024-06-01",
+        api_key: Optional[str] = None,
+        managed_identity_client_id: Optional[str] = None,
+        timeout: float = 60.0,
+    ) -> None:
+        self.name = f"azure-openai:{deployment}"
+        self._url = (
+            f"{endpoint.rstrip('/')}/openai/deployments/{deployment}/chat/completions?api-version={api_version}"
+        )
+        self._api_key = api_key
+        self._client_id = managed_identity_client_id
+        self._timeout = timeout
+        self._credential: Any = None
+        self._session: Any = None
+
+    def _headers(self) -> dict[str, str]:
+        if self._api_key:
+            return {"api-key": self._api_key, "Content-Type": "application/json"}
+        if self._credential is None:
+            from azure.identity import DefaultAzureCredential
+
+            self._credential = DefaultAzureCredential(
+                managed_identity_client_id=self._client_id,
+                exclude_interactive_browser_credential=True,
+            )
+        token = self._credential.get_token(self.scope).token
+        return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+    def complete(self, system: str, user: str) -> str:
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        body = {
+            "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
+            "temperature": 0,
+        }
+        response = self._session.post(self._url, data=dumps_str(body), headers=self._headers(), timeout=self._timeout)
+        response.raise_for_status()
+        return loads(response.content)["choices"][0]["message"]["content"] or ""
+
+
+def create_llm_backend(mode: str | None = None, *, allow_stub: bool | None = None) -> LlmBackend:
+    """Build the backend named by ``mode`` or ``LLM_BACKEND`` (``azure-openai``, or ``stub`` for local runs).
+
+    There is no default backend, and the stub fabricates follow-ups, so it is
+    refused unless ``allow_stub`` (or ``LLM_ALLOW_STUB=true``) says this is a
+    test or local run.
+    """
+    resolved = (mode or os.environ.get("LLM_BACKEND", "")).lower()
+    if not resolved:
+        raise ValueError("LLM_BACKEND is not set")
+    if resolved == "stub":
+        if allow_stub is None:
+            allow_stub = os.environ.get("LLM_ALLOW_STUB", "false").lower() == "true"
+        if not allow_stub:
+            raise ValueError("LLM_BACKEND=stub is for tests and local runs; set LLM_ALLOW_STUB=true to use it")
+        return StubLlmBackend()
+    if resolved in {"azure-openai", "aoai"}:
+        endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
+        deployment = os.environ.get("AZURE_OPENAI_DEPLOYMENT")
+        if not endpoint or not deployment:
+            raise ValueError("AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_DEPLOYMENT are required for azure-openai")
+        return AzureOpenAIBackend(
+            endpoint=endpoint,
+            deployment=deployment,
+            api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2024-06-01"),
+            api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
+            managed_identity_client_id=os.environ.get("AZURE_CLIENT_ID"),
+        )
+    raise ValueError(f"Unsupported LLM_BACKEND: {resolved}")
+
+
+__all__ = [
+    "AzureOpenAIBackend",
+    "BATCH_INSTRUCTIONS",
+    "BATCH_NOTE_MARKER",
+    "FOLLOWUP_CATEGORIES",
+    "FOLLOWUP_PRIORITIES",
+    "LlmBackend",
+    "LlmOutputError",
+    "StubLlmBackend",
+    "create_llm_backend",
+    "format_batch",
+    "load_prompt",
+    "parse_batch",
+    "parse_followups",
+    "prompt_hash",
+    "prompts_dir",
+    "validate_followups",
+]
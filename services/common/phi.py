@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Iterable, Iterator
+
+# Every top-level branch of the scrubbing pattern starts with a literal
+# character, which lets the ``re`` engine jump between candidate characters in
+# C instead of trying every alternative at every offset (~10x faster on notes).
+# Word-boundary checks therefore sit in a lookbehind after that first literal.
+# Patterns never match across a newline, which is what lets the streaming mode
+# cut chunks at line boundaries.
+
+# Labelled kinds are (kind, first char, rest of label, value); the label is kept
+# in the output ("MRN: [MRN]") so notes stay readable. Labels match in any case
+# ("mrn: 12345"): each gets an upper- and a lower-case branch so both still
+# start with a literal, and the rest of the label is case-insensitive.
+_DATE = (
+    r"(?:\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{2,4}|[A-Z][a-z]{2,8}\.?[ \t]+\d{1,2},?[ \t]+\d{4}"
+    r"|\d{1,2}[ \t]+[A-Z][a-z]{2,8}\.?,?[ \t]+\d{4})"
+)
+_HONORIFIC = r"(?:Dr|Mrs|Mr|Ms)\.?[ \t]+"
+_NAME_PARTS = r"[A-Z][A-Za-z'-]+(?:[ \t]+[A-Z][A-Za-z'.-]*){0,3}"
+_NAME = f"(?:{_HONORIFIC})?{_NAME_PARTS}"
+# "St"/"Dr" double as honorifics ("2 Weeks With Dr. Patel"), so they only end
+# an address when no capitalised name follows them.
+_STREET = (
+    r"(?:(?:Street|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Court|Ct|Way|Place|Pl|Circle|Cir)\b\.?"
+    r"|(?:St|Dr)\b(?!\.?[ \t]+[A-Z])\.?)"
+)
+_LABELS = (
+    ("mrn", "M", r"(?:RN|edical[ \t]+Record[ \t]+(?:Number|No\.?))[ \t]*[:#]?[ \t]*", r"[A-Za-z0-9-]*\d[A-Za-z0-9-]*"),
+    ("dob", "D", r"(?:OB|\.O\.B\.|ate[ \t]+of[ \t]+Birth)[ \t]*:?[ \t]*", _DATE),
+    ("dob", "B", r"(?:orn(?:[ \t]+on)?[ \t]+|irth[ \t]*date[ \t]*:?[ \t]*)", _DATE),
+    ("name", "P", r"atient(?:[ \t]+Name)?[ \t]*:[ \t]*", _NAME),
+    ("name", "N", r"ame[ \t]*:[ \t]*", _NAME),
+)
+# Digit-led kinds share one branch per leading digit; SSN before phone so
+# 123-45-6789 is not read as a partial phone number.
+_DIGIT_LED = (
+    ("ssn", r"\d{2}-\d{2}-\d{4}\b"),
+    ("phone", r"\d{2}[ \t.-]\d{3}[ \t.-]\d{4}\b"),
+    ("phone", r"\d{9}\b"),  # ten digits, no separators
+    ("address", r"\d{0,4}(?:[ \t]+[A-Z][a-z]+){1,4}[ \t]+" + _STREET),  # 1-5 digit house number
+)
+_COUNTRY_CODE_PHONE = r"(?:[ \t.-]?(?:\(\d{3}\)[ \t]?|\d{3}[ \t.-])\d{3}[ \t.-]\d{4}|\d{10})\b"  # after a leading "1"
+_PUNCT_LED = (
+    ("phone", "(", r"\d{3}\)[ \t]?\d{3}[ \t.-]\d{4}\b"),
+    ("phone", "+", r"1[ \t.-]?(?:\(\d{3}\)[ \t]?|\d{3}[ \t.-])\d{3}[ \t.-]\d{4}\b"),
+)
+# Emails cannot start with a fixed character, so they are a separate pass that
+# only runs when the text contains "@" (a C-level substring check).
+_EMAIL = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+_HEADER_NAME = re.compile(
+    r"^[ \t]*(?i:Patient(?:[ \t]+Name)?|Name)[ \t]*:[ \t]*(?:" + _HONORIFIC + ")?(" + _NAME_PARTS + ")", re.MULTILINE
+)
+
+# Names are only harvested from the note header. The static patterns are
+# compiled once; each patient's name tokens get their own small alternation, so
+# a new patient costs one tiny compile instead of rebuilding the whole scanner.
+HEADER_SCAN_CHARS = 2048
+
+
+class _Scanner:
+    """The static pattern plus, per capturing group, its kind and whether the match carries a label."""
+
+    def __init__(self) -> None:
+        self.kinds: list[tuple[str, bool]] = [("", False)]  # group 0
+        branches = []
+        for kind, first, label, value in _LABELS:
+            for case in (first.upper(), first.lower()):
+                branches.append(f"{case}(?<!\\w{case})(?i:{label}){self._group(kind, value, True)}")
+        for digit in "0123456789":
+            rests = [self._group(kind, rest) for kind, rest in _DIGIT_LED]
+            if digit == "1":
+                rests.append(self._group("phone", _COUNTRY_CODE_PHONE))
+            branches.append(f"{digit}(?<![\\w.-]{digit})(?:{'|'.join(rests)})")
+        for kind, first, rest in _PUNCT_LED:
+            branches.append(f"\\{first}(?<![\\w]\\{first}){self._group(kind, rest)}")
+        self.pattern = re.compile("|".join(branches))
+
+    def _group(self, kind: str, body: str, labelled: bool = False) -> str:
+        self.kinds.append((kind, labelled))
+        return f"({body})"
+
+    def replace(self, match: re.Match[str]) -> str:
+        index = match.lastindex or 0
+        kind, labelled = self.kinds[index]
+        token = f"[{kind.upper()}]"
+        if labelled:
+            return match.string[match.start() : match.start(index)] + token
+        return token
+
+    def sub(self, text: str, names: re.Pattern[str] | None = None) -> str:
+        text = self.pattern.sub(self.replace, text)
+        if names is not None:
+            text = names.sub("[NAME]", text)
+        return _EMAIL.sub("[EMAIL]", text) if "@" in text else text
+
+
+_SCANNER = _Scanner()
+
+
+@lru_cache(maxsize=256)
+def _names_pattern(names: tuple[str, ...]) -> re.Pattern[str] | None:
+    """One alternation of the escaped names, longest first so a full name wins over its parts.
+
+    Like the static branches, each branch leads with its literal first letter
+    so the engine can skip ahead instead of testing a lookbehind everywhere.
+    """
+    if not names:
+        return None
+    by_first: dict[str, list[str]] = {}
+    for name in sorted(set(names), key=lambda name: (-len(name), name)):
+        by_first.setdefault(name[0], []).append(re.escape(name[1:]))
+    branches = []
+    for first, rests in by_first.items():
+        first = re.escape(first)
+        branches.append(f"{first}(?<!\\w{first})(?:{'|'.join(rests)})\\b")
+    return re.compile("|".join(branches))
+
+
+def header_names(text: str) -> tuple[str, ...]:
+    """Patient name variants from ``Patient:``/``Name:`` header lines: full name first, then each part."""
+    variants: set[str] = set()
+    for match in _HEADER_NAME.finditer(text, 0, HEADER_SCAN_CHARS):
+        full = match.group(1).strip()
+        variants.add(full)
+        variants.update(part for part in full.split() if len(part.rstrip(".")) > 1)
+    return tuple(sorted(variants, key=lambda name: (-len(name), name)))
+
+
+def scrub(text: str, *, names: Iterable[str] | None = None) -> str:
+    """Replace MRNs, DOBs, header names, SSNs, phone numbers, emails and street addresses in one pass."""
+    known = header_names(text) if names is None else tuple(names)
+    return _SCANNER.sub(text, _names_pattern(known))
+
+
+def scrub_stream(chunks: Iterable[str], *, max_buffer: int = 1 << 16) -> Iterator[str]:
+    """Scrub a note arriving in chunks without holding it all in memory.
+
+    Output is released at line boundaries (patterns never span lines). Header
+    names are learned from the first ``HEADER_SCAN_CHARS`` before anything is
+    emitted; a single line longer than ``max_buffer`` is flushed as-is, which
+    may split a match at that cut.
+    """
+    learned = False
+    names: re.Pattern[str] | None = None
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        if not learned:
+            if len(pending) < HEADER_SCAN_CHARS:
+                continue
+            names, learned = _names_pattern(header_names(pending)), True
+        cut = pending.rfind("\n") + 1
+        if not cut:
+            if len(pending) < max_buffer:
+                continue
+            cut = len(pending)
+        yield _SCANNER.sub(pending[:cut], names)
+        pending = pending[cut:]
+    if pending:
+        yield _SCANNER.sub(pending, names if learned else _names_pattern(header_names(pending)))
+
+
+def scrub_value(value: Any) -> Any:
+    """Scrub every string inside a log field (dicts and lists are walked)."""
+    if isinstance(value, str):
+        return scrub(value, names=())
+    if isinstance(value, dict):
+        return {key: scrub_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [scrub_value(item) for item in value]
+    return value
+
+
+__all__ = ["HEADER_SCAN_CHARS", "header_names", "scrub", "scrub_stream", "scrub_value"]
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List
+
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import SchemaError as _InvalidSchema
+from jsonschema.exceptions import ValidationError
+
+# jsonschema's own messages quote the instance (PHI), so each error is
+# re-described from its keyword and the schema value alone.
+_BOUNDS = {
+    "minLength": "shorter than {}",
+    "maxLength": "longer than {}",
+    "minItems": "fewer than {} items",
+    "maxItems": "more than {} items",
+    "minimum": "less than {}",
+    "maximum": "greater than {}",
+    "exclusiveMinimum": "not greater than {}",
+    "exclusiveMaximum": "not less than {}",
+}
+
+
+class SchemaError(ValueError):
+    """The schema itself is not valid draft-07."""
+
+
+def _join(path: str, part: Any) -> str:
+    return f"{path}[{part}]" if isinstance(part, int) else f"{path}.{part}"
+
+
+def _describe(error: ValidationError, path: str) -> List[str]:
+    """``"<path>: <problem>"`` lines for one jsonschema error, naming paths and constraints only."""
+    for part in error.absolute_path:
+        path = _join(path, part)
+    keyword, expected = error.validator, error.validator_value
+    if keyword == "required":
+        return [f"{_join(path, name)}: is required" for name in expected if name not in error.instance]
+    if keyword == "additionalProperties":
+        known = set(error.schema.get("properties", {}))
+        patterns = list(error.schema.get("patternProperties", {}))
+        return [
+            f"{_join(path, name)}: unexpected property"
+            for name in error.instance
+            if name not in known and not any(re.search(pattern, name) for pattern in patterns)
+        ]
+    if keyword == "type":
+        names = [expected] if isinstance(expected, str) else expected
+        return [f"{path}: expected {' or '.join(names)}"]
+    if keyword == "enum":
+        return [f"{path}: must be one of [{', '.join(json.dumps(option) for option in expected)}]"]
+    if keyword == "const":
+        return [f"{path}: must equal {json.dumps(expected)}"]
+    if keyword == "pattern":
+        return [f"{path}: does not match {expected}"]
+    if keyword == "false":
+        return [f"{path}: not allowed"]
+    if keyword in _BOUNDS:
+        return [f"{path}: {_BOUNDS[keyword].format(expected)}"]
+    return [f"{path}: fails {keyword}"]
+
+
+class CompiledSchema:
+    """A draft-07 JSON Schema checked once and bound to a ``Draft7Validator``.
+
+    ``errors`` reports ``"<path>: <problem>"`` strings that name paths and
+    schema constraints only, never instance values (PHI).
+    """
+
+    __slots__ = ("name", "_validator")
+
+    def __init__(self, name: str, schema: Any) -> None:
+        try:
+            Draft7Validator.check_schema(schema)
+        except _InvalidSchema as exc:
+            raise SchemaError(f"{name}: {exc.message}") from None
+        self.name = name
+        self._validator = Draft7Validator(schema)
+
+    def errors(self, instance: Any, path: str = "$") -> List[str]:
+        found: List[str] = []
+        for error in self._validator.iter_errors(instance):
+            found.extend(_describe(error, path))
+        return sorted(set(found))
+
+    def is_valid(self, instance: Any) -> bool:
+        return self._validator.is_valid(instance)
+
+
+def compile_schema(schema: Any, *, name: str = "schema") -> CompiledSchema:
+    return CompiledSchema(name, schema)
+
+
+def event_schemas_dir() -> Path:
+    """``EVENT_SCHEMAS_DIR`` if set, else ``schemas/`` next to the service (containers), else the repo's events/schemas."""
+    configured = os.environ.get("EVENT_SCHEMAS_DIR")
+    if configured:
+        return Path(configured)
+    here = Path(__file__).resolve().parent
+    for candidate in (here.parent / "schemas", here.parent.parent / "events" / "schemas"):
+        if candidate.is_dir():
+            return candidate
+    return here.parent / "schemas"
+
+
+def load_event_schemas(directory: Path | None = None) -> Dict[str, CompiledSchema]:
+    """Build a validator for every ``<EventType>.schema.json`` in ``directory``, keyed by event type."""
+    compiled = {}
+    for path in sorted((directory or event_schemas_dir()).glob("*.schema.json")):
+        event_type = path.name.removesuffix(".schema.json")
+        compiled[event_type] = compile_schema(json.loads(path.read_text(encoding="utf-8")), name=event_type)
+    return compiled
+
+
+__all__ = ["CompiledSchema", "SchemaError", "compile_schema", "event_schemas_dir", "load_event_schemas"]
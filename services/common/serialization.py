@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable, List, Optional
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore
+
+
+class JsonCodec:
+    """Encode/decode pair for one JSON backend; ``dumps`` always returns UTF-8 bytes."""
+
+    def __init__(
+        self,
+        name: str,
+        dumps: Callable[[Any, Optional[Callable[[Any], Any]]], bytes],
+        loads: Callable[[bytes | str], Any],
+    ) -> None:
+        self.name = name
+        self._dumps = dumps
+        self.loads = loads
+
+    def dumps(self, obj: Any, *, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        return self._dumps(obj, default)
+
+    def dumps_str(self, obj: Any, *, default: Optional[Callable[[Any], Any]] = None) -> str:
+        return self._dumps(obj, default).decode("utf-8")
+
+
+def _stdlib_dumps(obj: Any, default: Optional[Callable[[Any], Any]]) -> bytes:
+    return json.dumps(obj, default=default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _orjson_dumps(obj: Any, default: Optional[Callable[[Any], Any]]) -> bytes:
+    # Dates and datetimes go through ``default`` as they do with the stdlib,
+    # so stored payloads (e.g. audit payload_json) read the same whichever
+    # backend wrote them.
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+def select_codec(preference: str = "auto") -> JsonCodec:
+    """Pick a codec by name, or the fastest installed one for ``"auto"``."""
+    preference = preference.lower()
+    if preference in {"auto", "orjson"} and orjson is not None:
+        return JsonCodec("orjson", _orjson_dumps, orjson.loads)
+    if preference not in {"auto", "json", "orjson"}:
+        raise ValueError(f"Unsupported JSON_BACKEND: {preference}")
+    return JsonCodec("json", _stdlib_dumps, json.loads)
+
+
+CODEC = select_codec(os.environ.get("JSON_BACKEND", "auto"))
+
+
+def dumps(obj: Any, *, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    return CODEC.dumps(obj, default=default)
+
+
+def dumps_str(obj: Any, *, default: Optional[Callable[[Any], Any]] = None) -> str:
+    return CODEC.dumps_str(obj, default=default)
+
+
+def loads(data: bytes | str) -> Any:
+    return CODEC.loads(data)
+
+
+class PayloadError(ValueError):
+    """Raised when a payload does not decode into the expected shape."""
+
+
+def decode_events(raw: bytes | str) -> List[dict[str, Any]]:
+    """Decode an Event Grid delivery (single event or array); non-object members are dropped."""
+    try:
+        decoded = loads(raw)
+    except ValueError as exc:
+        raise PayloadError(str(exc)) from exc
+    if isinstance(decoded, dict):
+        return [decoded]
+    if isinstance(decoded, list):
+        return [event for event in decoded if isinstance(event, dict)]
+    raise PayloadError("expected an event object or array")
+
+
+__all__ = [
+    "CODEC",
+    "JsonCodec",
+    "PayloadError",
+    "decode_events",
+    "dumps",
+    "dumps_str",
+    "loads",
+    "select_codec",
+]
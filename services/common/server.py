@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import logging
+import os
+import signal
+from dataclasses import dataclass
+from threading import Lock, Thread
+from typing import Any, Callable
+
+logger = logging.getLogger("server")
+
+_shutdown_hooks: list[Callable[[], None]] = []
+_drain_hooks: list[Callable[[], None]] = []
+_shutdown_lock = Lock()
+_shutdown_done = False
+_drain_done = False
+
+
+@dataclass(frozen=True, slots=True)
+class ServerOptions:
+    """Process/thread layout for one service, read from the environment.
+
+    ``WEB_CONCURRENCY`` worker processes, each with ``WEB_THREADS`` request
+    threads. On SIGTERM workers stop accepting connections and get
+    ``GRACEFUL_TIMEOUT_SECONDS`` to finish in-flight requests before the
+    shutdown hooks run and the worker exits.
+    """
+
+    host: str
+    port: int
+    workers: int
+    threads: int
+    graceful_timeout: int
+    worker_timeout: int
+
+    @classmethod
+    def from_env(cls, default_port: int, *, default_workers: int = 1, default_threads: int = 8) -> "ServerOptions":
+        workers = int(os.environ.get("WEB_CONCURRENCY", default_workers))
+        threads = int(os.environ.get("WEB_THREADS", default_threads))
+        if workers < 1 or threads < 1:
+            raise ValueError("WEB_CONCURRENCY and WEB_THREADS must be >= 1")
+        return cls(
+            host=os.environ.get("HOST", "0.0.0.0"),
+            port=int(os.environ.get("PORT", default_port)),
+            workers=workers,
+            threads=threads,
+            graceful_timeout=int(os.environ.get("GRACEFUL_TIMEOUT_SECONDS", "30")),
+            worker_timeout=int(os.environ.get("WORKER_TIMEOUT_SECONDS", "120")),
+        )
+
+
+def register_shutdown(hook: Callable[[], None]) -> None:
+    """Run ``hook`` once when this process drains (gunicorn worker exit or SIGTERM)."""
+    with _shutdown_lock:
+        _shutdown_hooks.append(hook)
+
+
+def register_drain(hook: Callable[[], None]) -> None:
+    """Run ``hook`` once as soon as shutdown starts, before in-flight requests are waited on.
+
+    For requests that would otherwise never finish on their own, such as SSE
+    streams and long polls; shutdown hooks only run after the graceful timeout.
+    """
+    with _shutdown_lock:
+        _drain_hooks.append(hook)
+
+
+def _run_hooks(hooks: list[Callable[[], None]], kind: str) -> None:
+    for hook in hooks:
+        try:
+            hook()
+        except Exception:
+            logger.exception("%s hook %r failed", kind, hook)
+
+
+def run_drain_hooks() -> None:
+    global _drain_done
+    with _shutdown_lock:
+        if _drain_done:
+            return
+        _drain_done = True
+        hooks = list(reversed(_drain_hooks))
+    _run_hooks(hooks, "drain")
+
+
+def run_shutdown_hooks() -> None:
+    global _shutdown_done
+    run_drain_hooks()
+    with _shutdown_lock:
+        if _shutdown_done:
+            return
+        _shutdown_done = True
+        hooks = list(reversed(_shutdown_hooks))
+    _run_hooks(hooks, "shutdown")
+
+
+def _drain_on_sigterm(worker: Any) -> None:
+    """Chain gunicorn's worker SIGTERM handler so drain hooks run when the drain begins."""
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def _handle(signum: int, frame: Any) -> None:
+        # Off the signal handler: drain hooks take locks request threads may hold.
+        Thread(target=run_drain_hooks, name="drain-hooks", daemon=True).start()
+        if callable(previous):
+            previous(signum, frame)
+
+    signal.signal(signal.SIGTERM, _handle)
+
+
+def exit_on_sigterm() -> None:
+    """Turn SIGTERM into a normal interpreter exit so shutdown hooks and ``atexit`` handlers run.
+
+    The default SIGTERM action kills the process outright, which drops
+    anything buffered in background writers (e.g. the task audit writer).
+    """
+
+    def _handle(signum: int, frame: Any) -> None:
+        logger.info("received signal %s, draining", signum)
+        run_shutdown_hooks()
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _handle)
+
+
+def serve_wsgi(app: Any, *, default_port: int, default_workers: int = 1, default_threads: int = 8) -> None:
+    """Serve a WSGI app with gunicorn (gthread workers) configured by ``ServerOptions``.
+
+    ``DEV_SERVER=true`` (or gunicorn not being installed, e.g. on Windows)
+    falls back to the single-process Flask development server.
+    """
+    options = ServerOptions.from_env(default_port, default_workers=default_workers, default_threads=default_threads)
+    if os.environ.get("DEV_SERVER", "false").lower() == "true":
+        app.run(host=options.host, port=options.port, threaded=True)
+        return
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        logger.warning("gunicorn is not installed; using the development server")
+        app.run(host=options.host, port=options.port, threaded=True)
+        return
+
+    class _Application(BaseApplication):
+        def load_config(self) -> None:
+            settings = {
+                "bind": f"{options.host}:{options.port}",
+                "workers": options.workers,
+                "threads": options.threads,
+                "worker_class": "gthread",
+                "graceful_timeout": options.graceful_timeout,
+                "timeout": options.worker_timeout,
+                "keepalive": 5,
+                # Streams are released as the drain starts; each worker then
+                # finishes its own in-flight requests and flushes.
+                "post_worker_init": _drain_on_sigterm,
+                "worker_int": lambda worker: run_drain_hooks(),
+                "worker_abort": lambda worker: run_drain_hooks(),
+                "worker_exit": lambda server, worker: run_shutdown_hooks(),
+            }
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Any:
+            return app
+
+    logger.info(
+        "serving on %s:%s with %d worker(s) x %d thread(s)", options.host, options.port, options.workers, options.threads
+    )
+    _Application().run()
+
+
+__all__ = [
+    "ServerOptions",
+    "exit_on_sigterm",
+    "register_drain",
+    "register_shutdown",
+    "run_drain_hooks",
+    "run_shutdown_hooks",
+    "serve_wsgi",
+]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Iterable, Optional, Sequence
+from uuid import uuid4
+
+# Column order shared by every SELECT that feeds ``row_to_json``/``Task.from_row``.
+TASK_COLUMNS = (
+    "task_id",
+    "patient_id",
+    "category",
+    "title",
+    "due_date",
+    "priority",
+    "status",
+    "source_encounter_id",
+    "created_utc",
+    "updated_utc",
+    "version",
+)
+TASK_SELECT_COLUMNS = ", ".join(TASK_COLUMNS)
+TASK_JSON_KEYS = (
+    "taskId",
+    "patientId",
+    "category",
+    "title",
+    "dueDate",
+    "priority",
+    "status",
+    "sourceEncounterId",
+    "createdUtc",
+    "updatedUtc",
+    "version",
+)
+TASK_STATUSES = ("open", "done", "cancelled")
+
+
+def _due_date(value: Any) -> Optional[str]:
+    """``dueDate`` as YYYY-MM-DD, the form every backend stores (a ``date`` column on PostgreSQL)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value).isoformat()
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(value).date().isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"taskJson.dueDate must be an ISO date (YYYY-MM-DD), got {value!r}")
+
+
+@dataclass(slots=True)
+class Task:
+    """Normalized care task shared by mcp-server writes and tasks-api reads."""
+
+    task_id: str
+    patient_id: str
+    category: str
+    title: str
+    due_date: Optional[str]
+    priority: str
+    status: str
+    source_encounter_id: Optional[str]
+    created_utc: str
+    updated_utc: str
+    version: int = 1
+
+    @classmethod
+    def from_json(cls, task_json: dict[str, Any], *, now: str | None = None) -> "Task":
+        """Normalize an MCP ``taskJson`` payload (camelCase or snake_case keys)."""
+        get = task_json.get
+        patient_id = get("patientId") or get("patient_id")
+        if not patient_id:
+            raise ValueError("taskJson.patientId is required")
+        title = get("title")
+        if not title:
+            raise ValueError("taskJson.title is required")
+        timestamp = now or datetime.now(timezone.utc).isoformat()
+        return cls(
+            get("taskId") or get("task_id") or f"T{uuid4().hex[:10]}",
+            patient_id,
+            (get("category") or "other").lower(),
+            title,
+            _due_date(get("dueDate") or get("due_date")),
+            (get("priority") or "normal").lower(),
+            "open",
+            get("sourceEncounterId") or get("source_encounter_id"),
+            timestamp,
+            timestamp,
+        )
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "Task":
+        """Build from a row selected with ``TASK_SELECT_COLUMNS``."""
+        return cls(*row)
+
+    def upsert_params(self) -> tuple[Any, ...]:
+        """Parameters for the care_tasks upsert: task columns then the write timestamp."""
+        return (
+            self.task_id,
+            self.patient_id,
+            self.category,
+            self.title,
+            self.due_date,
+            self.priority,
+            self.source_encounter_id,
+            self.updated_utc,
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "taskId": self.task_id,
+            "patientId": self.patient_id,
+            "category": self.category,
+            "title": self.title,
+            "dueDate": self.due_date,
+            "priority": self.priority,
+            "status": self.status,
+            "sourceEncounterId": self.source_encounter_id,
+            "createdUtc": self.created_utc,
+            "updatedUtc": self.updated_utc,
+            "version": self.version,
+        }
+
+
+def row_to_json(row: Sequence[Any]) -> dict[str, Any]:
+    """Map a ``TASK_SELECT_COLUMNS`` row straight to its API shape without a Task in between."""
+    return dict(zip(TASK_JSON_KEYS, row))
+
+
+def rows_to_json(rows: Iterable[Sequence[Any]]) -> list[dict[str, Any]]:
+    keys = TASK_JSON_KEYS
+    return [dict(zip(keys, row)) for row in rows]
+
+
+__all__ = [
+    "TASK_COLUMNS",
+    "TASK_JSON_KEYS",
+    "TASK_SELECT_COLUMNS",
+    "TASK_STATUSES",
+    "Task",
+    "row_to_json",
+    "rows_to_json",
+]
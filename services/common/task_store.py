@@ -0,0 +1,1432 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Condition, Lock, Thread
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Sequence
+from uuid import UUID, uuid5
+
+from common.serialization import dumps_str, loads
+from common.task_model import TASK_STATUSES, Task
+
+# pyodbc and azure-identity are only needed in Azure SQL mode and cost a
+# noticeable share of cold start, so they are imported on first use.
+if TYPE_CHECKING:  # pragma: no cover
+    from azure.identity import DefaultAzureCredential
+    from pyodbc import Connection as PyodbcConnection
+
+    from common.task_store_postgres import PostgresTaskStore
+else:  # pragma: no cover
+    DefaultAzureCredential = Any  # type: ignore
+    PyodbcConnection = Any  # type: ignore
+
+
+def _module_available(name: str) -> bool:
+    try:
+        return find_spec(name) is not None
+    except ModuleNotFoundError:  # parent package (e.g. ``azure``) missing
+        return False
+
+SQL_COPT_SS_ACCESS_TOKEN = 1256
+SQL_SCOPE = "https://database.windows.net/.default"
+
+logger = logging.getLogger("task_store")
+
+AuditRow = tuple[str, str, str, str, Optional[str]]  # task_id, action, actor, timestamp_utc, payload_json
+StatusChange = tuple[str, str, int]  # task_id, status, expected version
+
+
+class TaskVersionConflict(RuntimeError):
+    """A status change named a version the task no longer has (``current_version`` is None if it is gone)."""
+
+    def __init__(self, task_id: str, current_version: int | None) -> None:
+        super().__init__(f"task {task_id} is at version {current_version}")
+        self.task_id = task_id
+        self.current_version = current_version
+
+
+class AzureSqlConfig:
+    """Container for Azure SQL configuration options."""
+
+    def __init__(
+        self,
+        *,
+        server: Optional[str],
+        database: Optional[str],
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        connection_string: Optional[str] = None,
+        managed_identity_client_id: Optional[str] = None,
+    ) -> None:
+        self.server = server
+        self.database = database
+        self.username = username
+        self.password = password
+        self.connection_string = connection_string
+        self.managed_identity_client_id = managed_identity_client_id
+
+
+class AuditWriter:
+    """Order-preserving background writer for ``task_audit`` rows.
+
+    Rows are queued after the task transaction commits and written in batches
+    by a single thread, so they land in the same order the task writes
+    committed. A failed batch is put back at the head of the queue and retried
+    rather than dropped. ``flush()`` is a barrier (used before rollover and at
+    exit); rows not yet flushed when the process dies are lost, so the exposure
+    window is ``flush_interval``. That is why it is opt-in: stores default to
+    ``audit_async=False`` and write audit rows inside the task transaction.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[list[AuditRow]], None],
+        *,
+        flush_interval: float = 0.2,
+        max_batch: int = 500,
+    ) -> None:
+        self._write_batch = write_batch
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: deque[AuditRow] = deque()
+        self._cond = Condition()
+        self._writing = False
+        self._closed = False
+        self._thread: Thread | None = None
+
+    def submit(self, row: AuditRow) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("audit writer is closed")
+            self._queue.append(row)
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="task-audit-writer", daemon=True)
+                self._thread.start()
+            if len(self._queue) >= self.max_batch:
+                self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every row submitted so far is written; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._queue or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        backoff = self.flush_interval
+        while True:
+            with self._cond:
+                if not self._queue and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                if not self._queue:
+                    if self._closed:
+                        return
+                    continue
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+                self._writing = True
+            try:
+                self._write_batch(batch)
+            except Exception:
+                logger.exception("audit batch write failed; retrying %d rows", len(batch))
+                with self._cond:
+                    self._queue.extendleft(reversed(batch))
+                    self._writing = False
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+                continue
+            backoff = self.flush_interval
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+def _archive_month_start(now: datetime | None, retain_months: int) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    month_index = now.year * 12 + (now.month - 1) - retain_months
+    return datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _next_month(month: str) -> str:
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}-01"
+
+
+def _audit_row_to_json(row: Sequence[Any]) -> dict[str, Any]:
+    return {
+        "auditId": row[0],
+        "taskId": row[1],
+        "action": row[2],
+        "actor": row[3],
+        "timestampUtc": row[4] if isinstance(row[4], str) else row[4].isoformat(),
+        "payloadJson": row[5],
+    }
+
+
+SummaryKey = tuple[str, str, str, str]  # patient_id, category, status, due_date ('' when unset)
+
+
+def _summary_key(patient_id: str, category: str, status: str, due_date: Any) -> SummaryKey:
+    if due_date is None:
+        due = ""
+    elif isinstance(due_date, str):
+        due = due_date
+    else:
+        due = due_date.isoformat()
+    return (patient_id, category, status, due)
+
+
+def _diff_summaries(expected: dict[SummaryKey, int], actual: dict[SummaryKey, int]) -> list[dict[str, Any]]:
+    diffs = []
+    for key in sorted(expected.keys() | actual.keys()):
+        if expected.get(key, 0) != actual.get(key, 0):
+            patient_id, category, status, due_date = key
+            diffs.append(
+                {
+                    "patientId": patient_id,
+                    "category": category,
+                    "status": status,
+                    "dueDate": due_date or None,
+                    "expected": expected.get(key, 0),
+                    "actual": actual.get(key, 0),
+                }
+            )
+    return diffs
+
+
+def _status_changes(changes: Sequence[dict[str, Any]]) -> list[StatusChange]:
+    """Validate ``[{"taskId", "status", "version"}]`` into tuples; task ids must be unique."""
+    parsed: list[StatusChange] = []
+    seen: set[str] = set()
+    for change in changes:
+        task_id = change.get("taskId")
+        status = change.get("status")
+        version = change.get("version")
+        if not isinstance(task_id, str) or not task_id:
+            raise ValueError("taskId is required")
+        if status not in TASK_STATUSES:
+            raise ValueError(f"invalid status for {task_id}: {status}")
+        if not isinstance(version, int) or isinstance(version, bool):
+            raise ValueError(f"version is required for {task_id}")
+        if task_id in seen:
+            raise ValueError(f"duplicate taskId: {task_id}")
+        seen.add(task_id)
+        parsed.append((task_id, status, version))
+    return parsed
+
+
+def _status_audit_row(task_id: str, actor: str, now: str, previous: str, status: str, version: int) -> AuditRow:
+    payload = dumps_str({"previousStatus": previous, "status": status, "version": version})
+    return (task_id, "status", actor, now, payload)
+
+
+def _summaries_to_json(rows: Sequence[Sequence[Any]]) -> dict[str, dict[str, Any]]:
+    """Fold (patient_id, category, open, overdue) rows into per-patient totals and per-category counts."""
+    result: dict[str, dict[str, Any]] = {}
+    for patient_id, category, open_count, overdue_count in rows:
+        entry = result.setdefault(patient_id, {"open": 0, "overdue": 0, "byCategory": {}})
+        entry["open"] += open_count
+        entry["overdue"] += overdue_count
+        entry["byCategory"][category] = {"open": open_count, "overdue": overdue_count}
+    return result
+
+
+
+OutboxRow = tuple[str, str, str, str, str]  # event_id, event_type, subject, data_json, created_utc
+
+# Namespace for outbox event ids; changing it would re-key every future event.
+OUTBOX_EVENT_NAMESPACE = UUID("5b0c7a52-8f3e-4d7a-9a61-3f0c2e9b4d17")
+
+
+def _outbox_row(event: dict[str, Any], task_id: str, now: str) -> OutboxRow:
+    """Validate ``{"eventType", "subject", "data"}`` into an outbox row for ``task_id``.
+
+    The event id is derived from the task id and event type, so a retried or
+    replayed upsert names the same Event Grid event, and every publish attempt
+    of the row carries that id for subscribers to de-duplicate.
+    """
+    event_type = event.get("eventType")
+    subject = event.get("subject")
+    data = event.get("data")
+    if not isinstance(event_type, str) or not event_type:
+        raise ValueError("outbox event requires eventType")
+    if not isinstance(subject, str) or not subject:
+        raise ValueError("outbox event requires subject")
+    if not isinstance(data, dict):
+        raise ValueError("outbox event data must be an object")
+    event_id = uuid5(OUTBOX_EVENT_NAMESPACE, f"{task_id}/{event_type}")
+    return (str(event_id), event_type, subject, dumps_str(data, default=str), now)
+
+
+def _outbox_to_json(row: Sequence[Any]) -> dict[str, Any]:
+    outbox_id, event_id, event_type, subject, data_json, created_utc = row
+    return {
+        "outboxId": outbox_id,
+        "id": event_id,
+        "eventType": event_type,
+        "subject": subject,
+        "eventTime": created_utc if isinstance(created_utc, str) else created_utc.isoformat(),
+        "data": loads(data_json),
+    }
+
+
+SQLITE_SCHEMA = (
+    """
+    create table if not exists care_tasks (
+      task_id text primary key,
+      patient_id text not null,
+      category text not null,
+      title text not null,
+      due_date text,
+      priority text not null,
+      source_encounter_id text,
+      status text not null,
+      created_utc text not null,
+      updated_utc text not null,
+      version integer not null default 1
+    )
+    """,
+    """
+    create table if not exists task_audit (
+      audit_id integer primary key autoincrement,
+      task_id text not null,
+      action text not null,
+      actor text not null,
+      timestamp_utc text not null,
+      payload_json text
+    )
+    """,
+    """
+    create index if not exists ix_task_audit_task_ts on task_audit(task_id, timestamp_utc)
+    """,
+    """
+    create table if not exists task_changes (
+      seq integer primary key autoincrement,
+      task_id text not null,
+      patient_id text not null,
+      action text not null,
+      changed_utc text not null
+    )
+    """,
+    """
+    create index if not exists ix_task_changes_patient_seq on task_changes(patient_id, seq)
+    """,
+    """
+    create table if not exists patient_task_summary (
+      patient_id text not null,
+      category text not null,
+      status text not null,
+      due_date text not null,
+      task_count integer not null,
+      primary key (patient_id, category, status, due_date)
+    ) without rowid
+    """,
+    # Backfill in the same migration so databases that predate the summary
+    # start with correct counts; a populated summary is left alone.
+    """
+    insert into patient_task_summary(patient_id, category, status, due_date, task_count)
+    select patient_id, category, status, coalesce(due_date, ''), count(*)
+    from care_tasks
+    where not exists (select 1 from patient_task_summary)
+    group by patient_id, category, status, coalesce(due_date, '')
+    """,
+    """
+    create table if not exists task_outbox (
+      outbox_id integer primary key autoincrement,
+      event_id text not null unique,
+      event_type text not null,
+      subject text not null,
+      data_json text not null,
+      created_utc text not null,
+      sent_utc text
+    )
+    """,
+    """
+    create index if not exists ix_task_outbox_pending on task_outbox(outbox_id) where sent_utc is null
+    """,
+)
+# Stored in ``pragma user_version`` once applied so later opens skip the DDL.
+SQLITE_SCHEMA_VERSION = int(hashlib.sha256("".join(SQLITE_SCHEMA).encode("utf-8")).hexdigest()[:7], 16)
+
+
+class SqliteTaskStore:
+    """SQLite-backed store retained for local development."""
+
+    def __init__(self, db_path: str | Path, *, audit_async: bool = False) -> None:
+        self.path = Path(db_path)
+        if self.path.is_dir():
+            raise ValueError(f"task store path must be a file, got directory: {self.path}")
+        if not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._audit_writer: AuditWriter | None = None
+        if audit_async:
+            self._audit_writer = AuditWriter(self._write_audit_batch)
+            atexit.register(self._audit_writer.close)
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        with self._connect() as conn:
+            if conn.execute("pragma user_version").fetchone()[0] == SQLITE_SCHEMA_VERSION:
+                return
+            for statement in SQLITE_SCHEMA:
+                conn.execute(statement)
+            columns = {row[1] for row in conn.execute("pragma table_info(care_tasks)")}
+            if "version" not in columns:  # databases created before status versioning
+                conn.execute("alter table care_tasks add column version integer not null default 1")
+            conn.execute(f"pragma user_version = {SQLITE_SCHEMA_VERSION}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("pragma journal_mode = wal")
+        return conn
+
+    def _summary_key_for(self, conn: sqlite3.Connection, task_id: str) -> SummaryKey | None:
+        row = conn.execute(
+            "select patient_id, category, status, due_date from care_tasks where task_id = ?",
+            (task_id,),
+        ).fetchone()
+        return _summary_key(*row) if row else None
+
+    @staticmethod
+    def _apply_summary_delta(
+        conn: sqlite3.Connection, old: SummaryKey | None, new: SummaryKey | None
+    ) -> None:
+        if old == new:
+            return
+        if old is not None:
+            conn.execute(
+                """
+                update patient_task_summary set task_count = task_count - 1
+                where patient_id = ? and category = ? and status = ? and due_date = ?
+                """,
+                old,
+            )
+            conn.execute(
+                """
+                delete from patient_task_summary
+                where patient_id = ? and category = ? and status = ? and due_date = ? and task_count <= 0
+                """,
+                old,
+            )
+        if new is not None:
+            conn.execute(
+                """
+                insert into patient_task_summary(patient_id, category, status, due_date, task_count)
+                values (?, ?, ?, ?, 1)
+                on conflict(patient_id, category, status, due_date) do update set
+                  task_count = task_count + 1
+                """,
+                new,
+            )
+
+    def summarize_patients(self, patient_ids: Sequence[str], *, as_of: str) -> dict[str, dict[str, Any]]:
+        """Open and overdue (due before ``as_of``) task counts per patient and category."""
+        if not patient_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in patient_ids)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                select patient_id, category,
+                  sum(case when status = 'open' then task_count else 0 end),
+                  sum(case when status = 'open' and due_date != '' and due_date < ? then task_count else 0 end)
+                from patient_task_summary
+                where patient_id in ({placeholders})
+                group by patient_id, category
+                """,
+                [as_of, *patient_ids],
+            ).fetchall()
+        return _summaries_to_json(rows)
+
+    def check_task_summary(self, *, repair: bool = False) -> list[dict[str, Any]]:
+        """Recount ``care_tasks`` and diff it against the summary; optionally rebuild on mismatch."""
+        with self._lock, self._connect() as conn:
+            conn.execute("begin immediate")
+            expected = {
+                _summary_key(*row[:4]): row[4]
+                for row in conn.execute(
+                    "select patient_id, category, status, due_date, count(*) from care_tasks group by 1, 2, 3, 4"
+                )
+            }
+            actual = {
+                tuple(row[:4]): row[4]
+                for row in conn.execute(
+                    "select patient_id, category, status, due_date, task_count from patient_task_summary"
+                )
+            }
+            diffs = _diff_summaries(expected, actual)
+            if diffs and repair:
+                conn.execute("delete from patient_task_summary")
+                conn.executemany(
+                    """
+                    insert into patient_task_summary(patient_id, category, status, due_date, task_count)
+                    values (?, ?, ?, ?, ?)
+                    """,
+                    [(*key, count) for key, count in expected.items()],
+                )
+            conn.commit()
+        return diffs
+
+    def _write_audit_batch(self, rows: list[AuditRow]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                insert into task_audit(task_id, action, actor, timestamp_utc, payload_json)
+                values (?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.commit()
+
+    def flush_audit(self, timeout: float | None = None) -> bool:
+        return self._audit_writer.flush(timeout) if self._audit_writer else True
+
+    def _archive_tables(self, conn: sqlite3.Connection) -> list[str]:
+        rows = conn.execute(
+            "select name from sqlite_master where type = 'table' and name glob 'task_audit_[0-9]*' order by name"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def query_audit(
+        self,
+        task_id: str,
+        *,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """Audit entries for one task, newest first, across the live table and monthly archives."""
+        clauses = ["task_id = ?"]
+        params: list[Any] = [task_id]
+        if since:
+            clauses.append("timestamp_utc >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp_utc < ?")
+            params.append(until)
+        where = " and ".join(clauses)
+        with self._connect() as conn:
+            tables = ["task_audit"]
+            for name in self._archive_tables(conn):
+                month = f"{name[-6:-2]}-{name[-2:]}"
+                # Skip archives entirely outside [since, until).
+                if (since and month < since[:7]) or (until and month > until[:7]):
+                    continue
+                tables.append(name)
+            query = " union all ".join(
+                f"select audit_id, task_id, action, actor, timestamp_utc, payload_json from {table} where {where}"
+                for table in tables
+            )
+            rows = conn.execute(
+                f"{query} order by timestamp_utc desc, audit_id desc limit ?",
+                params * len(tables) + [limit],
+            ).fetchall()
+        return [_audit_row_to_json(row) for row in rows]
+
+    def rollover_audit(self, *, now: datetime | None = None, retain_months: int = 3) -> int:
+        """Move audit rows older than ``retain_months`` into ``task_audit_YYYYMM`` tables.
+
+        Keeps the live table (and its index) small; returns the number of rows moved.
+        """
+        self.flush_audit()
+        cutoff = _archive_month_start(now, retain_months).isoformat()
+        moved = 0
+        with self._lock, self._connect() as conn:
+            months = conn.execute(
+                "select distinct substr(timestamp_utc, 1, 7) from task_audit where timestamp_utc < ?",
+                (cutoff,),
+            ).fetchall()
+            for (month,) in months:
+                table = f"task_audit_{month.replace('-', '')}"
+                conn.execute(
+                    f"""
+                    create table if not exists {table} (
+                      audit_id integer primary key,
+                      task_id text not null,
+                      action text not null,
+                      actor text not null,
+                      timestamp_utc text not null,
+                      payload_json text
+                    )
+                    """
+                )
+                conn.execute(f"create index if not exists ix_{table}_task_ts on {table}(task_id, timestamp_utc)")
+                bounds = (f"{month}-01", min(_next_month(month), cutoff))
+                conn.execute(
+                    f"insert into {table} select * from task_audit where timestamp_utc >= ? and timestamp_utc < ?",
+                    bounds,
+                )
+                moved += conn.execute(
+                    "delete from task_audit where timestamp_utc >= ? and timestamp_utc < ?",
+                    bounds,
+                ).rowcount
+            conn.commit()
+        return moved
+
+    def _upsert_task(self, conn: sqlite3.Connection, task: Task, audit_row: AuditRow) -> bool:
+        """Write one task with its summary, audit and change rows; True if the task is new."""
+        previous = self._summary_key_for(conn, task.task_id)
+        conn.execute(
+            """
+            insert into care_tasks(
+              task_id, patient_id, category, title, due_date, priority,
+              source_encounter_id, status, created_utc, updated_utc
+            ) values (?1, ?2, ?3, ?4, ?5, ?6, ?7, 'open', ?8, ?8)
+            on conflict(task_id) do update set
+              patient_id=excluded.patient_id,
+              category=excluded.category,
+              title=excluded.title,
+              due_date=excluded.due_date,
+              priority=excluded.priority,
+              source_encounter_id=excluded.source_encounter_id,
+              updated_utc=excluded.updated_utc,
+              version=care_tasks.version + 1
+            """,
+            task.upsert_params(),
+        )
+        status = previous[2] if previous else "open"
+        self._apply_summary_delta(conn, previous, _summary_key(task.patient_id, task.category, status, task.due_date))
+        if self._audit_writer is None:
+            conn.execute(
+                """
+                insert into task_audit(task_id, action, actor, timestamp_utc, payload_json)
+                values (?, ?, ?, ?, ?)
+                """,
+                audit_row,
+            )
+        conn.execute(
+            """
+            insert into task_changes(task_id, patient_id, action, changed_utc)
+            values (?, ?, 'upsert', ?)
+            """,
+            (task.task_id, task.patient_id, task.updated_utc),
+        )
+        return previous is None
+
+    def upsert(self, task_json: dict[str, Any], *, event: dict[str, Any] | None = None) -> dict[str, str]:
+        """Insert or update one task; ``event`` is queued in the outbox in the same transaction.
+
+        The event is only queued when the upsert creates the task, so retries and
+        replays of an upsert do not announce it again.
+        """
+        task = Task.from_json(task_json)
+        audit_row = (task.task_id, "upsert", "mcp-server", task.updated_utc, dumps_str(task_json, default=str))
+        outbox_row = _outbox_row(event, task.task_id, task.updated_utc) if event is not None else None
+        with self._lock, self._connect() as conn:
+            conn.execute("begin immediate")
+            created = self._upsert_task(conn, task, audit_row)
+            if outbox_row is not None and created:
+                conn.execute(
+                    """
+                    insert into task_outbox(event_id, event_type, subject, data_json, created_utc)
+                    values (?, ?, ?, ?, ?)
+                    on conflict(event_id) do nothing
+                    """,
+                    outbox_row,
+                )
+            conn.commit()
+        if self._audit_writer is not None:
+            self._audit_writer.submit(audit_row)
+        return {"taskId": task.task_id}
+
+    def bulk_upsert(self, tasks: Iterable[dict[str, Any]], *, actor: str = "backfill") -> dict[str, int]:
+        """Upsert many tasks in one transaction (backfills); same rows as repeated ``upsert`` calls."""
+        now = datetime.now(timezone.utc).isoformat()
+        audit_rows: list[AuditRow] = []
+        with self._lock, self._connect() as conn:
+            conn.execute("begin immediate")
+            for task_json in tasks:
+                task = Task.from_json(task_json, now=now)
+                audit_row = (task.task_id, "upsert", actor, task.updated_utc, dumps_str(task_json, default=str))
+                self._upsert_task(conn, task, audit_row)
+                audit_rows.append(audit_row)
+            conn.commit()
+        if self._audit_writer is not None:
+            for audit_row in audit_rows:
+                self._audit_writer.submit(audit_row)
+        return {"upserted": len(audit_rows)}
+
+    def pending_outbox(self, limit: int = 100) -> list[dict[str, Any]]:
+        """Unsent outbox events, oldest first, as Event Grid events plus ``outboxId``."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                select outbox_id, event_id, event_type, subject, data_json, created_utc
+                from task_outbox where sent_utc is null order by outbox_id limit ?
+                """,
+                (limit,),
+            ).fetchall()
+        return [_outbox_to_json(row) for row in rows]
+
+    def mark_outbox_sent(self, outbox_ids: Sequence[int]) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                "update task_outbox set sent_utc = ? where outbox_id = ?",
+                [(now, outbox_id) for outbox_id in outbox_ids],
+            )
+            conn.commit()
+
+    def purge_outbox(self, *, sent_before: datetime) -> int:
+        """Delete outbox rows published before ``sent_before``; returns rows removed."""
+        with self._connect() as conn:
+            removed = conn.execute(
+                "delete from task_outbox where sent_utc is not null and sent_utc < ?",
+                (sent_before.isoformat(),),
+            ).rowcount
+            conn.commit()
+        return removed
+
+    def update_status(
+        self, task_id: str, status: str, *, expected_version: int, actor: str = "tasks-api"
+    ) -> dict[str, Any]:
+        """Move one task to ``status`` if it is still at ``expected_version``; raises TaskVersionConflict."""
+        result = self.bulk_update_status(
+            [{"taskId": task_id, "status": status, "version": expected_version}], actor=actor
+        )
+        if result["conflicts"]:
+            raise TaskVersionConflict(task_id, result["conflicts"][0]["currentVersion"])
+        return result["updated"][0]
+
+    def bulk_update_status(self, changes: Sequence[dict[str, Any]], *, actor: str = "tasks-api") -> dict[str, Any]:
+        """Apply ``[{"taskId", "status", "version"}]`` compare-and-swap status changes in one commit.
+
+        Each change only applies if the task is still at the given version, so
+        concurrent editors never block on the store lock; stale entries come back
+        under ``conflicts`` with the version they would need. Audit, change-feed
+        and summary rows are written in the same transaction.
+        """
+        items = _status_changes(changes)
+        now = datetime.now(timezone.utc).isoformat()
+        updated: list[dict[str, Any]] = []
+        conflicts: list[dict[str, Any]] = []
+        audit_rows: list[AuditRow] = []
+        change_rows: list[tuple[str, str, str]] = []
+        with self._connect() as conn:
+            conn.execute("begin immediate")
+            for task_id, status, expected in items:
+                row = conn.execute(
+                    "select patient_id, category, status, due_date, version from care_tasks where task_id = ?",
+                    (task_id,),
+                ).fetchone()
+                if row is None or row[4] != expected:
+                    conflicts.append({"taskId": task_id, "currentVersion": row[4] if row else None})
+                    continue
+                patient_id, category, previous, due_date, _ = row
+                conn.execute(
+                    """
+                    update care_tasks set status = ?, version = version + 1, updated_utc = ?
+                    where task_id = ? and version = ?
+                    """,
+                    (status, now, task_id, expected),
+                )
+                self._apply_summary_delta(
+                    conn,
+                    _summary_key(patient_id, category, previous, due_date),
+                    _summary_key(patient_id, category, status, due_date),
+                )
+                audit_rows.append(_status_audit_row(task_id, actor, now, previous, status, expected + 1))
+                change_rows.append((task_id, patient_id, now))
+                updated.append({"taskId": task_id, "status": status, "version": expected + 1})
+            conn.executemany(
+                """
+                insert into task_audit(task_id, action, actor, timestamp_utc, payload_json)
+                values (?, ?, ?, ?, ?)
+                """,
+                audit_rows,
+            )
+            conn.executemany(
+                """
+                insert into task_changes(task_id, patient_id, action, changed_utc)
+                values (?, ?, 'status', ?)
+                """,
+                change_rows,
+            )
+            conn.commit()
+        return {"updated": updated, "conflicts": conflicts}
+
+
+SQL_CREATE_PATIENTS = """
+if object_id(N'dbo.patients', N'U') is null begin
+  create table dbo.patients (
+    patient_id varchar(64) primary key,
+    mrn varchar(64) unique,
+    name nvarchar(200),
+    dob date,
+    last_encounter_id varchar(64),
+    created_utc datetime2 default sysutcdatetime()
+  );
+end
+"""
+
+SQL_CREATE_CARE_TASKS = """
+if object_id(N'dbo.care_tasks', N'U') is null begin
+  create table dbo.care_tasks (
+    task_id varchar(64) primary key,
+    patient_id varchar(64) not null,
+    category varchar(32) not null,
+    title nvarchar(500) not null,
+    due_date date null,
+    priority varchar(16) not null,
+    source_encounter_id varchar(64),
+    status varchar(16) not null default 'open',
+    created_utc datetime2 not null default sysutcdatetime(),
+    updated_utc datetime2 not null default sysutcdatetime(),
+    version int not null constraint df_care_tasks_version default 1
+  );
+end
+"""
+
+SQL_ADD_TASK_VERSION = """
+if object_id(N'dbo.care_tasks', N'U') is not null
+  and col_length(N'dbo.care_tasks', 'version') is null begin
+  alter table dbo.care_tasks
+    add version int not null constraint df_care_tasks_version default 1;
+end
+"""
+
+SQL_ADD_FK = """
+if object_id(N'dbo.care_tasks', N'U') is not null
+  and object_id(N'dbo.patients', N'U') is not null
+  and not exists (
+    select 1 from sys.foreign_keys where name = 'fk_care_tasks_patients'
+  ) begin
+  alter table dbo.care_tasks
+    add constraint fk_care_tasks_patients foreign key(patient_id)
+    references dbo.patients(patient_id);
+end
+"""
+
+SQL_CREATE_AUDIT_PARTITIONING = """
+if not exists (select 1 from sys.partition_functions where name = 'pf_task_audit_monthly') begin
+  declare @month datetime2 = datefromparts(year(sysutcdatetime()), month(sysutcdatetime()), 1);
+  declare @next datetime2 = dateadd(month, 1, @month);
+  create partition function pf_task_audit_monthly (datetime2)
+    as range right for values (@month, @next);
+end
+if not exists (select 1 from sys.partition_schemes where name = 'ps_task_audit_monthly') begin
+  create partition scheme ps_task_audit_monthly
+    as partition pf_task_audit_monthly all to ([primary]);
+end
+"""
+
+SQL_CREATE_TASK_AUDIT = """
+if object_id(N'dbo.task_audit', N'U') is null begin
+  create table dbo.task_audit (
+    audit_id bigint identity not null,
+    task_id varchar(64) not null,
+    action varchar(32) not null,
+    actor varchar(128) not null,
+    timestamp_utc datetime2 not null default sysutcdatetime(),
+    payload_json nvarchar(max),
+    constraint pk_task_audit primary key clustered (timestamp_utc, audit_id)
+  ) on ps_task_audit_monthly(timestamp_utc);
+end
+-- Tables created before partitioning are clustered on audit_id alone; rebuild
+-- the clustered key onto the partition scheme once (a size-of-data operation).
+if exists (
+  select 1
+  from sys.indexes i
+  join sys.data_spaces d on d.data_space_id = i.data_space_id
+  where i.object_id = object_id(N'dbo.task_audit') and i.index_id = 1 and d.type <> 'PS'
+) begin
+  declare @pk sysname = (
+    select name from sys.key_constraints where parent_object_id = object_id(N'dbo.task_audit') and type = 'PK'
+  );
+  if exists (select 1 from sys.indexes where name = 'ix_task_audit_task_ts' and object_id = object_id(N'dbo.task_audit'))
+    drop index ix_task_audit_task_ts on dbo.task_audit;
+  if @pk is not null
+    exec (N'alter table dbo.task_audit drop constraint ' + quotename(@pk));
+  alter table dbo.task_audit add constraint pk_task_audit
+    primary key clustered (timestamp_utc, audit_id) on ps_task_audit_monthly(timestamp_utc);
+end
+if object_id(N'dbo.task_audit', N'U') is not null
+  and not exists (
+    select 1 from sys.indexes
+    where name = 'ix_task_audit_task_ts' and object_id = object_id(N'dbo.task_audit')
+  ) begin
+  create index ix_task_audit_task_ts on dbo.task_audit(task_id, timestamp_utc);
+end
+"""
+
+# Run by the audit rollover job (and schema setup) so inserts never land in the open-ended last partition.
+SQL_EXTEND_AUDIT_PARTITIONS = """
+declare @next datetime2 = dateadd(month, 1, datefromparts(year(sysutcdatetime()), month(sysutcdatetime()), 1));
+if not exists (
+  select 1
+  from sys.partition_range_values v
+  join sys.partition_functions f on f.function_id = v.function_id
+  where f.name = 'pf_task_audit_monthly' and cast(v.value as datetime2) = @next
+) begin
+  alter partition scheme ps_task_audit_monthly next used [primary];
+  alter partition function pf_task_audit_monthly() split range (@next);
+end
+"""
+
+SQL_CREATE_TASK_CHANGES = """
+if object_id(N'dbo.task_changes', N'U') is null begin
+  create table dbo.task_changes (
+    seq bigint identity primary key,
+    task_id varchar(64) not null,
+    patient_id varchar(64) not null,
+    action varchar(32) not null,
+    changed_utc datetime2 not null default sysutcdatetime()
+  );
+  create index ix_task_changes_patient_seq on dbo.task_changes(patient_id, seq);
+end
+"""
+
+SQL_CREATE_TASK_SUMMARY = """
+if object_id(N'dbo.patient_task_summary', N'U') is null begin
+  create table dbo.patient_task_summary (
+    patient_id varchar(64) not null,
+    category varchar(32) not null,
+    status varchar(16) not null,
+    due_date varchar(10) not null,
+    task_count int not null,
+    constraint pk_patient_task_summary primary key (patient_id, category, status, due_date)
+  );
+end;
+if not exists (select 1 from dbo.patient_task_summary)
+  insert into dbo.patient_task_summary(patient_id, category, status, due_date, task_count)
+  select patient_id, category, status, coalesce(convert(varchar(10), due_date, 23), ''), count(*)
+  from dbo.care_tasks with (tablockx, holdlock)
+  group by patient_id, category, status, coalesce(convert(varchar(10), due_date, 23), '');
+"""
+
+SQL_CREATE_TASK_OUTBOX = """
+if object_id(N'dbo.task_outbox', N'U') is null begin
+  create table dbo.task_outbox (
+    outbox_id bigint identity primary key,
+    event_id varchar(64) not null unique,
+    event_type varchar(64) not null,
+    subject varchar(256) not null,
+    data_json nvarchar(max) not null,
+    created_utc datetime2 not null default sysutcdatetime(),
+    sent_utc datetime2 null
+  );
+  create index ix_task_outbox_pending on dbo.task_outbox(outbox_id) where sent_utc is null;
+end
+"""
+
+SQL_CREATE_TASK_INDEX = """
+if object_id(N'dbo.care_tasks', N'U') is not null
+  and not exists (
+    select 1
+    from sys.indexes
+    where name = 'ix_care_tasks_patient_open'
+      and object_id = object_id(N'dbo.care_tasks')
+  ) begin
+  create index ix_care_tasks_patient_open on dbo.care_tasks(patient_id, status);
+end
+"""
+
+SQL_MERGE_TASK = """
+merge dbo.care_tasks as target
+using (values (?, ?, ?, ?, ?, ?, ?, ?)) as source(
+  task_id, patient_id, category, title, due_date, priority, source_encounter_id, updated_utc
+)
+on target.task_id = source.task_id
+when matched then
+  update set
+    patient_id = source.patient_id,
+    category = source.category,
+    title = source.title,
+    due_date = source.due_date,
+    priority = source.priority,
+    source_encounter_id = source.source_encounter_id,
+    updated_utc = source.updated_utc,
+    version = target.version + 1
+when not matched then
+  insert (task_id, patient_id, category, title, due_date, priority, source_encounter_id, status, created_utc, updated_utc)
+  values (source.task_id, source.patient_id, source.category, source.title, source.due_date, source.priority, source.source_encounter_id, 'open', source.updated_utc, source.updated_utc);
+"""
+
+SQL_INSERT_AUDIT = """
+insert into dbo.task_audit(task_id, action, actor, timestamp_utc, payload_json)
+values (?, ?, ?, ?, ?);
+"""
+
+SQL_QUERY_AUDIT = """
+select top (?) audit_id, task_id, action, actor, timestamp_utc, payload_json
+from dbo.task_audit
+where task_id = ? and timestamp_utc >= ? and timestamp_utc < ?
+order by timestamp_utc desc, audit_id desc;
+"""
+
+SQL_SELECT_SUMMARY_KEY = """
+select patient_id, category, status, due_date
+from dbo.care_tasks with (updlock, holdlock)
+where task_id = ?;
+"""
+
+SQL_SUMMARY_DECREMENT = """
+update dbo.patient_task_summary set task_count = task_count - 1
+where patient_id = ? and category = ? and status = ? and due_date = ?;
+delete from dbo.patient_task_summary
+where patient_id = ? and category = ? and status = ? and due_date = ? and task_count <= 0;
+"""
+
+SQL_SUMMARY_INCREMENT = """
+merge dbo.patient_task_summary with (holdlock) as target
+using (values (?, ?, ?, ?)) as source(patient_id, category, status, due_date)
+on target.patient_id = source.patient_id and target.category = source.category
+  and target.status = source.status and target.due_date = source.due_date
+when matched then update set task_count = target.task_count + 1
+when not matched then
+  insert (patient_id, category, status, due_date, task_count)
+  values (source.patient_id, source.category, source.status, source.due_date, 1);
+"""
+
+SQL_SUMMARIZE_PATIENTS = """
+select patient_id, category,
+  sum(case when status = 'open' then task_count else 0 end),
+  sum(case when status = 'open' and due_date <> '' and due_date < ? then task_count else 0 end)
+from dbo.patient_task_summary
+where patient_id in (select value from openjson(?))
+group by patient_id, category;
+"""
+
+SQL_COUNT_CARE_TASKS = """
+select patient_id, category, status, due_date, count(*)
+from dbo.care_tasks with (tablockx, holdlock)
+group by patient_id, category, status, due_date;
+"""
+
+SQL_INSERT_CHANGE = """
+insert into dbo.task_changes(task_id, patient_id, action, changed_utc)
+values (?, ?, ?, ?);
+"""
+
+# Set-based compare-and-swap: only rows still at the caller's version match the join.
+SQL_BULK_UPDATE_STATUS = """
+update t
+set t.status = j.status, t.version = t.version + 1, t.updated_utc = ?
+output inserted.task_id, inserted.patient_id, inserted.category, deleted.status,
+  inserted.status, inserted.due_date, inserted.version
+from dbo.care_tasks t
+join openjson(?) with (taskId varchar(64), status varchar(16), version int) j
+  on t.task_id = j.taskId and t.version = j.version;
+"""
+
+SQL_SELECT_VERSIONS = """
+select task_id, version from dbo.care_tasks
+where task_id in (select value from openjson(?));
+"""
+
+
+SQL_INSERT_OUTBOX = """
+insert into dbo.task_outbox(event_id, event_type, subject, data_json, created_utc)
+select ?, ?, ?, ?, ?
+where not exists (select 1 from dbo.task_outbox where event_id = ?);
+"""
+
+# readpast skips rows still locked by an in-flight upsert; they are picked up next poll.
+SQL_PENDING_OUTBOX = """
+select top (?) outbox_id, event_id, event_type, subject, data_json, created_utc
+from dbo.task_outbox with (readpast)
+where sent_utc is null
+order by outbox_id;
+"""
+
+SQL_MARK_OUTBOX_SENT = """
+update dbo.task_outbox set sent_utc = ?
+where outbox_id in (select cast(value as bigint) from openjson(?));
+"""
+
+SQL_PURGE_OUTBOX = """
+delete from dbo.task_outbox where sent_utc is not null and sent_utc < ?;
+"""
+
+
+SQL_SCHEMA = (
+    SQL_CREATE_PATIENTS,
+    SQL_CREATE_CARE_TASKS,
+    SQL_ADD_TASK_VERSION,
+    SQL_CREATE_AUDIT_PARTITIONING,
+    SQL_CREATE_TASK_AUDIT,
+    SQL_EXTEND_AUDIT_PARTITIONS,
+    SQL_CREATE_TASK_CHANGES,
+    SQL_CREATE_TASK_SUMMARY,
+    SQL_CREATE_TASK_OUTBOX,
+    SQL_ADD_FK,
+    SQL_CREATE_TASK_INDEX,
+)
+# The marker also carries the month so the DDL (including the partition
+# extension) re-runs once per month rather than on every cold start.
+SQL_SCHEMA_VERSION = hashlib.sha256("".join(SQL_SCHEMA).encode("utf-8")).hexdigest()[:16]
+
+SQL_SELECT_SCHEMA_VERSION = """
+if object_id(N'dbo.task_schema_version', N'U') is null
+  select cast(null as varchar(64));
+else
+  select top (1) version from dbo.task_schema_version;
+"""
+
+SQL_RECORD_SCHEMA_VERSION = """
+if object_id(N'dbo.task_schema_version', N'U') is null
+  create table dbo.task_schema_version (version varchar(64) not null);
+delete from dbo.task_schema_version;
+insert into dbo.task_schema_version(version) values (?);
+"""
+
+
+class AzureSqlTaskStore:
+    """Azure SQL-backed store using pyodbc with Managed Identity or SQL auth."""
+
+    def __init__(self, config: AzureSqlConfig, *, audit_async: bool = False) -> None:
+        if not config.connection_string and (not config.server or not config.database):
+            raise ValueError("AzureSqlTaskStore requires server and database when connection_string is not provided")
+        if not _module_available("pyodbc"):
+            raise ImportError("pyodbc is required for Azure SQL mode")
+        if not _module_available("azure.identity"):
+            raise ImportError("azure-identity is required for Azure SQL mode")
+        self._config = config
+        self._lock = Lock()
+        self._credential: DefaultAzureCredential | None = None
+        self._audit_writer: AuditWriter | None = None
+        if audit_async:
+            self._audit_writer = AuditWriter(self._write_audit_batch)
+            atexit.register(self._audit_writer.close)
+        # Schema checks are deferred to the first connection so constructing the
+        # store (at import, during scale-from-zero) costs no database round trips.
+        # The marker is per month, so a long-lived process re-checks it on the
+        # first connection of each new month (UTC) instead of only once.
+        self._init_schema = os.environ.get("TASK_DB_INIT_SCHEMA", "true").lower() != "false"
+        self._schema_month: str | None = None
+        self._schema_lock = Lock()
+
+    def _ensure_schema(self, conn: PyodbcConnection, month: str) -> None:
+        """Run the idempotent DDL unless the marker table already records this schema for ``month``."""
+        marker = f"{SQL_SCHEMA_VERSION}:{month}"
+        cursor = conn.cursor()
+        row = cursor.execute(SQL_SELECT_SCHEMA_VERSION).fetchone()
+        if row and row[0] == marker:
+            return
+        for statement in SQL_SCHEMA:
+            cursor.execute(statement)
+        cursor.execute(SQL_RECORD_SCHEMA_VERSION, (marker,))
+        conn.commit()
+
+    def _build_connection_string(self) -> str:
+        if self._config.connection_string:
+            return self._config.connection_string
+
+        parts = [
+            "Driver={ODBC Driver 18 for SQL Server};",
+            f"Server=tcp:{self._config.server},1433;",
+            f"Database={self._config.database};",
+            "Encrypt=yes;TrustServerCertificate=no;Connection Timeout=30;",
+        ]
+        if self._config.username and self._config.password:
+            parts.append(f"Uid={self._config.username};")
+            parts.append(f"Pwd={self._config.password};")
+        return "".join(parts)
+
+    def _get_token_bytes(self) -> bytes:
+        credential = self._get_credential()
+        token = credential.get_token(SQL_SCOPE)
+        return token.token.encode("utf-16-le")
+
+    def _get_credential(self) -> DefaultAzureCredential:
+        if self._credential is None:
+            from azure.identity import DefaultAzureCredential
+
+            self._credential = DefaultAzureCredential(
+                managed_identity_client_id=self._config.managed_identity_client_id,
+                exclude_interactive_browser_credential=True,
+            )
+        return self._credential
+
+    def _connect(self) -> PyodbcConnection:
+        import pyodbc
+
+        connection_string = self._build_connection_string()
+        kwargs: dict[str, Any] = {}
+        if not (self._config.username and self._config.password):
+            kwargs["attrs_before"] = {SQL_COPT_SS_ACCESS_TOKEN: self._get_token_bytes()}
+        conn = pyodbc.connect(connection_string, **kwargs)
+        conn.autocommit = False
+        if self._init_schema:
+            month = f"{datetime.now(timezone.utc):%Y-%m}"
+            if self._schema_month != month:
+                with self._schema_lock:
+                    if self._schema_month != month:
+                        self._ensure_schema(conn, month)
+                        self._schema_month = month
+        return conn
+
+    def _upsert_task(self, cursor: Any, task: Task, audit_row: AuditRow) -> bool:
+        """Write one task with its summary, audit and change rows; True if the task is new."""
+        previous = self._summary_key_for(cursor, task.task_id)
+        cursor.execute(SQL_MERGE_TASK, task.upsert_params())
+        status = previous[2] if previous else "open"
+        self._apply_summary_delta(cursor, previous, _summary_key(task.patient_id, task.category, status, task.due_date))
+        if self._audit_writer is None:
+            cursor.execute(SQL_INSERT_AUDIT, audit_row)
+        cursor.execute(SQL_INSERT_CHANGE, (task.task_id, task.patient_id, "upsert", task.updated_utc))
+        return previous is None
+
+    def upsert(self, task_json: dict[str, Any], *, event: dict[str, Any] | None = None) -> dict[str, str]:
+        """Insert or update one task; ``event`` is queued in the outbox only when the task is new."""
+        task = Task.from_json(task_json)
+        audit_row = (task.task_id, "upsert", "mcp-server", task.updated_utc, dumps_str(task_json, default=str))
+        outbox_row = _outbox_row(event, task.task_id, task.updated_utc) if event is not None else None
+        with self._lock, self._connect() as conn:
+            cursor = conn.cursor()
+            created = self._upsert_task(cursor, task, audit_row)
+            if outbox_row is not None and created:
+                cursor.execute(SQL_INSERT_OUTBOX, (*outbox_row, outbox_row[0]))
+            conn.commit()
+        if self._audit_writer is not None:
+            self._audit_writer.submit(audit_row)
+        return {"taskId": task.task_id}
+
+    def bulk_upsert(self, tasks: Iterable[dict[str, Any]], *, actor: str = "backfill") -> dict[str, int]:
+        """Upsert many tasks in one transaction (backfills); same rows as repeated ``upsert`` calls."""
+        now = datetime.now(timezone.utc).isoformat()
+        audit_rows: list[AuditRow] = []
+        with self._lock, self._connect() as conn:
+            cursor = conn.cursor()
+            for task_json in tasks:
+                task = Task.from_json(task_json, now=now)
+                audit_row = (task.task_id, "upsert", actor, task.updated_utc, dumps_str(task_json, default=str))
+                self._upsert_task(cursor, task, audit_row)
+                audit_rows.append(audit_row)
+            conn.commit()
+        if self._audit_writer is not None:
+            for audit_row in audit_rows:
+                self._audit_writer.submit(audit_row)
+        return {"upserted": len(audit_rows)}
+
+    def pending_outbox(self, limit: int = 100) -> list[dict[str, Any]]:
+        """Unsent outbox events, oldest first, as Event Grid events plus ``outboxId``."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            rows = cursor.execute(SQL_PENDING_OUTBOX, (limit,)).fetchall()
+            conn.commit()
+        return [_outbox_to_json(row) for row in rows]
+
+    def mark_outbox_sent(self, outbox_ids: Sequence[int]) -> None:
+        with self._connect() as conn:
+            conn.cursor().execute(
+                SQL_MARK_OUTBOX_SENT, (datetime.now(timezone.utc).isoformat(), dumps_str(list(outbox_ids)))
+            )
+            conn.commit()
+
+    def purge_outbox(self, *, sent_before: datetime) -> int:
+        """Delete outbox rows published before ``sent_before``; returns rows removed."""
+        with self._connect() as conn:
+            removed = conn.cursor().execute(SQL_PURGE_OUTBOX, (sent_before.isoformat(),)).rowcount
+            conn.commit()
+        return removed
+
+    def update_status(
+        self, task_id: str, status: str, *, expected_version: int, actor: str = "tasks-api"
+    ) -> dict[str, Any]:
+        """Move one task to ``status`` if it is still at ``expected_version``; raises TaskVersionConflict."""
+        result = self.bulk_update_status(
+            [{"taskId": task_id, "status": status, "version": expected_version}], actor=actor
+        )
+        if result["conflicts"]:
+            raise TaskVersionConflict(task_id, result["conflicts"][0]["currentVersion"])
+        return result["updated"][0]
+
+    def bulk_update_status(self, changes: Sequence[dict[str, Any]], *, actor: str = "tasks-api") -> dict[str, Any]:
+        """Apply compare-and-swap status changes with one set-based UPDATE and one commit."""
+        items = _status_changes(changes)
+        if not items:
+            return {"updated": [], "conflicts": []}
+        now = datetime.now(timezone.utc).isoformat()
+        payload = dumps_str([{"taskId": t, "status": s, "version": v} for t, s, v in items])
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            rows = cursor.execute(SQL_BULK_UPDATE_STATUS, (now, payload)).fetchall()
+            audit_rows: list[AuditRow] = []
+            change_rows = []
+            for task_id, patient_id, category, previous, status, due_date, version in rows:
+                self._apply_summary_delta(
+                    cursor,
+                    _summary_key(patient_id, category, previous, due_date),
+                    _summary_key(patient_id, category, status, due_date),
+                )
+                audit_rows.append(_status_audit_row(task_id, actor, now, previous, status, version))
+                change_rows.append((task_id, patient_id, "status", now))
+            applied = {row[0] for row in rows}
+            missed = [task_id for task_id, _, _ in items if task_id not in applied]
+            current: dict[str, int] = {}
+            if missed:
+                cursor.execute(SQL_SELECT_VERSIONS, (dumps_str(missed),))
+                current = {task_id: version for task_id, version in cursor.fetchall()}
+            if rows:
+                cursor.fast_executemany = True
+                cursor.executemany(SQL_INSERT_AUDIT, audit_rows)
+                cursor.executemany(SQL_INSERT_CHANGE, change_rows)
+            conn.commit()
+        return {
+            "updated": [{"taskId": row[0], "status": row[4], "version": row[6]} for row in rows],
+            "conflicts": [{"taskId": task_id, "currentVersion": current.get(task_id)} for task_id in missed],
+        }
+
+    @staticmethod
+    def _summary_key_for(cursor: Any, task_id: str) -> SummaryKey | None:
+        row = cursor.execute(SQL_SELECT_SUMMARY_KEY, (task_id,)).fetchone()
+        return _summary_key(*row) if row else None
+
+    @staticmethod
+    def _apply_summary_delta(cursor: Any, old: SummaryKey | None, new: SummaryKey | None) -> None:
+        if old == new:
+            return
+        if old is not None:
+            cursor.execute(SQL_SUMMARY_DECREMENT, (*old, *old))
+        if new is not None:
+            cursor.execute(SQL_SUMMARY_INCREMENT, new)
+
+    def summarize_patients(self, patient_ids: Sequence[str], *, as_of: str) -> dict[str, dict[str, Any]]:
+        """Open and overdue (due before ``as_of``) task counts per patient and category."""
+        if not patient_ids:
+            return {}
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_SUMMARIZE_PATIENTS, (as_of, dumps_str(list(patient_ids))))
+            rows = cursor.fetchall()
+        return _summaries_to_json(rows)
+
+    def check_task_summary(self, *, repair: bool = False) -> list[dict[str, Any]]:
+        """Recount ``care_tasks`` and diff it against the summary; optionally rebuild on mismatch."""
+        with self._lock, self._connect() as conn:
+            cursor = conn.cursor()
+            expected = {_summary_key(*row[:4]): row[4] for row in cursor.execute(SQL_COUNT_CARE_TASKS).fetchall()}
+            actual = {
+                tuple(row[:4]): row[4]
+                for row in cursor.execute(
+                    "select patient_id, category, status, due_date, task_count from dbo.patient_task_summary"
+                ).fetchall()
+            }
+            diffs = _diff_summaries(expected, actual)
+            if diffs and repair:
+                cursor.execute("delete from dbo.patient_task_summary")
+                if expected:
+                    cursor.fast_executemany = True
+                    cursor.executemany(
+                        "insert into dbo.patient_task_summary(patient_id, category, status, due_date, task_count) "
+                        "values (?, ?, ?, ?, ?)",
+                        [(*key, count) for key, count in expected.items()],
+                    )
+            conn.commit()
+        return diffs
+
+    def _write_audit_batch(self, rows: list[AuditRow]) -> None:
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.fast_executemany = True
+            cursor.executemany(SQL_INSERT_AUDIT, rows)
+            conn.commit()
+
+    def flush_audit(self, timeout: float | None = None) -> bool:
+        return self._audit_writer.flush(timeout) if self._audit_writer else True
+
+    def query_audit(
+        self,
+        task_id: str,
+        *,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """Audit entries for one task, newest first; the time range enables partition elimination."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                SQL_QUERY_AUDIT,
+                (limit, task_id, since or "0001-01-01", until or "9999-12-31"),
+            )
+            rows = cursor.fetchall()
+        return [_audit_row_to_json(row) for row in rows]
+
+    def rollover_audit(self, *, now: datetime | None = None, retain_months: int = 3) -> int:
+        """Pre-create next month's partition; old months already sit in their own partitions.
+
+        Archiving or truncating old partitions is left to the DBA (``alter table ... switch``
+        or ``truncate table ... with (partitions (...))``), so this never deletes rows.
+        """
+        with self._connect() as conn:
+            conn.cursor().execute(SQL_EXTEND_AUDIT_PARTITIONS)
+            conn.commit()
+        return 0
+
+
+def create_task_store(
+    *,
+    mode: str | None = None,
+    sqlite_path: str | Path,
+    sql_server: str | None = None,
+    sql_database: str | None = None,
+    sql_username: str | None = None,
+    sql_password: str | None = None,
+    sql_connection_string: str | None = None,
+    managed_identity_client_id: str | None = None,
+    postgres_dsn: str | None = None,
+    postgres_pool_min: int = 1,
+    postgres_pool_max: int = 10,
+    audit_async: bool = False,
+) -> SqliteTaskStore | AzureSqlTaskStore | PostgresTaskStore:
+    resolved_mode = (mode or "sqlite").lower()
+    if resolved_mode in {"sqlite", "local"}:
+        return SqliteTaskStore(sqlite_path, audit_async=audit_async)
+    if resolved_mode in {"postgres", "postgresql", "pg"}:
+        from common.task_store_postgres import PostgresTaskStore
+
+        return PostgresTaskStore(
+            postgres_dsn or "",
+            audit_async=audit_async,
+            min_connections=postgres_pool_min,
+            max_connections=postgres_pool_max,
+        )
+    if resolved_mode in {"azure-sql", "sql", "mssql"}:
+        config = AzureSqlConfig(
+            server=sql_server,
+            database=sql_database,
+            username=sql_username,
+            password=sql_password,
+            connection_string=sql_connection_string,
+            managed_identity_client_id=managed_identity_client_id,
+        )
+        return AzureSqlTaskStore(config, audit_async=audit_async)
+    raise ValueError(f"Unsupported TASK_DB_MODE: {resolved_mode}")
+
+
+# Backwards compatibility for tests importing TaskStore directly.
+TaskStore = SqliteTaskStore
+
+
+__all__ = [
+    "AuditWriter",
+    "SqliteTaskStore",
+    "AzureSqlTaskStore",
+    "AzureSqlConfig",
+    "TaskVersionConflict",
+    "create_task_store",
+    "TaskStore",
+]
@@ -0,0 +1,599 @@
+from __future__ import annotations
+
+import atexit
+import os
+import re
+from datetime import datetime, timezone
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
+
+from common.serialization import dumps_str
+from common.task_model import Task
+from common.task_store import (
+    AuditRow,
+    AuditWriter,
+    SummaryKey,
+    TaskVersionConflict,
+    _archive_month_start,
+    _audit_row_to_json,
+    _diff_summaries,
+    _module_available,
+    _next_month,
+    _outbox_row,
+    _outbox_to_json,
+    _status_audit_row,
+    _status_changes,
+    _summaries_to_json,
+    _summary_key,
+)
+
+# psycopg is only needed in Postgres mode and is imported on first connection.
+if TYPE_CHECKING:  # pragma: no cover
+    from psycopg import Connection, Cursor
+    from psycopg_pool import ConnectionPool
+else:  # pragma: no cover
+    Connection = Cursor = ConnectionPool = Any  # type: ignore
+
+PG_SCHEMA = (
+    """
+    create table if not exists care_tasks (
+      task_id text primary key,
+      patient_id text not null,
+      category text not null,
+      title text not null,
+      due_date date,
+      priority text not null,
+      source_encounter_id text,
+      status text not null default 'open',
+      created_utc timestamptz not null,
+      updated_utc timestamptz not null,
+      version integer not null default 1
+    )
+    """,
+    "create index if not exists ix_care_tasks_patient_open on care_tasks(patient_id, status)",
+    """
+    create table if not exists task_audit (
+      audit_id bigserial primary key,
+      task_id text not null,
+      action text not null,
+      actor text not null,
+      timestamp_utc timestamptz not null,
+      payload_json text
+    )
+    """,
+    "create index if not exists ix_task_audit_task_ts on task_audit(task_id, timestamp_utc)",
+    """
+    create table if not exists task_changes (
+      seq bigserial primary key,
+      task_id text not null,
+      patient_id text not null,
+      action text not null,
+      changed_utc timestamptz not null
+    )
+    """,
+    "create index if not exists ix_task_changes_patient_seq on task_changes(patient_id, seq)",
+    """
+    create table if not exists patient_task_summary (
+      patient_id text not null,
+      category text not null,
+      status text not null,
+      due_date text not null,
+      task_count integer not null,
+      primary key (patient_id, category, status, due_date)
+    )
+    """,
+    """
+    insert into patient_task_summary(patient_id, category, status, due_date, task_count)
+    select patient_id, category, status, coalesce(to_char(due_date, 'YYYY-MM-DD'), ''), count(*)
+    from care_tasks
+    where not exists (select 1 from patient_task_summary)
+    group by 1, 2, 3, 4
+    """,
+    """
+    create table if not exists task_outbox (
+      outbox_id bigserial primary key,
+      event_id text not null unique,
+      event_type text not null,
+      subject text not null,
+      data_json text not null,
+      created_utc timestamptz not null,
+      claimed_utc timestamptz,
+      sent_utc timestamptz
+    )
+    """,
+    "alter table task_outbox add column if not exists claimed_utc timestamptz",
+    "create index if not exists ix_task_outbox_pending on task_outbox(outbox_id) where sent_utc is null",
+)
+
+PG_UPSERT_TASK = """
+insert into care_tasks(
+  task_id, patient_id, category, title, due_date, priority,
+  source_encounter_id, status, created_utc, updated_utc
+) values (%s, %s, %s, %s, %s, %s, %s, 'open', %s, %s)
+on conflict (task_id) do update set
+  patient_id = excluded.patient_id,
+  category = excluded.category,
+  title = excluded.title,
+  due_date = excluded.due_date,
+  priority = excluded.priority,
+  source_encounter_id = excluded.source_encounter_id,
+  updated_utc = excluded.updated_utc,
+  version = care_tasks.version + 1
+"""
+
+# Serialises writers of one task id, including the first insert, which a row
+# lock cannot cover; the summary delta depends on the previous row.
+PG_LOCK_TASK = "select pg_advisory_xact_lock(hashtext(%s))"
+
+PG_SELECT_SUMMARY_KEY = """
+select patient_id, category, status, due_date from care_tasks where task_id = %s for update
+"""
+
+PG_INSERT_AUDIT = """
+insert into task_audit(task_id, action, actor, timestamp_utc, payload_json) values (%s, %s, %s, %s, %s)
+"""
+
+PG_INSERT_CHANGE = """
+insert into task_changes(task_id, patient_id, action, changed_utc) values (%s, %s, %s, %s)
+"""
+
+PG_INSERT_OUTBOX = """
+insert into task_outbox(event_id, event_type, subject, data_json, created_utc) values (%s, %s, %s, %s, %s)
+on conflict (event_id) do nothing
+"""
+
+# Claims rows for ``outbox_claim_seconds`` so relays on other replicas skip them;
+# skip locked keeps two concurrent claims from picking the same rows. A relay
+# that dies before marking its rows sent leaves them to be reclaimed.
+PG_PENDING_OUTBOX = """
+with claimable as (
+  select outbox_id from task_outbox
+  where sent_utc is null and (claimed_utc is null or claimed_utc < now() - make_interval(secs => %s))
+  order by outbox_id
+  limit %s
+  for update skip locked
+)
+update task_outbox o set claimed_utc = now()
+from claimable c
+where o.outbox_id = c.outbox_id
+returning o.outbox_id, o.event_id, o.event_type, o.subject, o.data_json, o.created_utc
+"""
+
+PG_MARK_OUTBOX_SENT = "update task_outbox set sent_utc = now() where outbox_id = any(%s)"
+
+PG_SUMMARY_DECREMENT = """
+with updated as (
+  update patient_task_summary set task_count = task_count - 1
+  where patient_id = %s and category = %s and status = %s and due_date = %s
+  returning patient_id, category, status, due_date, task_count
+)
+delete from patient_task_summary s using updated u
+where s.patient_id = u.patient_id and s.category = u.category and s.status = u.status
+  and s.due_date = u.due_date and u.task_count <= 0
+"""
+
+PG_SUMMARY_INCREMENT = """
+insert into patient_task_summary(patient_id, category, status, due_date, task_count)
+values (%s, %s, %s, %s, 1)
+on conflict (patient_id, category, status, due_date) do update set
+  task_count = patient_task_summary.task_count + 1
+"""
+
+# Set-based compare-and-swap: the locked subselect supplies the previous status.
+PG_BULK_UPDATE_STATUS = """
+update care_tasks t
+set status = c.status, version = t.version + 1, updated_utc = %s
+from unnest(%s::text[], %s::text[], %s::int[]) as c(task_id, status, version),
+  (select task_id, status from care_tasks where task_id = any(%s) for update) p
+where t.task_id = c.task_id and t.version = c.version and p.task_id = t.task_id
+returning t.task_id, t.patient_id, t.category, p.status, t.status, t.due_date, t.version
+"""
+
+PG_SELECT_VERSIONS = "select task_id, version from care_tasks where task_id = any(%s)"
+
+PG_SUMMARIZE_PATIENTS = """
+select patient_id, category,
+  sum(case when status = 'open' then task_count else 0 end)::int,
+  sum(case when status = 'open' and due_date <> '' and due_date < %s then task_count else 0 end)::int
+from patient_task_summary
+where patient_id = any(%s)
+group by patient_id, category
+"""
+
+PG_COUNT_CARE_TASKS = """
+select patient_id, category, status, due_date, count(*)
+from care_tasks
+group by patient_id, category, status, due_date
+"""
+
+# Bulk load: COPY into a per-transaction staging table, then one set-based
+# upsert. ``ord`` keeps the input order for audit/change rows and picks the
+# last occurrence when a task id repeats.
+PG_CREATE_STAGING = """
+create temp table task_staging (
+  ord bigint not null,
+  task_id text not null,
+  patient_id text not null,
+  category text not null,
+  title text not null,
+  due_date date,
+  priority text not null,
+  source_encounter_id text,
+  updated_utc timestamptz not null,
+  payload_json text
+) on commit drop
+"""
+
+PG_COPY_STAGING = """
+copy task_staging (
+  ord, task_id, patient_id, category, title, due_date, priority, source_encounter_id, updated_utc, payload_json
+) from stdin
+"""
+
+PG_STAGED_PATIENTS = """
+select patient_id from task_staging
+union
+select t.patient_id from care_tasks t join task_staging s on s.task_id = t.task_id
+"""
+
+PG_UPSERT_FROM_STAGING = """
+insert into care_tasks(
+  task_id, patient_id, category, title, due_date, priority,
+  source_encounter_id, status, created_utc, updated_utc
+)
+select distinct on (task_id)
+  task_id, patient_id, category, title, due_date, priority, source_encounter_id, 'open', updated_utc, updated_utc
+from task_staging
+order by task_id, ord desc
+on conflict (task_id) do update set
+  patient_id = excluded.patient_id,
+  category = excluded.category,
+  title = excluded.title,
+  due_date = excluded.due_date,
+  priority = excluded.priority,
+  source_encounter_id = excluded.source_encounter_id,
+  updated_utc = excluded.updated_utc,
+  version = care_tasks.version + 1
+"""
+
+PG_CLEAR_SUMMARY_FOR = "delete from patient_task_summary where patient_id = any(%s)"
+
+PG_REBUILD_SUMMARY_FOR = """
+insert into patient_task_summary(patient_id, category, status, due_date, task_count)
+select patient_id, category, status, coalesce(to_char(due_date, 'YYYY-MM-DD'), ''), count(*)
+from care_tasks
+where patient_id = any(%s)
+group by 1, 2, 3, 4
+"""
+
+PG_AUDIT_FROM_STAGING = """
+insert into task_audit(task_id, action, actor, timestamp_utc, payload_json)
+select task_id, 'upsert', %s, updated_utc, payload_json from task_staging order by ord
+"""
+
+PG_CHANGES_FROM_STAGING = """
+insert into task_changes(task_id, patient_id, action, changed_utc)
+select task_id, patient_id, 'upsert', updated_utc from task_staging order by ord
+"""
+
+_ARCHIVE_TABLE = re.compile(r"^task_audit_\d{6}$")
+
+
+class PostgresTaskStore:
+    """PostgreSQL-backed store (psycopg 3) for local integration and load tests against a real server.
+
+    Connections come from a ``psycopg_pool`` pool opened on first use; hot
+    statements are sent with ``prepare=True`` so each pooled connection
+    parses them once. ``bulk_upsert`` streams rows with COPY for backfills.
+    Audit rollover mirrors the SQLite store: old months move into
+    ``task_audit_YYYYMM`` tables.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        audit_async: bool = False,
+        min_connections: int = 1,
+        max_connections: int = 10,
+        outbox_claim_seconds: float = 30.0,
+    ) -> None:
+        if not dsn:
+            raise ValueError("PostgresTaskStore requires a DSN (TASK_DB_DSN)")
+        if not _module_available("psycopg") or not _module_available("psycopg_pool"):
+            raise ImportError("psycopg[binary,pool] is required for Postgres mode")
+        self._dsn = dsn
+        self._min_connections = min_connections
+        self._max_connections = max_connections
+        self.outbox_claim_seconds = outbox_claim_seconds
+        self._pool: ConnectionPool | None = None
+        self._pool_lock = Lock()
+        self._schema_verified = os.environ.get("TASK_DB_INIT_SCHEMA", "true").lower() == "false"
+        self._audit_writer: AuditWriter | None = None
+        if audit_async:
+            self._audit_writer = AuditWriter(self._write_audit_batch)
+            atexit.register(self._audit_writer.close)
+
+    def _get_pool(self) -> ConnectionPool:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    from psycopg_pool import ConnectionPool
+
+                    pool = ConnectionPool(
+                        self._dsn,
+                        min_size=self._min_connections,
+                        max_size=self._max_connections,
+                        open=True,
+                    )
+                    if not self._schema_verified:
+                        with pool.connection() as conn:
+                            for statement in PG_SCHEMA:
+                                conn.execute(statement)
+                        self._schema_verified = True
+                    self._pool = pool
+                    atexit.register(pool.close)
+        return self._pool
+
+    def _connection(self) -> Any:
+        """Pooled connection; commits when the block exits cleanly, rolls back otherwise."""
+        return self._get_pool().connection()
+
+    def close(self) -> None:
+        if self._audit_writer is not None:
+            self._audit_writer.flush()
+        if self._pool is not None:
+            self._pool.close()
+
+    @staticmethod
+    def _summary_key_for(cursor: Cursor, task_id: str) -> SummaryKey | None:
+        row = cursor.execute(PG_SELECT_SUMMARY_KEY, (task_id,), prepare=True).fetchone()
+        return _summary_key(*row) if row else None
+
+    @staticmethod
+    def _apply_summary_delta(cursor: Cursor, old: SummaryKey | None, new: SummaryKey | None) -> None:
+        if old == new:
+            return
+        if old is not None:
+            cursor.execute(PG_SUMMARY_DECREMENT, old, prepare=True)
+        if new is not None:
+            cursor.execute(PG_SUMMARY_INCREMENT, new, prepare=True)
+
+    def upsert(self, task_json: dict[str, Any], *, event: dict[str, Any] | None = None) -> dict[str, str]:
+        """Insert or update one task; ``event`` is queued in the outbox only when the task is new."""
+        task = Task.from_json(task_json)
+        raw_json = dumps_str(task_json, default=str)
+        audit_row = (task.task_id, "upsert", "mcp-server", task.updated_utc, raw_json)
+        outbox_row = _outbox_row(event, task.task_id, task.updated_utc) if event is not None else None
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute(PG_LOCK_TASK, (task.task_id,), prepare=True)
+            previous = self._summary_key_for(cursor, task.task_id)
+            cursor.execute(PG_UPSERT_TASK, (*task.upsert_params(), task.updated_utc), prepare=True)
+            status = previous[2] if previous else "open"
+            self._apply_summary_delta(
+                cursor, previous, _summary_key(task.patient_id, task.category, status, task.due_date)
+            )
+            if self._audit_writer is None:
+                cursor.execute(PG_INSERT_AUDIT, audit_row, prepare=True)
+            cursor.execute(
+                PG_INSERT_CHANGE, (task.task_id, task.patient_id, "upsert", task.updated_utc), prepare=True
+            )
+            if outbox_row is not None and previous is None:
+                cursor.execute(PG_INSERT_OUTBOX, outbox_row, prepare=True)
+        if self._audit_writer is not None:
+            self._audit_writer.submit(audit_row)
+        return {"taskId": task.task_id}
+
+    def bulk_upsert(self, tasks: Iterable[dict[str, Any]], *, actor: str = "backfill") -> dict[str, int]:
+        """Load many tasks in one transaction via COPY; audit and change rows are written alongside.
+
+        Touched patients have their summary rows rebuilt from ``care_tasks``
+        rather than adjusted per row. The table is locked against concurrent
+        writers for the duration, so run backfills off-peak.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        count = 0
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute("lock table care_tasks in share row exclusive mode")
+            cursor.execute(PG_CREATE_STAGING)
+            with cursor.copy(PG_COPY_STAGING) as copy:
+                for task_json in tasks:
+                    task = Task.from_json(task_json, now=now)
+                    copy.write_row(
+                        (
+                            count,
+                            task.task_id,
+                            task.patient_id,
+                            task.category,
+                            task.title,
+                            task.due_date,
+                            task.priority,
+                            task.source_encounter_id,
+                            task.updated_utc,
+                            dumps_str(task_json, default=str),
+                        )
+                    )
+                    count += 1
+            if not count:
+                return {"upserted": 0}
+            patients = [row[0] for row in cursor.execute(PG_STAGED_PATIENTS).fetchall()]
+            cursor.execute(PG_UPSERT_FROM_STAGING)
+            cursor.execute(PG_CLEAR_SUMMARY_FOR, (patients,))
+            cursor.execute(PG_REBUILD_SUMMARY_FOR, (patients,))
+            cursor.execute(PG_AUDIT_FROM_STAGING, (actor,))
+            cursor.execute(PG_CHANGES_FROM_STAGING)
+        return {"upserted": count}
+
+    def pending_outbox(self, limit: int = 100) -> list[dict[str, Any]]:
+        """Claim unsent outbox events, oldest first, as Event Grid events plus ``outboxId``.
+
+        Claimed rows are hidden from other callers for ``outbox_claim_seconds``
+        unless marked sent first, so relays on several replicas do not publish
+        the same rows.
+        """
+        with self._connection() as conn:
+            rows = conn.execute(PG_PENDING_OUTBOX, (self.outbox_claim_seconds, limit), prepare=True).fetchall()
+        return [_outbox_to_json(row) for row in sorted(rows)]
+
+    def mark_outbox_sent(self, outbox_ids: Sequence[int]) -> None:
+        with self._connection() as conn:
+            conn.execute(PG_MARK_OUTBOX_SENT, (list(outbox_ids),), prepare=True)
+
+    def purge_outbox(self, *, sent_before: datetime) -> int:
+        """Delete outbox rows published before ``sent_before``; returns rows removed."""
+        with self._connection() as conn:
+            return conn.execute(
+                "delete from task_outbox where sent_utc is not null and sent_utc < %s", (sent_before,)
+            ).rowcount
+
+    def update_status(
+        self, task_id: str, status: str, *, expected_version: int, actor: str = "tasks-api"
+    ) -> dict[str, Any]:
+        """Move one task to ``status`` if it is still at ``expected_version``; raises TaskVersionConflict."""
+        result = self.bulk_update_status(
+            [{"taskId": task_id, "status": status, "version": expected_version}], actor=actor
+        )
+        if result["conflicts"]:
+            raise TaskVersionConflict(task_id, result["conflicts"][0]["currentVersion"])
+        return result["updated"][0]
+
+    def bulk_update_status(self, changes: Sequence[dict[str, Any]], *, actor: str = "tasks-api") -> dict[str, Any]:
+        """Apply compare-and-swap status changes with one set-based UPDATE and one commit."""
+        items = _status_changes(changes)
+        if not items:
+            return {"updated": [], "conflicts": []}
+        now = datetime.now(timezone.utc).isoformat()
+        task_ids = [task_id for task_id, _, _ in items]
+        with self._connection() as conn, conn.cursor() as cursor:
+            rows = cursor.execute(
+                PG_BULK_UPDATE_STATUS,
+                (now, task_ids, [s for _, s, _ in items], [v for _, _, v in items], task_ids),
+                prepare=True,
+            ).fetchall()
+            audit_rows: list[AuditRow] = []
+            change_rows = []
+            for task_id, patient_id, category, previous, status, due_date, version in rows:
+                self._apply_summary_delta(
+                    cursor,
+                    _summary_key(patient_id, category, previous, due_date),
+                    _summary_key(patient_id, category, status, due_date),
+                )
+                audit_rows.append(_status_audit_row(task_id, actor, now, previous, status, version))
+                change_rows.append((task_id, patient_id, "status", now))
+            applied = {row[0] for row in rows}
+            missed = [task_id for task_id in task_ids if task_id not in applied]
+            current: dict[str, int] = {}
+            if missed:
+                current = dict(cursor.execute(PG_SELECT_VERSIONS, (missed,), prepare=True).fetchall())
+            if rows:
+                cursor.executemany(PG_INSERT_AUDIT, audit_rows)
+                cursor.executemany(PG_INSERT_CHANGE, change_rows)
+        return {
+            "updated": [{"taskId": row[0], "status": row[4], "version": row[6]} for row in rows],
+            "conflicts": [{"taskId": task_id, "currentVersion": current.get(task_id)} for task_id in missed],
+        }
+
+    def summarize_patients(self, patient_ids: Sequence[str], *, as_of: str) -> dict[str, dict[str, Any]]:
+        """Open and overdue (due before ``as_of``) task counts per patient and category."""
+        if not patient_ids:
+            return {}
+        with self._connection() as conn:
+            rows = conn.execute(PG_SUMMARIZE_PATIENTS, (as_of, list(patient_ids)), prepare=True).fetchall()
+        return _summaries_to_json(rows)
+
+    def check_task_summary(self, *, repair: bool = False) -> list[dict[str, Any]]:
+        """Recount ``care_tasks`` and diff it against the summary; optionally rebuild on mismatch."""
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute("lock table care_tasks in share mode")
+            expected = {_summary_key(*row[:4]): row[4] for row in cursor.execute(PG_COUNT_CARE_TASKS).fetchall()}
+            actual = {
+                tuple(row[:4]): row[4]
+                for row in cursor.execute(
+                    "select patient_id, category, status, due_date, task_count from patient_task_summary"
+                ).fetchall()
+            }
+            diffs = _diff_summaries(expected, actual)
+            if diffs and repair:
+                cursor.execute("delete from patient_task_summary")
+                with cursor.copy(
+                    "copy patient_task_summary(patient_id, category, status, due_date, task_count) from stdin"
+                ) as copy:
+                    for key, count in expected.items():
+                        copy.write_row((*key, count))
+        return diffs
+
+    def _write_audit_batch(self, rows: list[AuditRow]) -> None:
+        with self._connection() as conn, conn.cursor() as cursor:
+            with cursor.copy(
+                "copy task_audit(task_id, action, actor, timestamp_utc, payload_json) from stdin"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+    def flush_audit(self, timeout: float | None = None) -> bool:
+        return self._audit_writer.flush(timeout) if self._audit_writer else True
+
+    def _archive_tables(self, conn: Connection) -> list[str]:
+        rows = conn.execute(
+            "select tablename from pg_tables where schemaname = current_schema() "
+            "and tablename like 'task\\_audit\\_%' order by tablename"
+        ).fetchall()
+        return [row[0] for row in rows if _ARCHIVE_TABLE.match(row[0])]
+
+    def query_audit(
+        self,
+        task_id: str,
+        *,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """Audit entries for one task, newest first, across the live table and monthly archives."""
+        bounds = (task_id, since or "0001-01-01", until or "9999-12-31")
+        with self._connection() as conn:
+            tables = ["task_audit"]
+            for name in self._archive_tables(conn):
+                month = f"{name[-6:-2]}-{name[-2:]}"
+                if (since and month < since[:7]) or (until and month > until[:7]):
+                    continue
+                tables.append(name)
+            query = " union all ".join(
+                f"select audit_id, task_id, action, actor, timestamp_utc, payload_json from {table} "
+                "where task_id = %s and timestamp_utc >= %s and timestamp_utc < %s"
+                for table in tables
+            )
+            rows = conn.execute(
+                f"{query} order by timestamp_utc desc, audit_id desc limit %s", (*bounds * len(tables), limit)
+            ).fetchall()
+        return [_audit_row_to_json(row) for row in rows]
+
+    def rollover_audit(self, *, now: datetime | None = None, retain_months: int = 3) -> int:
+        """Move audit rows older than ``retain_months`` into ``task_audit_YYYYMM`` tables; returns rows moved."""
+        self.flush_audit()
+        cutoff = _archive_month_start(now, retain_months)
+        moved = 0
+        with self._connection() as conn, conn.cursor() as cursor:
+            months = cursor.execute(
+                "select distinct to_char(timestamp_utc at time zone 'UTC', 'YYYY-MM') from task_audit "
+                "where timestamp_utc < %s order by 1",
+                (cutoff,),
+            ).fetchall()
+            for (month,) in months:
+                table = f"task_audit_{month.replace('-', '')}"
+                cursor.execute(f"create table if not exists {table} (like task_audit including indexes)")
+                lower = datetime.fromisoformat(f"{month}-01").replace(tzinfo=timezone.utc)
+                upper = min(datetime.fromisoformat(_next_month(month)).replace(tzinfo=timezone.utc), cutoff)
+                cursor.execute(
+                    f"""
+                    with moved as (
+                      delete from task_audit where timestamp_utc >= %s and timestamp_utc < %s returning *
+                    )
+                    insert into {table} select * from moved
+                    """,
+                    (lower, upper),
+                )
+                moved += cursor.rowcount
+        return moved
+
+
+__all__ = ["PG_SCHEMA", "PostgresTaskStore"]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+import requests
+from flask import Flask, jsonify, request
+
+from cache import ResponseCache
+from common.llm import create_llm_backend
+from common.serialization import dumps, loads
+from common.server import register_shutdown, serve_wsgi
+from summarizer import Summarizer
+
+app = Flask(__name__)
+
+FHIR_BASE_URL = os.environ.get("FHIR_BASE_URL", "http://mock-fhir:8080/fhir")
+HTTP_TIMEOUT_SECONDS = float(os.environ.get("HTTP_TIMEOUT_SECONDS", "10"))
+CACHE_MAX_ENTRIES = int(os.environ.get("COPILOT_CACHE_MAX_ENTRIES", "2048"))
+CACHE_TTL_SECONDS = float(os.environ.get("COPILOT_CACHE_TTL_SECONDS", "86400"))
+
+SESSION = requests.Session()
+register_shutdown(SESSION.close)
+
+
+class DocumentFetchError(RuntimeError):
+    """The FHIR server did not return the DocumentReference."""
+
+
+def fetch_document(patient_id: str, encounter_id: str | None, document_id: str) -> Dict[str, Any]:
+    # Wrapped so a FHIR failure is not confused with the LLM backend's requests errors.
+    try:
+        response = SESSION.get(f"{FHIR_BASE_URL}/DocumentReference/{document_id}", timeout=HTTP_TIMEOUT_SECONDS)
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        raise DocumentFetchError(f"document {document_id}: {type(exc).__name__}") from exc
+    return loads(response.content)
+
+
+SUMMARIZER = Summarizer(
+    create_llm_backend(),
+    fetch_document,
+    cache=ResponseCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS),
+)
+
+
+@app.post("/copilot/summarize")
+def summarize():
+    body = request.get_json(silent=True) or {}
+    missing = [field for field in ("patientId", "encounterId", "documentId") if not body.get(field)]
+    if missing:
+        return jsonify({"error": f"missing fields: {', '.join(missing)}"}), 400
+    try:
+        result = SUMMARIZER.summarize(body["patientId"], body["encounterId"], body["documentId"])
+    except DocumentFetchError:
+        return jsonify({"error": "document fetch failed"}), 502
+    except requests.Timeout:
+        return jsonify({"error": "summarizer model timed out"}), 504
+    except requests.RequestException:
+        return jsonify({"error": "summarizer model request failed"}), 502
+    return app.response_class(dumps(result), mimetype="application/json")
+
+
+@app.get("/metrics")
+def metrics():
+    lines = [f"copilot_{name}_total {value}" for name, value in SUMMARIZER.stats.items()]
+    lines.append(f"copilot_cache_entries {len(SUMMARIZER.cache)}")
+    return app.response_class("\n".join(lines) + "\n", mimetype="text/plain")
+
+
+@app.get("/healthz")
+def healthz() -> tuple[str, int]:
+    return "ok", 200
+
+
+if __name__ == "__main__":
+    # The response cache and request coalescing are per process; threads share them.
+    serve_wsgi(app, default_port=7200)
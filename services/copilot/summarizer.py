@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+from threading import Lock
+from typing import Any, Callable, Dict
+
+from cache import ResponseCache, SingleFlight
+from common.fhir import decode_document_text
+from common.llm import LlmBackend, LlmOutputError, load_prompt, parse_followups, prompt_hash
+from common.phi import scrub
+
+logger = logging.getLogger("copilot")
+
+CacheKey = tuple[str, str, str]  # document_id, document version, prompt hash
+
+
+def document_version(document: Dict[str, Any], text: str) -> str:
+    """FHIR ``meta.versionId`` (or ``lastUpdated``), falling back to a content hash for servers without meta."""
+    meta = document.get("meta") or {}
+    version = meta.get("versionId") or meta.get("lastUpdated")
+    if version:
+        return str(version)
+    return "sha256:" + hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class Summarizer:
+    """Summary plus follow-ups for one discharge document, cached and coalesced.
+
+    Results are keyed by (documentId, document version, prompt hash), so an
+    edited note or a prompt/model change misses the cache while repeat views
+    never reach the model. Concurrent misses on the same key share a single
+    backend call through ``SingleFlight``. Notes are PHI-scrubbed before they
+    reach the model (the phi_scrub guardrail), and every caller gets its own
+    copy of the result.
+    """
+
+    def __init__(
+        self,
+        backend: LlmBackend,
+        fetch_document: Callable[[str, str | None, str], Dict[str, Any]],
+        *,
+        cache: ResponseCache | None = None,
+        summarize_prompt: str | None = None,
+        extract_prompt: str | None = None,
+    ) -> None:
+        self.backend = backend
+        self._fetch_document = fetch_document
+        self.cache = cache or ResponseCache()
+        self._flights: SingleFlight[Dict[str, Any]] = SingleFlight()
+        self.summarize_prompt = summarize_prompt or load_prompt("summarize")
+        self.extract_prompt = extract_prompt or load_prompt("extract_followups")
+        self.prompt_hash = prompt_hash(backend.name, self.summarize_prompt, self.extract_prompt)
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "backend_calls": 0}
+        self._stats_lock = Lock()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def summarize(self, patient_id: str, encounter_id: str | None, document_id: str) -> Dict[str, Any]:
+        document = self._fetch_document(patient_id, encounter_id, document_id)
+        text = scrub(decode_document_text(document))
+        key: CacheKey = (document_id, document_version(document, text), self.prompt_hash)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count("hits")
+            return copy.deepcopy(cached)
+        result, shared = self._flights.do(key, lambda: self._generate(key, text))
+        self._count("coalesced" if shared else "misses")
+        # Cached and coalesced results are shared; callers may mutate theirs.
+        return copy.deepcopy(result)
+
+    def _generate(self, key: CacheKey, text: str) -> Dict[str, Any]:
+        summary = self.backend.complete(self.summarize_prompt, text)
+        completion = self.backend.complete(self.extract_prompt, text)
+        self._count("backend_calls", 2)
+        try:
+            followups = parse_followups(completion)
+        except LlmOutputError as exc:
+            # Keep the summary; an invalid extraction is logged and not cached.
+            logger.warning("discarding invalid follow-up extraction for %s: %s", key[0], exc)
+            return {"summary": summary.strip(), "followUps": []}
+        result = {"summary": summary.strip(), "followUps": followups}
+        self.cache.set(key, result)
+        return result
+
+
+__all__ = ["Summarizer", "document_version"]
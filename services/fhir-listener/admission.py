@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Dict
+
+ADMITTED = "admitted"
+REJECT_GLOBAL = "global"
+REJECT_PATIENT = "patient"
+REJECT_QUEUE = "queue"
+
+
+class TokenBucket:
+    """Classic token bucket; ``rate`` tokens per second up to ``burst``. Not thread-safe on its own."""
+
+    def __init__(self, rate: float, burst: float, *, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = now
+
+    def refill(self, now: float, rate: float | None = None) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self.tokens = min(self.burst, self.tokens + elapsed * (self.rate if rate is None else rate))
+        self._updated = now
+
+    def deficit(self, cost: float) -> float:
+        """Tokens missing for ``cost`` (capped at the burst so large batches can still get in)."""
+        return max(0.0, min(cost, self.burst) - self.tokens)
+
+    def take(self, cost: float) -> None:
+        self.tokens -= min(cost, self.burst)
+
+
+@dataclass(frozen=True, slots=True)
+class AdmissionDecision:
+    admitted: bool
+    reason: str = ADMITTED
+    retry_after: float = 0.0
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class AdmissionController:
+    """Token-bucket admission for ``/events``: one global bucket plus one per patient.
+
+    A delivery is admitted whole or rejected whole, since Event Grid retries
+    the whole delivery. The global refill rate is scaled by a pressure factor
+    in ``[min_fraction, 1]``: the ratio of ``latency_target`` to the EWMA of
+    event processing time (failures count as slow), times the free fraction of
+    ``max_queue_depth``. A full queue rejects outright. Per-patient buckets
+    stop one noisy patient from consuming the global budget and are capped at
+    ``max_patients`` (least recently used evicted).
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = 50.0,
+        burst: float = 200.0,
+        patient_rate: float = 1.0,
+        patient_burst: float = 10.0,
+        latency_target: float = 2.0,
+        max_queue_depth: int = 1000,
+        queue_depth: Callable[[], int] = lambda: 0,
+        min_fraction: float = 0.1,
+        ewma_alpha: float = 0.2,
+        max_patients: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.patient_rate = patient_rate
+        self.patient_burst = patient_burst
+        self.latency_target = latency_target
+        self.max_queue_depth = max_queue_depth
+        self.min_fraction = min_fraction
+        self.ewma_alpha = ewma_alpha
+        self.max_patients = max_patients
+        self._queue_depth = queue_depth
+        self._clock = clock
+        self._lock = Lock()
+        self._global = TokenBucket(rate, burst, now=clock())
+        self._patients: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._latency = 0.0
+        self.counts: Dict[str, int] = {ADMITTED: 0, REJECT_GLOBAL: 0, REJECT_PATIENT: 0, REJECT_QUEUE: 0}
+
+    def observe(self, latency: float, ok: bool = True) -> None:
+        """Feed one event's processing time into the latency estimate."""
+        sample = latency if ok else max(latency, 2 * self.latency_target)
+        with self._lock:
+            self._latency = sample if not self._latency else self._latency + self.ewma_alpha * (sample - self._latency)
+
+    def _pressure(self, depth: int) -> float:
+        latency_factor = min(1.0, self.latency_target / self._latency) if self._latency else 1.0
+        queue_factor = max(0.0, 1.0 - depth / self.max_queue_depth)
+        return max(self.min_fraction, latency_factor * queue_factor)
+
+    def pressure(self) -> float:
+        """Current fraction of ``rate`` the global bucket refills at."""
+        with self._lock:
+            return self._pressure(self._queue_depth())
+
+    def _patient_bucket(self, patient_id: str, now: float) -> TokenBucket:
+        bucket = self._patients.get(patient_id)
+        if bucket is None:
+            bucket = self._patients[patient_id] = TokenBucket(self.patient_rate, self.patient_burst, now=now)
+            while len(self._patients) > self.max_patients:
+                self._patients.popitem(last=False)
+        else:
+            self._patients.move_to_end(patient_id)
+        return bucket
+
+    def admit(self, patient_counts: Dict[str, int]) -> AdmissionDecision:
+        """Admit a delivery carrying ``patient_counts[patientId]`` events per patient."""
+        cost = sum(patient_counts.values())
+        if not cost:
+            return AdmissionDecision(True)
+        depth = self._queue_depth()
+        with self._lock:
+            now = self._clock()
+            if depth >= self.max_queue_depth:
+                # Nothing drains faster than the queue; ask for roughly one latency period.
+                return self._reject(REJECT_QUEUE, max(self._latency, self.latency_target))
+            effective_rate = self.rate * self._pressure(depth)
+            self._global.refill(now, effective_rate)
+            missing = self._global.deficit(cost)
+            if missing:
+                return self._reject(REJECT_GLOBAL, missing / effective_rate)
+            buckets = []
+            for patient_id, count in patient_counts.items():
+                bucket = self._patient_bucket(patient_id, now)
+                bucket.refill(now)
+                missing = bucket.deficit(count)
+                if missing:
+                    return self._reject(REJECT_PATIENT, missing / self.patient_rate)
+                buckets.append((bucket, count))
+            self._global.take(cost)
+            for bucket, count in buckets:
+                bucket.take(count)
+            self.counts[ADMITTED] += 1
+            return AdmissionDecision(True)
+
+    def _reject(self, reason: str, retry_after: float) -> AdmissionDecision:
+        self.counts[reason] += 1
+        return AdmissionDecision(False, reason, retry_after)
+
+    def render_metrics(self) -> str:
+        with self._lock:
+            counts = dict(self.counts)
+            latency = self._latency
+        lines = [
+            "# HELP listener_admission_total Event deliveries by admission outcome.",
+            "# TYPE listener_admission_total counter",
+        ]
+        for outcome, count in counts.items():
+            lines.append(f'listener_admission_total{{outcome="{outcome}"}} {count}')
+        lines += [
+            "# HELP listener_admission_pressure Fraction of the global rate currently admitted.",
+            "# TYPE listener_admission_pressure gauge",
+            f"listener_admission_pressure {self.pressure():.4f}",
+            "# HELP listener_admission_latency_seconds EWMA of event processing time.",
+            "# TYPE listener_admission_latency_seconds gauge",
+            f"listener_admission_latency_seconds {latency:.6f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+__all__ = ["AdmissionController", "AdmissionDecision", "TokenBucket"]
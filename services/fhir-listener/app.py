@@ -1,17 +1,32 @@
 from __future__ import annotations
 
+import hashlib
+import hmac
 import json
 import logging
 import os
 import time
+from collections import Counter
+from concurrent.futures import wait
 from pathlib import Path
 from typing import Any, Dict, List
+from uuid import uuid4
 
-import requests
 from flask import Flask, jsonify, request
 
+from admission import AdmissionController
+from common.llm import create_llm_backend
+from common.phi import scrub, scrub_value
+from common.schemas import load_event_schemas
+from common.serialization import PayloadError, decode_events, dumps, loads
+from common.server import ServerOptions, register_shutdown, serve_wsgi
 from event_store import EventStore
-from extractor import extract_followups
+from extractor import decode_document_text, extract_followups
+from hybrid_extractor import HybridExtractor
+from partitioner import PartitionedExecutor
+from profiling import EventProfiler, record_stage, stage
+from resilience import CircuitOpenError, ConcurrencyLimitExceeded, ResilienceRegistry
+from replay import DEFAULT_REPLAY_CONCURRENCY, failure_reason, replay_dead_letters
 
 app = Flask(__name__)
 
@@ -28,20 +43,129 @@ EVENT_STORE_PATH = os.environ.get(
 EVENT_STORE = EventStore(EVENT_STORE_PATH)
 DEFAULT_RETRIES = int(os.environ.get("MCP_RETRIES", "3"))
 DEFAULT_TIMEOUT = int(os.environ.get("MCP_TIMEOUT_SECONDS", "10"))
+MCP_BATCH_ENABLED = os.environ.get("MCP_BATCH_ENABLED", "true").lower() != "false"
+# TaskCreated rides along with upsert_task into mcp-server's outbox, committed
+# with the task and published by its relay; false emits it as a separate call.
+TASK_OUTBOX_ENABLED = os.environ.get("TASK_OUTBOX_ENABLED", "true").lower() != "false"
+MAX_INLINE_ATTEMPTS = int(os.environ.get("DEAD_LETTER_MAX_ATTEMPTS", "5"))
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+GRACEFUL_TIMEOUT_SECONDS = float(os.environ.get("GRACEFUL_TIMEOUT_SECONDS", "30"))
+# "hybrid": rules first, unconfident notes go to the LLM (LLM_BACKEND); "rules": rule chain only.
+# Hybrid is only the default when LLM_BACKEND names a real model, never the stub.
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "").lower()
+EXTRACTION_MODE = os.environ.get(
+    "EXTRACTION_MODE", "hybrid" if LLM_BACKEND and LLM_BACKEND != "stub" else "rules"
+).lower()
+HYBRID_EXTRACTOR = (
+    HybridExtractor(
+        create_llm_backend(),
+        max_batch=int(os.environ.get("LLM_BATCH_MAX_NOTES", "8")),
+        max_wait=float(os.environ.get("LLM_BATCH_MAX_WAIT_SECONDS", "0.02")),
+        timeout=float(os.environ.get("LLM_TIMEOUT_SECONDS", "60")),
+    )
+    if EXTRACTION_MODE == "hybrid"
+    else None
+)
+
+# Compiled once at startup; DischargeCreated guards the inbound edge and
+# TaskCreated the payloads emitted per follow-up.
+EVENT_SCHEMAS = load_event_schemas()
+DISCHARGE_SCHEMA = EVENT_SCHEMAS["DischargeCreated"]
+TASK_CREATED_SCHEMA = EVENT_SCHEMAS["TaskCreated"]
+
+# Events are processed on ordered lanes keyed by patient: patients run in
+# parallel, one patient's events apply in arrival order. Lanes, like the
+# has_seen/record de-duplication, are per process, so the listener refuses to
+# start with more than one worker (see __main__).
+EVENT_PARTITIONS = PartitionedExecutor(
+    int(os.environ.get("LISTENER_PARTITIONS", str(max(4, os.cpu_count() or 1)))),
+    name="event-partition",
+)
+register_shutdown(lambda: EVENT_PARTITIONS.shutdown(timeout=GRACEFUL_TIMEOUT_SECONDS))
+
+# Deliveries over budget get 429 + Retry-After so Event Grid backs off instead
+# of piling work onto mcp-server and SQL. The budget shrinks as event latency
+# rises above target or the partition queues fill.
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "true").lower() != "false"
+ADMISSION = AdmissionController(
+    rate=float(os.environ.get("ADMISSION_RATE", "50")),
+    burst=float(os.environ.get("ADMISSION_BURST", "200")),
+    patient_rate=float(os.environ.get("ADMISSION_PATIENT_RATE", "1")),
+    patient_burst=float(os.environ.get("ADMISSION_PATIENT_BURST", "10")),
+    latency_target=float(os.environ.get("ADMISSION_LATENCY_TARGET_SECONDS", "2.0")),
+    max_queue_depth=int(os.environ.get("ADMISSION_MAX_QUEUE_DEPTH", "1000")),
+    queue_depth=lambda: sum(EVENT_PARTITIONS.depths()),
+)
+
+# Events slower than SLOW_EVENT_SECONDS are logged with a per-stage breakdown
+# (ids and timings only). LISTENER_PROFILE=true, or POST /admin/profiling,
+# also runs events under cProfile and keeps the top functions of slow ones.
+PROFILER = EventProfiler(
+    slow_threshold=float(os.environ.get("SLOW_EVENT_SECONDS", "2.0")),
+    log=lambda message, **fields: _log_safe(message, **fields),
+    profiling=os.environ.get("LISTENER_PROFILE", "false").lower() == "true",
+    profile_dir=os.environ.get("LISTENER_PROFILE_DIR") or None,
+    top=int(os.environ.get("LISTENER_PROFILE_TOP", "25")),
+)
+
+# Each MCP tool fronts one downstream; breakers and limiters are keyed on both so a
+# degraded FHIR server does not trip the SQL-backed upserts and vice versa.
+MCP_DOWNSTREAMS = {
+    "get_fhir_document": "fhir",
+    "upsert_task": "sql",
+    "emit_eventgrid": "eventgrid",
+}
+RESILIENCE = ResilienceRegistry(
+    failure_threshold=int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "5")),
+    reset_timeout=float(os.environ.get("BREAKER_RESET_SECONDS", "30")),
+    initial_limit=float(os.environ.get("CONCURRENCY_INITIAL_LIMIT", "16")),
+    max_limit=float(os.environ.get("CONCURRENCY_MAX_LIMIT", "128")),
+    latency_target=float(os.environ.get("CONCURRENCY_LATENCY_TARGET_SECONDS", "1.0")),
+)
+
+
+_HTTP: Any = None
+
+
+def _http() -> Any:
+    """Pooled ``requests.Session``, imported on the first MCP call to keep cold start short."""
+    global _HTTP
+    if _HTTP is None:
+        import requests
+
+        _HTTP = requests.Session()
+    return _HTTP
+
+
+class McpToolError(RuntimeError):
+    """JSON-RPC error returned by mcp-server; not retried."""
+
+
+# JSON-RPC error codes meaning the tool's downstream failed (mcp-server's
+# TOOL_ERROR, or a generic internal error). Everything else, such as invalid
+# params from a schema rejection, an unknown method or a skipped dependency,
+# came back from a healthy dependency and never counts against a breaker.
+DOWNSTREAM_FAILURE_CODES = frozenset({-32000, -32603})
+
+
+def _downstream_failed(error: Any) -> bool:
+    return isinstance(error, dict) and error.get("code") in DOWNSTREAM_FAILURE_CODES
+
 
+class EventValidationError(ValueError):
+    """An event or a payload derived from it violates its schema; retrying cannot help."""
 
-def _as_event_list(payload: Any) -> List[Dict[str, Any]]:
-    if isinstance(payload, list):
-        return [evt for evt in payload if isinstance(evt, dict)]
-    if isinstance(payload, dict):
-        return [payload]
-    return []
+    def __init__(self, what: str, errors: List[str]) -> None:
+        super().__init__(f"{what} failed schema validation: {'; '.join(errors)}")
+        self.errors = errors
 
 
 def _log_safe(message: str, **fields: Any) -> None:
     safe_fields = {k: v for k, v in fields.items() if v is not None}
     if SAFE_MODE:
         safe_fields.pop("raw", None)
+        message = scrub(message, names=())
+        safe_fields = scrub_value(safe_fields)
     if safe_fields:
         logger.info("%s %s", message, safe_fields)
     else:
@@ -49,27 +173,146 @@ def _log_safe(message: str, **fields: Any) -> None:
 
 
 def mcp_call(method: str, params: Dict[str, Any], retries: int = DEFAULT_RETRIES) -> Dict[str, Any]:
-    payload = {"jsonrpc": "2.0", "id": "1", "method": f"tools/{method}", "params": params}
-    delay = 0.5
+    payload = dumps({"jsonrpc": "2.0", "id": uuid4().hex, "method": f"tools/{method}", "params": params})
+    downstream = MCP_DOWNSTREAMS.get(method, "mcp")
+    # Retries are immediate: they cover a stale pooled connection or a dropped
+    # response. Longer outages trip the breaker and fail the event, and Event
+    # Grid's redelivery backoff spaces the next try without parking this lane.
     for attempt in range(retries):
         try:
-            response = requests.post(MCP_URL, json=payload, timeout=DEFAULT_TIMEOUT)
-            response.raise_for_status()
-            body = response.json()
+            with RESILIENCE.guard(*_breakers_for(method), limiter_name=downstream):
+                response = _http().post(
+                    MCP_URL,
+                    data=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=DEFAULT_TIMEOUT,
+                )
+                response.raise_for_status()
+                body = loads(response.content)
+                if _downstream_failed(body.get("error")):
+                    raise McpToolError(f"mcp error {method}: {json.dumps(body['error'])}")
+        except (CircuitOpenError, ConcurrencyLimitExceeded):
+            # Fail fast instead of sleeping through the retry budget.
+            _log_safe("mcp call shed", method=method, downstream=downstream)
+            raise
+        except McpToolError:
+            raise
         except Exception as exc:  # network failure or decode error
             if attempt == retries - 1:
                 _log_safe("mcp call failed", method=method)
                 raise
-            time.sleep(delay)
-            delay *= 2
             continue
         if "error" in body:
-            error = body["error"]
-            raise RuntimeError(f"mcp error {method}: {json.dumps(error)}")
+            # A rejected call: raised only after the guard recorded a healthy round trip.
+            raise McpToolError(f"mcp error {method}: {json.dumps(body['error'])}")
         return body.get("result", {})
     return {}
 
 
+def mcp_batch(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run several tool calls in one JSON-RPC batch round trip.
+
+    Each call is ``{"method", "params"}`` plus an optional ``dependsOn`` index of
+    an earlier call that must succeed first. Returns one ``{"result": ...}`` or
+    ``{"error": ...}`` entry per call, in order. With ``MCP_BATCH_ENABLED=false``
+    the calls are issued one by one with the same semantics.
+    """
+    stage_names = _stage_names(calls)
+    if not MCP_BATCH_ENABLED:
+        outcomes: List[Dict[str, Any]] = []
+        for call, stage_name in zip(calls, stage_names):
+            dependency = call.get("dependsOn")
+            if dependency is not None and "error" in outcomes[dependency]:
+                outcomes.append({"error": {"code": -32001, "message": f"dependency failed: {dependency}"}})
+                continue
+            try:
+                with stage(stage_name):
+                    outcomes.append({"result": mcp_call(call["method"], call["params"])})
+            except McpToolError as exc:
+                outcomes.append({"error": {"code": -32000, "message": str(exc)}})
+        return outcomes
+
+    prefix = uuid4().hex[:8]
+    members = []
+    for index, call in enumerate(calls):
+        member = {
+            "jsonrpc": "2.0",
+            "id": f"{prefix}-{index}",
+            "method": f"tools/{call['method']}",
+            "params": call["params"],
+        }
+        if call.get("dependsOn") is not None:
+            member["dependsOn"] = f"{prefix}-{call['dependsOn']}"
+        members.append(member)
+
+    # The batch travels under the mcp:batch guard, but each member still has to
+    # pass, and is later recorded against, the breakers of the downstream it
+    # touches, so a failing SQL backend trips mcp:upsert_task/sql as it would
+    # unbatched.
+    methods = list(dict.fromkeys(call["method"] for call in calls))
+    breaker_names = [name for method in methods for name in _breakers_for(method)]
+    try:
+        RESILIENCE.admit(*breaker_names)
+    except CircuitOpenError:
+        _log_safe("mcp call shed", method="batch")
+        raise
+    # mcp-server's transport takes one JSON-RPC object per request, so the batch
+    # array travels inside the `batch` tool and comes back as a response array.
+    try:
+        with stage("mcp_batch"):
+            result = mcp_call("batch", {"requests": members})
+    except Exception:
+        RESILIENCE.record(*breaker_names, limiter_name="mcp", latency=0.0, ok=None)
+        raise
+    # Server-side time per member, so a slow batch breaks down per upsert and emit.
+    timings = result.get("timingsMs") or {}
+    for member, stage_name in zip(members, stage_names):
+        if member["id"] in timings:
+            record_stage(stage_name, timings[member["id"]] / 1000)
+    by_id = {response.get("id"): response for response in result.get("responses", [])}
+    outcomes = []
+    observed = set()
+    for call, member in zip(calls, members):
+        response = by_id.get(member["id"])
+        if response is None:
+            outcomes.append({"error": {"code": -32603, "message": "missing batch response"}})
+        elif "error" in response:
+            outcomes.append({"error": response["error"]})
+        else:
+            outcomes.append({"result": response.get("result")})
+        # Rejected payloads and skipped dependents say nothing about the downstream.
+        if response is not None and ("result" in response or _downstream_failed(response.get("error"))):
+            method = call["method"]
+            downstream = MCP_DOWNSTREAMS.get(method, "mcp")
+            latency = timings.get(member["id"], 0.0) / 1000
+            RESILIENCE.record(*_breakers_for(method), limiter_name=downstream, latency=latency, ok="result" in response)
+            observed.add(method)
+    unobserved = [name for method in methods if method not in observed for name in _breakers_for(method)]
+    if unobserved:
+        RESILIENCE.record(*unobserved, limiter_name="mcp", latency=0.0, ok=None)
+    return outcomes
+
+
+def _breakers_for(method: str) -> tuple[str, str]:
+    return (f"mcp:{method}", MCP_DOWNSTREAMS.get(method, "mcp"))
+
+
+def _stage_names(calls: List[Dict[str, Any]]) -> List[str]:
+    """``method[n]`` per call, n counting calls to the same method (the n-th upsert, the n-th emit)."""
+    seen: Counter = Counter()
+    names = []
+    for call in calls:
+        names.append(f"{call['method']}[{seen[call['method']]}]")
+        seen[call["method"]] += 1
+    return names
+
+
+def _task_id_for(event_id: str, index: int) -> str:
+    # Stable per event so redeliveries update the same tasks instead of duplicating them.
+    return "T" + hashlib.sha1(f"{event_id}:{index}".encode("utf-8")).hexdigest()[:10]
+
+
+@PROFILER.profiled
 def handle_discharge_created(evt: Dict[str, Any]) -> None:
     event_id = evt.get("id")
     event_type = evt.get("eventType", "DischargeCreated")
@@ -80,23 +323,37 @@ def handle_discharge_created(evt: Dict[str, Any]) -> None:
         _log_safe("ignoring event without id", event_type=event_type)
         return
 
-    if EVENT_STORE.has_seen(event_id):
+    with stage("dedupe"):
+        seen = EVENT_STORE.has_seen(event_id)
+    if seen:
         _log_safe("duplicate event skipped", event_id=event_id, event_type=event_type, patient_id=patient_id)
         return
 
     try:
-        document = mcp_call(
-            "get_fhir_document",
-            {
-                "patientId": patient_id,
-                "encounterId": data.get("encounterId"),
-                "documentId": data.get("documentId"),
-            },
-        )
+        with stage("fetch"):
+            document = mcp_call(
+                "get_fhir_document",
+                {
+                    "patientId": patient_id,
+                    "encounterId": data.get("encounterId"),
+                    "documentId": data.get("documentId"),
+                },
+            )
         if not isinstance(document, dict):
             raise ValueError("Unexpected document payload from MCP")
 
-        followups = extract_followups(document, patient_id, data.get("encounterId"))
+        # Top-level stages are disjoint: the base64 note is decoded once here and
+        # handed to the extractor, and MCP response parsing stays inside fetch
+        # and mcp_batch.
+        with stage("decode"):
+            note_text = decode_document_text(document)
+        with stage("extract"):
+            if HYBRID_EXTRACTOR is not None:
+                followups = HYBRID_EXTRACTOR.extract(
+                    document, patient_id, data.get("encounterId"), note_text=note_text
+                )
+            else:
+                followups = extract_followups(document, patient_id, data.get("encounterId"), note_text=note_text)
         if not followups:
             followups = [
                 {
@@ -109,51 +366,251 @@ def handle_discharge_created(evt: Dict[str, Any]) -> None:
                 }
             ]
 
-        for followup in followups:
-            task_response = mcp_call("upsert_task", {"taskJson": followup})
-            task_id = task_response.get("taskId")
-            mcp_call(
-                "emit_eventgrid",
-                {
-                    "eventType": "TaskCreated",
-                    "subject": f"patients/{patient_id}/tasks/{task_id}",
-                    "data": {
-                        "patientId": patient_id,
-                        "taskId": task_id,
-                        "category": followup["category"],
-                        "title": followup["title"],
-                    },
-                },
-            )
+        calls: List[Dict[str, Any]] = []
+        rejected: List[str] = []
+        for index, followup in enumerate(followups):
+            task_id = followup.get("taskId") or _task_id_for(event_id, index)
+            task_created = {
+                "patientId": patient_id,
+                "taskId": task_id,
+                "category": followup.get("category"),
+                "title": followup.get("title"),
+            }
+            errors = TASK_CREATED_SCHEMA.errors(task_created, f"followUps[{index}]")
+            if errors:
+                # Only this follow-up is dropped; the discharge's valid ones are
+                # still written. Task ids keep their extraction index either way.
+                _log_safe("follow-up rejected", event_id=event_id, errors=errors)
+                rejected.extend(errors)
+                continue
+            task_json = {**followup, "taskId": task_id}
+            event = {
+                "eventType": "TaskCreated",
+                "subject": f"patients/{patient_id}/tasks/{task_id}",
+                "data": task_created,
+            }
+            if TASK_OUTBOX_ENABLED:
+                calls.append({"method": "upsert_task", "params": {"taskJson": task_json, "event": event}})
+            else:
+                calls.append({"method": "upsert_task", "params": {"taskJson": task_json}})
+                calls.append({"method": "emit_eventgrid", "params": event, "dependsOn": len(calls) - 1})
+        if not calls:
+            # Nothing valid to write: the extraction itself is broken, so dead-letter it.
+            raise EventValidationError("TaskCreated", rejected)
+
+        errors = [outcome["error"] for outcome in mcp_batch(calls) if "error" in outcome]
+        if errors:
+            raise McpToolError(f"mcp batch errors: {json.dumps(errors)}")
 
-        EVENT_STORE.record(event_id, event_type, patient_id)
+        with stage("record"):
+            EVENT_STORE.record(event_id, event_type, patient_id)
         _log_safe("event processed", event_id=event_id, event_type=event_type, patient_id=patient_id)
     except Exception:
         _log_safe("processing error", event_id=event_id, event_type=event_type)
         raise
 
 
+def _process_event(evt: Dict[str, Any]) -> bool:
+    """Process one event, dead-lettering it on failure.
+
+    Returns False only when the failure should be surfaced to Event Grid for
+    redelivery; events past ``MAX_INLINE_ATTEMPTS`` are acknowledged and left
+    in the dead-letter table for replay.
+    """
+    event_id = evt.get("id")
+    prior_attempts = EVENT_STORE.failure_attempts(event_id) if event_id else 0
+    if prior_attempts >= MAX_INLINE_ATTEMPTS:
+        _log_safe("dead-lettered event skipped", event_id=event_id)
+        return True
+    try:
+        handle_discharge_created(evt)
+    except (CircuitOpenError, ConcurrencyLimitExceeded):
+        # Load shedding says nothing about the event itself; let Event Grid redeliver.
+        return False
+    except EventValidationError as exc:
+        _reject_invalid(evt, exc)
+        return True
+    except Exception as exc:
+        if not event_id:
+            raise
+        attempts = EVENT_STORE.record_failure(evt, failure_reason(exc))
+        if attempts >= MAX_INLINE_ATTEMPTS:
+            _log_safe("event dead-lettered", event_id=event_id, attempts=attempts)
+            return True
+        return False
+    if prior_attempts:
+        EVENT_STORE.clear_dead_letter(event_id)
+    return True
+
+
+def _reject_invalid(evt: Dict[str, Any], exc: EventValidationError) -> None:
+    """Dead-letter an event that can never succeed and acknowledge it."""
+    _log_safe("invalid event rejected", event_id=evt.get("id"), errors=exc.errors)
+    if evt.get("id"):
+        EVENT_STORE.record_failure(evt, failure_reason(exc), min_attempts=MAX_INLINE_ATTEMPTS)
+
+
+def _validate_discharge(evt: Dict[str, Any]) -> None:
+    errors = DISCHARGE_SCHEMA.errors(evt.get("data"), "data")
+    if errors:
+        raise EventValidationError("DischargeCreated", errors)
+
+
+def handle_validated_discharge(evt: Dict[str, Any]) -> None:
+    """Entry point for replay: schema check, then the normal handler."""
+    _validate_discharge(evt)
+    handle_discharge_created(evt)
+
+
+def replay_in_partition(evt: Dict[str, Any]) -> None:
+    """Replay one event on its patient's lane so it stays ordered with live deliveries."""
+    EVENT_PARTITIONS.submit(_partition_key(evt), handle_validated_discharge, evt).result()
+
+
+def _process_event_timed(evt: Dict[str, Any]) -> bool:
+    started = time.perf_counter()
+    ok = False
+    try:
+        ok = _process_event(evt)
+        return ok
+    finally:
+        ADMISSION.observe(time.perf_counter() - started, ok)
+
+
+def _partition_key(evt: Dict[str, Any]) -> str | None:
+    # Events without a patient cannot conflict with anyone; spread them by id.
+    return (evt.get("data") or {}).get("patientId") or evt.get("id")
+
+
+def _admin_authorized() -> bool:
+    # Fail closed: dead letters carry full PHI payloads, so no token means no admin API.
+    if not ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN)
+
+
 @app.route("/events", methods=["POST", "OPTIONS"])
 def events() -> tuple[str, int]:
-    payload = request.get_json(force=True, silent=True)
-    if payload is None:
+    try:
+        events = decode_events(request.get_data())
+    except PayloadError:
         return ("", 400)
 
-    if isinstance(payload, dict) and payload.get("validationCode"):
-        return jsonify({"validationResponse": payload["validationCode"]})
+    if len(events) == 1 and events[0].get("validationCode"):
+        return jsonify({"validationResponse": events[0]["validationCode"]})
 
-    events = _as_event_list(payload)
     if events:
         first = events[0]
         if first.get("eventType") == "Microsoft.EventGrid.SubscriptionValidationEvent":
             validation_code = first.get("data", {}).get("validationCode")
             return jsonify({"validationResponse": validation_code})
 
+    # Invalid elements are dead-lettered and acknowledged one by one; the rest
+    # of the delivery proceeds.
+    discharges = []
     for evt in events:
-        if evt.get("eventType") == "DischargeCreated":
-            handle_discharge_created(evt)
+        if evt.get("eventType") != "DischargeCreated":
+            continue
+        try:
+            _validate_discharge(evt)
+        except EventValidationError as exc:
+            _reject_invalid(evt, exc)
+            continue
+        discharges.append(evt)
+    if ADMISSION_ENABLED and discharges:
+        decision = ADMISSION.admit(Counter(_partition_key(evt) or "" for evt in discharges))
+        if not decision.admitted:
+            _log_safe("delivery throttled", reason=decision.reason, events=len(discharges))
+            return ("", 429, {"Retry-After": decision.retry_after_header})
+
+    pending = [EVENT_PARTITIONS.submit(_partition_key(evt), _process_event_timed, evt) for evt in discharges]
+    # Bounded so a stuck downstream cannot hold the delivery open indefinitely.
+    # Unfinished events keep running in their lane; Event Grid's redelivery
+    # queues behind them and is skipped as a duplicate once they record.
+    done, not_done = wait(pending, timeout=GRACEFUL_TIMEOUT_SECONDS)
+    if not_done:
+        _log_safe("delivery timed out", events=len(not_done), timeout_seconds=GRACEFUL_TIMEOUT_SECONDS)
+    failed = bool(not_done) or not all([future.result() for future in done])
+
+    return ("", 500) if failed else ("", 204)
+
+
+@app.get("/admin/dead-letters")
+def list_dead_letters():
+    if not _admin_authorized():
+        return ("", 403)
+    limit = request.args.get("limit", default=100, type=int)
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+    entries = EVENT_STORE.list_dead_letters(limit=limit, min_attempts=MAX_INLINE_ATTEMPTS)
+    for entry in entries:
+        entry.pop("event", None)
+    return jsonify(entries)
+
+
+@app.post("/admin/dead-letters/replay")
+def replay_dead_letter_events():
+    if not _admin_authorized():
+        return ("", 403)
+    body = request.get_json(silent=True) or {}
+    try:
+        limit = int(body.get("limit", 100))
+        concurrency = int(body.get("concurrency", DEFAULT_REPLAY_CONCURRENCY))
+    except (TypeError, ValueError):
+        return jsonify({"error": "limit and concurrency must be integers"}), 400
+    if limit < 1 or concurrency < 1:
+        return jsonify({"error": "limit and concurrency must be positive"}), 400
+    summary = replay_dead_letters(
+        EVENT_STORE,
+        replay_in_partition,
+        limit=limit,
+        concurrency=concurrency,
+        min_attempts=MAX_INLINE_ATTEMPTS,
+    )
+    return jsonify(summary)
+
+
+@app.get("/admin/profiling")
+def get_profiling():
+    if not _admin_authorized():
+        return ("", 403)
+    return jsonify(
+        {
+            "enabled": PROFILER.profiling,
+            "slowThresholdSeconds": PROFILER.slow_threshold,
+            "profiles": PROFILER.recent_profiles(),
+        }
+    )
+
+
+@app.post("/admin/profiling")
+def set_profiling():
+    if not _admin_authorized():
+        return ("", 403)
+    body = request.get_json(silent=True) or {}
+    threshold = body.get("slowThresholdSeconds")
+    if threshold is not None:
+        try:
+            threshold = float(threshold)
+        except (TypeError, ValueError):
+            return jsonify({"error": "slowThresholdSeconds must be a number"}), 400
+        if not 0 < threshold < float("inf"):
+            return jsonify({"error": "slowThresholdSeconds must be positive"}), 400
+    PROFILER.set_profiling(bool(body.get("enabled", PROFILER.profiling)), slow_threshold=threshold)
+    return jsonify({"enabled": PROFILER.profiling, "slowThresholdSeconds": PROFILER.slow_threshold})
+
 
-    return ("", 204)
+@app.get("/metrics")
+def metrics():
+    body = (
+        RESILIENCE.render_metrics()
+        + EVENT_PARTITIONS.render_metrics()
+        + ADMISSION.render_metrics()
+        + PROFILER.render_metrics()
+    )
+    if HYBRID_EXTRACTOR is not None:
+        body += HYBRID_EXTRACTOR.render_metrics()
+    return app.response_class(body, mimetype="text/plain")
 
 
 @app.route("/healthz")
@@ -162,4 +619,9 @@ def healthz() -> tuple[str, int]:
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=7001)
+    # One process only: per-patient ordering, event de-duplication and
+    # extraction batching are per process. Scale with WEB_THREADS and
+    # LISTENER_PARTITIONS instead of workers.
+    if ServerOptions.from_env(7001).workers > 1:
+        raise SystemExit("fhir-listener runs a single worker; unset WEB_CONCURRENCY or set it to 1")
+    serve_wsgi(app, default_port=7001)
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import json
 import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
 from threading import Lock
-from typing import Optional
+from typing import Any, Optional
 
 
 class EventStore:
@@ -28,6 +29,20 @@ class EventStore:
                 )
                 """
             )
+            conn.execute(
+                """
+                create table if not exists dead_letter_events (
+                  event_id text primary key,
+                  event_type text not null,
+                  patient_id text,
+                  payload_json text not null,
+                  failure_reason text not null,
+                  attempts integer not null,
+                  first_failed_utc text not null,
+                  last_failed_utc text not null
+                )
+                """
+            )
 
     def _connect(self) -> sqlite3.Connection:
         conn = sqlite3.connect(self.path)
@@ -57,5 +72,85 @@ class EventStore:
             )
             conn.commit()
 
+    def record_failure(self, event: dict[str, Any], reason: str, *, min_attempts: int = 1) -> int:
+        """Record a failed delivery and return the attempt count so far.
+
+        ``min_attempts`` raises the count to at least that value, so failures
+        that retrying cannot fix (e.g. schema violations) dead-letter at once.
+        """
+        event_id = event.get("id")
+        if not event_id:
+            raise ValueError("cannot dead-letter an event without id")
+        data = event.get("data") or {}
+        timestamp = datetime.now(timezone.utc).isoformat()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                """
+                insert into dead_letter_events(
+                  event_id, event_type, patient_id, payload_json, failure_reason,
+                  attempts, first_failed_utc, last_failed_utc
+                ) values (?, ?, ?, ?, ?, ?, ?, ?)
+                on conflict(event_id) do update set
+                  payload_json=excluded.payload_json,
+                  failure_reason=excluded.failure_reason,
+                  attempts=max(dead_letter_events.attempts + 1, excluded.attempts),
+                  last_failed_utc=excluded.last_failed_utc
+                """,
+                (
+                    event_id,
+                    event.get("eventType", "DischargeCreated"),
+                    data.get("patientId") if isinstance(data, dict) else None,
+                    json.dumps(event, default=str),
+                    reason,
+                    max(1, min_attempts),
+                    timestamp,
+                    timestamp,
+                ),
+            )
+            row = conn.execute(
+                "select attempts from dead_letter_events where event_id = ?", (event_id,)
+            ).fetchone()
+            conn.commit()
+        return int(row[0])
+
+    def failure_attempts(self, event_id: str) -> int:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "select attempts from dead_letter_events where event_id = ?", (event_id,)
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    def list_dead_letters(self, limit: int = 100, min_attempts: int = 1) -> list[dict[str, Any]]:
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                """
+                select event_id, event_type, patient_id, payload_json, failure_reason,
+                       attempts, first_failed_utc, last_failed_utc
+                from dead_letter_events
+                where attempts >= ?
+                order by first_failed_utc
+                limit ?
+                """,
+                (min_attempts, limit),
+            ).fetchall()
+        return [
+            {
+                "eventId": row[0],
+                "eventType": row[1],
+                "patientId": row[2],
+                "event": json.loads(row[3]),
+                "failureReason": row[4],
+                "attempts": row[5],
+                "firstFailedUtc": row[6],
+                "lastFailedUtc": row[7],
+            }
+            for row in rows
+        ]
+
+    def clear_dead_letter(self, event_id: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("delete from dead_letter_events where event_id = ?", (event_id,))
+            conn.commit()
+
 
 __all__ = ["EventStore"]
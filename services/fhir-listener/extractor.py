@@ -1,25 +1,10 @@
 from __future__ import annotations
 
-import base64
 import re
 from datetime import datetime, timedelta
 from typing import Any, List
 
-
-def _decode_document_text(document: dict[str, Any]) -> str:
-    contents = document.get("content", []) if isinstance(document, dict) else []
-    for entry in contents:
-        attachment = entry.get("attachment") if isinstance(entry, dict) else None
-        data = attachment.get("data") if isinstance(attachment, dict) else None
-        if not data:
-            continue
-        try:
-            decoded = base64.b64decode(data).decode("utf-8")
-            if decoded:
-                return decoded
-        except Exception:
-            continue
-    return ""
+from common.fhir import decode_document_text
 
 
 def _parse_discharge_date(note_text: str) -> datetime | None:
@@ -48,9 +33,11 @@ def _extract_due_date(discharge_date: datetime | None, line: str) -> str | None:
 
 
 def extract_followups(
-    document: dict[str, Any], patient_id: str | None, encounter_id: str | None
+    document: dict[str, Any], patient_id: str | None, encounter_id: str | None, *, note_text: str | None = None
 ) -> List[dict[str, Any]]:
-    note_text = _decode_document_text(document)
+    """Rule-based follow-ups from a discharge note; pass ``note_text`` if the document is already decoded."""
+    if note_text is None:
+        note_text = decode_document_text(document)
     discharge_date = _parse_discharge_date(note_text)
     followups: List[dict[str, Any]] = []
 
@@ -99,4 +86,4 @@ def extract_followups(
     return followups
 
 
-__all__ = ["extract_followups"]
+__all__ = ["decode_document_text", "extract_followups"]
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+from typing import Any, Dict, List
+
+from common.llm import BATCH_INSTRUCTIONS, LlmBackend, format_batch, load_prompt, parse_batch
+from common.phi import scrub
+from extractor import decode_document_text, extract_followups
+
+logger = logging.getLogger("fhir_listener.extraction")
+
+# Lines the rule chain is expected to turn into tasks. It only knows three
+# instruction shapes and emits canned titles for them, so a rule hit is only
+# trusted when the line also says what that canned title claims.
+_INSTRUCTION = re.compile(r"^\s*(?:\d+\.\s*)?(labs?|visit|medications?)?\b.*$", re.IGNORECASE)
+_NUMBERED = re.compile(r"^\s*\d+\.\s")
+_RULE_EVIDENCE = {
+    "lab": ("metabolic panel",),
+    "visit": ("cardiology",),
+    "med": ("call",),
+}
+_LABEL_CATEGORY = {"lab": "lab", "labs": "lab", "visit": "visit", "medication": "med", "medications": "med"}
+
+
+def rules_are_confident(note_text: str, followups: List[Dict[str, Any]]) -> bool:
+    """True when every numbered instruction was matched by a rule whose canned title fits the line."""
+    instructions = [line for line in note_text.splitlines() if _NUMBERED.match(line)]
+    if not instructions or len(instructions) != len(followups):
+        return False
+    for line in instructions:
+        label = (_INSTRUCTION.match(line).group(1) or "").lower()
+        category = _LABEL_CATEGORY.get(label)
+        if category is None or not any(word in line.lower() for word in _RULE_EVIDENCE[category]):
+            return False
+    return True
+
+
+class LlmBatcher:
+    """Micro-batches notes into one extraction request per ``max_batch`` notes or ``max_wait`` seconds.
+
+    A lone note waits at most ``max_wait`` before it is sent on its own, so a
+    quiet listener pays a few milliseconds while a busy one (replay, parallel
+    partitions) amortises the model round trip across notes.
+    """
+
+    def __init__(self, backend: LlmBackend, prompt: str, *, max_batch: int = 8, max_wait: float = 0.02) -> None:
+        self.backend = backend
+        self.system = f"{prompt}\n\n{BATCH_INSTRUCTIONS}"
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self._pending: list[tuple[str, str, Future[List[Dict[str, Any]]]]] = []
+        self._oldest = 0.0
+        self._counter = 0
+        self._wake = Condition()
+        self._worker: Thread | None = None
+
+    def submit(self, text: str) -> Future[List[Dict[str, Any]]]:
+        future: Future[List[Dict[str, Any]]] = Future()
+        with self._wake:
+            if self._worker is None:
+                self._worker = Thread(target=self._run, name="llm-batcher", daemon=True)
+                self._worker.start()
+            self._counter += 1
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((f"n{self._counter}", text, future))
+            self._wake.notify()
+        return future
+
+    def _take_batch(self) -> list[tuple[str, str, Future[List[Dict[str, Any]]]]]:
+        with self._wake:
+            while True:
+                if self._pending:
+                    remaining = self._oldest + self.max_wait - time.monotonic()
+                    if len(self._pending) >= self.max_batch or remaining <= 0:
+                        batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+                        self._oldest = time.monotonic()
+                        return batch
+                    self._wake.wait(remaining)
+                else:
+                    self._wake.wait()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            try:
+                completion = self.backend.complete(self.system, format_batch({nid: text for nid, text, _ in batch}))
+                results = parse_batch(completion, [nid for nid, _, _ in batch])
+            except Exception as exc:  # backend/network failure fails the whole batch
+                for _, _, future in batch:
+                    future.set_exception(exc)
+                continue
+            with self._wake:
+                self.batches += 1
+            for note_id, _, future in batch:
+                outcome = results[note_id]
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+
+class HybridExtractor:
+    """Rules first; notes the rules cannot confidently parse go, PHI-scrubbed, to the batched LLM path.
+
+    Tiers: ``rules`` (confident rule hit), ``llm`` (model output passed the
+    golden schema) and ``llm_failed`` (model error or invalid output; the rule
+    result, possibly empty, is used instead). Per-tier counts and latency feed
+    ``/metrics``.
+    """
+
+    TIERS = ("rules", "llm", "llm_failed")
+
+    def __init__(
+        self,
+        backend: LlmBackend,
+        *,
+        prompt: str | None = None,
+        max_batch: int = 8,
+        max_wait: float = 0.02,
+        timeout: float = 60.0,
+    ) -> None:
+        self.batcher = LlmBatcher(backend, prompt or load_prompt("extract_followups"), max_batch=max_batch, max_wait=max_wait)
+        self.timeout = timeout
+        self._lock = Lock()
+        self._counts = {tier: 0 for tier in self.TIERS}
+        self._seconds = {tier: 0.0 for tier in self.TIERS}
+
+    def _record(self, tier: str, started: float) -> None:
+        with self._lock:
+            self._counts[tier] += 1
+            self._seconds[tier] += time.perf_counter() - started
+
+    def extract(
+        self,
+        document: Dict[str, Any],
+        patient_id: str | None,
+        encounter_id: str | None,
+        *,
+        note_text: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        if note_text is None:
+            note_text = decode_document_text(document)
+        followups = extract_followups(document, patient_id, encounter_id, note_text=note_text)
+        if rules_are_confident(note_text, followups):
+            self._record("rules", started)
+            return followups
+        try:
+            # The phi_scrub guardrail: identifiers never leave the process in a prompt.
+            extracted = self.batcher.submit(scrub(note_text)).result(timeout=self.timeout)
+        except Exception as exc:
+            logger.warning("llm extraction failed, using rule output: %s", type(exc).__name__)
+            self._record("llm_failed", started)
+            return followups
+        self._record("llm", started)
+        return [{**item, "patientId": patient_id, "sourceEncounterId": encounter_id} for item in extracted]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                "cheapFraction": self._counts["rules"] / total if total else 0.0,
+                "batches": self.batcher.batches,
+                "tiers": {
+                    tier: {
+                        "count": self._counts[tier],
+                        "avgMs": 1000 * self._seconds[tier] / self._counts[tier] if self._counts[tier] else 0.0,
+                    }
+                    for tier in self.TIERS
+                },
+            }
+
+    def render_metrics(self) -> str:
+        stats = self.stats()
+        lines = [f"listener_extraction_cheap_fraction {stats['cheapFraction']:.4f}"]
+        lines.append(f"listener_extraction_llm_batches_total {stats['batches']}")
+        with self._lock:
+            for tier in self.TIERS:
+                lines.append(f'listener_extraction_total{{tier="{tier}"}} {self._counts[tier]}')
+                lines.append(f'listener_extraction_seconds_sum{{tier="{tier}"}} {self._seconds[tier]:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+__all__ = ["HybridExtractor", "LlmBatcher", "rules_are_confident"]
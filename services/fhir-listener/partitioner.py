@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import zlib
+from concurrent.futures import Future
+from queue import SimpleQueue
+from threading import Lock, Thread
+from typing import Any, Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_Work = Optional[tuple[Future, Callable[..., Any], tuple]]
+
+
+class PartitionedExecutor:
+    """Ordered lanes: work with the same key runs serially in submission order.
+
+    Keys are hashed with crc32 onto ``partitions`` queues, each drained by a
+    single thread, so different patients proceed in parallel while a patient's
+    discharge and its corrected discharge apply in the order they arrived.
+    Threads start on the first submit, after any pre-fork import.
+    """
+
+    def __init__(self, partitions: int, *, name: str = "partition") -> None:
+        if partitions < 1:
+            raise ValueError("partitions must be >= 1")
+        self.partitions = partitions
+        self.name = name
+        self._queues: List[SimpleQueue[_Work]] = [SimpleQueue() for _ in range(partitions)]
+        self._inflight = [0] * partitions
+        self._threads: List[Thread] = []
+        self._lock = Lock()
+        self._closed = False
+
+    def partition_for(self, key: str | None) -> int:
+        return zlib.crc32((key or "").encode("utf-8")) % self.partitions
+
+    def submit(self, key: str | None, fn: Callable[..., T], *args: Any) -> Future[T]:
+        future: Future[T] = Future()
+        index = self.partition_for(key)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("partitioned executor is shut down")
+            if not self._threads:
+                for lane in range(self.partitions):
+                    thread = Thread(target=self._drain, args=(lane,), name=f"{self.name}-{lane}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+            self._inflight[index] += 1
+            self._queues[index].put((future, fn, args))
+        return future
+
+    def _drain(self, lane: int) -> None:
+        queue = self._queues[lane]
+        while True:
+            work = queue.get()
+            if work is None:
+                return
+            future, fn, args = work
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = fn(*args)
+                    except BaseException as exc:
+                        future.set_exception(exc)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self._lock:
+                    self._inflight[lane] -= 1
+
+    def depths(self) -> List[int]:
+        """Queued plus running items per partition."""
+        with self._lock:
+            return list(self._inflight)
+
+    def shutdown(self, timeout: float | None = None) -> None:
+        """Stop accepting work and wait for everything already queued to finish."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for queue in self._queues:
+            queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def render_metrics(self) -> str:
+        lines = [
+            "# HELP listener_partition_inflight Events queued or running per ordered partition.",
+            "# TYPE listener_partition_inflight gauge",
+        ]
+        for lane, depth in enumerate(self.depths()):
+            lines.append(f'listener_partition_inflight{{partition="{lane}"}} {depth}')
+        return "\n".join(lines) + "\n"
+
+
+__all__ = ["PartitionedExecutor"]
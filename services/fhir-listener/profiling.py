@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import cProfile
+import functools
+import io
+import pstats
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Iterator, List, Tuple
+
+_CURRENT: ContextVar["StageTimer | None"] = ContextVar("listener_stage_timer", default=None)
+
+
+class StageTimer:
+    """Wall time per named stage of one event; repeated stages accumulate. Not thread-safe."""
+
+    __slots__ = ("stages", "_clock")
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.stages: Dict[str, float] = {}
+        self._clock = clock
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.add(name, self._clock() - started)
+
+    def breakdown_ms(self) -> Dict[str, float]:
+        return {name: round(1000 * seconds, 3) for name, seconds in self.stages.items()}
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block against the current event's timer; a no-op outside a tracked event."""
+    timer = _CURRENT.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Add a duration measured elsewhere (e.g. server-side MCP timings) to the current event."""
+    timer = _CURRENT.get()
+    if timer is not None:
+        timer.add(name, seconds)
+
+
+class EventProfiler:
+    """Per-stage timing, slow-event capture and opt-in cProfile for event handlers.
+
+    Every tracked event gets a ``StageTimer``. Events slower than
+    ``slow_threshold`` are reported through ``log`` with the event id, type,
+    total and per-stage milliseconds only, never payload fields, so the
+    record is safe-mode compliant. With profiling enabled (at construction or
+    via ``set_profiling``), events also run under cProfile, one at a time
+    since a profiler hooks a single thread; the top ``top`` functions of slow
+    events are kept in memory and, with ``profile_dir``, dumped as ``.prof``
+    files.
+    """
+
+    def __init__(
+        self,
+        *,
+        slow_threshold: float = 2.0,
+        log: Callable[..., None] = lambda message, **fields: None,
+        profiling: bool = False,
+        profile_dir: str | Path | None = None,
+        top: int = 25,
+        keep: int = 20,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.slow_threshold = slow_threshold
+        self.profiling = profiling
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.top = top
+        self._log = log
+        self._clock = clock
+        self._profile_lock = Lock()
+        self._lock = Lock()
+        self._profiles: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self._stage_totals: Dict[str, Tuple[float, int]] = {}
+        self.slow_events = 0
+
+    def set_profiling(self, enabled: bool, *, slow_threshold: float | None = None) -> None:
+        self.profiling = enabled
+        if slow_threshold is not None:
+            self.slow_threshold = slow_threshold
+
+    @contextmanager
+    def track(self, event_id: str | None, event_type: str | None) -> Iterator[StageTimer]:
+        timer = StageTimer(self._clock)
+        token = _CURRENT.set(timer)
+        profiler = None
+        if self.profiling and self._profile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+        started = self._clock()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            yield timer
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._profile_lock.release()
+            elapsed = self._clock() - started
+            _CURRENT.reset(token)
+            self._finish(event_id, event_type, elapsed, timer, profiler)
+
+    def profiled(self, handler: Callable[[Dict[str, Any]], Any]) -> Callable[[Dict[str, Any]], Any]:
+        """Decorate an event handler taking the Event Grid event dict."""
+
+        @functools.wraps(handler)
+        def wrapper(evt: Dict[str, Any]) -> Any:
+            with self.track(evt.get("id"), evt.get("eventType")):
+                return handler(evt)
+
+        return wrapper
+
+    def _finish(
+        self,
+        event_id: str | None,
+        event_type: str | None,
+        elapsed: float,
+        timer: StageTimer,
+        profiler: cProfile.Profile | None,
+    ) -> None:
+        with self._lock:
+            for name, seconds in timer.stages.items():
+                # "upsert_task[2]" counts under "upsert_task" to keep label cardinality fixed.
+                base = name.partition("[")[0]
+                total, count = self._stage_totals.get(base, (0.0, 0))
+                self._stage_totals[base] = (total + seconds, count + 1)
+            slow = elapsed >= self.slow_threshold
+            if slow:
+                self.slow_events += 1
+        if not slow:
+            return
+        self._log(
+            "slow event",
+            event_id=event_id,
+            event_type=event_type,
+            total_ms=round(1000 * elapsed, 3),
+            stages_ms=timer.breakdown_ms(),
+        )
+        if profiler is not None:
+            self._keep_profile(event_id, elapsed, profiler)
+
+    def _keep_profile(self, event_id: str | None, elapsed: float, profiler: cProfile.Profile) -> None:
+        # pstats output names code locations only, never argument values.
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(self.top)
+        entry: Dict[str, Any] = {"eventId": event_id, "totalMs": round(1000 * elapsed, 3), "stats": text.getvalue()}
+        if self.profile_dir is not None:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", event_id or "unknown")[:64]
+            path = self.profile_dir / f"event-{safe_id}-{time.time_ns()}.prof"
+            profiler.dump_stats(str(path))
+            entry["file"] = str(path)
+        with self._lock:
+            self._profiles.append(entry)
+
+    def recent_profiles(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._profiles)
+
+    def render_metrics(self) -> str:
+        with self._lock:
+            totals = dict(self._stage_totals)
+            slow = self.slow_events
+        lines = [
+            "# HELP listener_event_stage_seconds_total Wall time spent per event-processing stage.",
+            "# TYPE listener_event_stage_seconds_total counter",
+        ]
+        for name, (seconds, _) in sorted(totals.items()):
+            lines.append(f'listener_event_stage_seconds_total{{stage="{name}"}} {seconds:.6f}')
+        lines += [
+            "# HELP listener_event_stage_count_total Timed occurrences of each stage.",
+            "# TYPE listener_event_stage_count_total counter",
+        ]
+        for name, (_, count) in sorted(totals.items()):
+            lines.append(f'listener_event_stage_count_total{{stage="{name}"}} {count}')
+        lines += [
+            "# HELP listener_slow_events_total Events slower than the slow-event threshold.",
+            "# TYPE listener_slow_events_total counter",
+            f"listener_slow_events_total {slow}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+__all__ = ["EventProfiler", "StageTimer", "record_stage", "stage"]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from common.phi import scrub
+from event_store import EventStore
+
+DEFAULT_REPLAY_CONCURRENCY = 4
+
+
+def failure_reason(exc: BaseException) -> str:
+    # Exception text can echo payload fragments, so keep it short and scrubbed.
+    return scrub(f"{type(exc).__name__}: {exc}"[:500], names=())
+
+
+def replay_dead_letters(
+    store: EventStore,
+    handler: Callable[[Dict[str, Any]], None],
+    *,
+    limit: int = 100,
+    concurrency: int = DEFAULT_REPLAY_CONCURRENCY,
+    min_attempts: int = 1,
+) -> Dict[str, Any]:
+    """Re-run dead-lettered events through ``handler`` with bounded concurrency.
+
+    Only rows with at least ``min_attempts`` failures are picked up, so events
+    still inside their inline retry budget are left to Event Grid redelivery.
+    Successful events are removed from the dead-letter table; failures bump the
+    attempt count and keep their row so they can be inspected or replayed again.
+    """
+    entries = store.list_dead_letters(limit=limit, min_attempts=min_attempts)
+    if not entries:
+        return {"replayed": 0, "succeeded": 0, "failed": []}
+
+    def _replay(entry: Dict[str, Any]) -> str | None:
+        event = entry["event"]
+        try:
+            handler(event)
+        except Exception as exc:
+            store.record_failure(event, failure_reason(exc))
+            return entry["eventId"]
+        store.clear_dead_letter(entry["eventId"])
+        return None
+
+    workers = max(1, min(concurrency, len(entries)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dlq-replay") as pool:
+        outcomes = list(pool.map(_replay, entries))
+
+    failed = [event_id for event_id in outcomes if event_id is not None]
+    return {"replayed": len(entries), "succeeded": len(entries) - len(failed), "failed": failed}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay dead-lettered DischargeCreated events.")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_REPLAY_CONCURRENCY)
+    parser.add_argument("--list", action="store_true", help="list dead letters without replaying")
+    args = parser.parse_args(argv)
+
+    # Imported lazily so listing works without the web stack configured.
+    from app import EVENT_STORE, MAX_INLINE_ATTEMPTS, replay_in_partition
+
+    if args.list:
+        for entry in EVENT_STORE.list_dead_letters(limit=args.limit, min_attempts=MAX_INLINE_ATTEMPTS):
+            entry.pop("event", None)
+            print(json.dumps(entry))
+        return 0
+
+    summary = replay_dead_letters(
+        EVENT_STORE,
+        replay_in_partition,
+        limit=args.limit,
+        concurrency=args.concurrency,
+        min_attempts=MAX_INLINE_ATTEMPTS,
+    )
+    print(json.dumps(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
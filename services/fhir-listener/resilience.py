@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Dict, Iterator
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is short-circuited by an open breaker."""
+
+
+class ConcurrencyLimitExceeded(RuntimeError):
+    """Raised when the adaptive limiter sheds a call."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds. It then admits up to
+    ``half_open_max_calls`` probes; one success closes it again, one failure
+    re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+
+    def allow(self) -> None:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == OPEN:
+                raise CircuitOpenError(f"circuit open: {self.name}")
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    raise CircuitOpenError(f"circuit half-open, probe in flight: {self.name}")
+                self._probes += 1
+
+    def release_probe(self) -> None:
+        """Return a half-open probe slot for a call that never reached the dependency."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probes = 0
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit that sheds excess calls instead of queueing them.
+
+    Each successful call under ``latency_target`` grows the limit by
+    ``1 / limit`` (roughly +1 per window of calls); a failure or a slow call
+    multiplies it by ``backoff``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        initial_limit: float = 16,
+        min_limit: float = 1,
+        max_limit: float = 128,
+        latency_target: float = 1.0,
+        backoff: float = 0.5,
+    ) -> None:
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._lock = Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._in_flight >= int(self._limit):
+                raise ConcurrencyLimitExceeded(f"concurrency limit reached: {self.name}")
+            self._in_flight += 1
+
+    def cancel(self) -> None:
+        """Give back a slot without feeding the call into the AIMD estimate."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def release(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._adjust(latency, ok)
+
+    def observe(self, latency: float, ok: bool) -> None:
+        """Feed a call admitted elsewhere (e.g. one member of a batch) into the AIMD estimate."""
+        with self._lock:
+            self._adjust(latency, ok)
+
+    def _adjust(self, latency: float, ok: bool) -> None:
+        if not ok or latency > self.latency_target:
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+        else:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+
+class ResilienceRegistry:
+    """Lazily creates breakers and limiters by name and renders their metrics."""
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        initial_limit: float = 16,
+        max_limit: float = 128,
+        latency_target: float = 1.0,
+    ) -> None:
+        self._breaker_kwargs = {"failure_threshold": failure_threshold, "reset_timeout": reset_timeout}
+        self._limiter_kwargs = {
+            "initial_limit": initial_limit,
+            "max_limit": max_limit,
+            "latency_target": latency_target,
+        }
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+        self._lock = Lock()
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name, **self._breaker_kwargs)
+            return self._breakers[name]
+
+    def limiter(self, name: str) -> AdaptiveConcurrencyLimiter:
+        with self._lock:
+            if name not in self._limiters:
+                self._limiters[name] = AdaptiveConcurrencyLimiter(name, **self._limiter_kwargs)
+            return self._limiters[name]
+
+    def admit(self, *breaker_names: str) -> None:
+        """Pass every named breaker, or raise CircuitOpenError having handed back any probe taken.
+
+        For work whose per-dependency outcomes arrive later through ``record``.
+        """
+        admitted: list[CircuitBreaker] = []
+        try:
+            for name in breaker_names:
+                breaker = self.breaker(name)
+                breaker.allow()
+                admitted.append(breaker)
+        except CircuitOpenError:
+            for breaker in admitted:
+                breaker.release_probe()
+            raise
+
+    def record(self, *breaker_names: str, limiter_name: str, latency: float, ok: bool | None) -> None:
+        """Record one call's outcome after ``admit``; ``ok=None`` means it never reached the dependency."""
+        breakers = [self.breaker(name) for name in breaker_names]
+        if ok is None:
+            for breaker in breakers:
+                breaker.release_probe()
+            return
+        self.limiter(limiter_name).observe(latency, ok)
+        for breaker in breakers:
+            if ok:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+    @contextmanager
+    def guard(self, *breaker_names: str, limiter_name: str) -> Iterator[None]:
+        """Admit a call through every named breaker and the limiter, then record the outcome."""
+        breakers = [self.breaker(name) for name in breaker_names]
+        limiter = self.limiter(limiter_name)
+        limiter.acquire()
+        try:
+            self.admit(*breaker_names)
+        except CircuitOpenError:
+            limiter.cancel()
+            raise
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            limiter.release(time.perf_counter() - started, ok)
+            for breaker in breakers:
+                if ok:
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+
+    def render_metrics(self) -> str:
+        with self._lock:
+            breakers = list(self._breakers.values())
+            limiters = list(self._limiters.values())
+        lines = [
+            "# HELP listener_circuit_state Circuit breaker state (0=closed, 1=half_open, 2=open).",
+            "# TYPE listener_circuit_state gauge",
+        ]
+        for breaker in breakers:
+            lines.append(f'listener_circuit_state{{name="{breaker.name}"}} {_STATE_VALUES[breaker.state]}')
+        lines += [
+            "# HELP listener_concurrency_limit Current adaptive concurrency limit.",
+            "# TYPE listener_concurrency_limit gauge",
+        ]
+        for limiter in limiters:
+            lines.append(f'listener_concurrency_limit{{name="{limiter.name}"}} {limiter.limit}')
+        lines += [
+            "# HELP listener_in_flight Calls currently admitted by the limiter.",
+            "# TYPE listener_in_flight gauge",
+        ]
+        for limiter in limiters:
+            lines.append(f'listener_in_flight{{name="{limiter.name}"}} {limiter.in_flight}')
+        return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ConcurrencyLimitExceeded",
+    "ResilienceRegistry",
+]
@@ -2,15 +2,28 @@ from __future__ import annotations
 
 import json
 import os
-from datetime import datetime, timezone
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import TYPE_CHECKING, Any
 from uuid import uuid4
 
-import requests
-from azure.identity import DefaultAzureCredential
 from fastmcp import MCP, tool
 
-from task_store import create_task_store
+from async_runtime import AsyncToolRuntime
+from audit_rollover import AuditRolloverJob
+from common.phi import scrub
+from common.schemas import load_event_schemas
+from common.server import exit_on_sigterm, register_shutdown
+from common.serialization import dumps
+from common.task_store import create_task_store
+from outbox_relay import OutboxRelay
+from rpc_batch import dispatch_batch
+
+if TYPE_CHECKING:  # pragma: no cover
+    from azure.identity import DefaultAzureCredential
+
+    from common.task_store import AzureSqlTaskStore, SqliteTaskStore
+    from common.task_store_postgres import PostgresTaskStore
 
 MCP_APP = MCP("discharge-mcp")
 
@@ -24,18 +37,45 @@ SQL_USERNAME = os.environ.get("SQL_USERNAME")
 SQL_PASSWORD = os.environ.get("SQL_PASSWORD")
 SQL_CONNECTION_STRING = os.environ.get("SQL_CONNECTION_STRING")
 AZURE_CLIENT_ID = os.environ.get("AZURE_CLIENT_ID")
+TASK_DB_DSN = os.environ.get("TASK_DB_DSN")
+TASK_DB_POOL_MIN = int(os.environ.get("TASK_DB_POOL_MIN", "1"))
+TASK_DB_POOL_MAX = int(os.environ.get("TASK_DB_POOL_MAX", "10"))
+# Off by default: buffered audit rows commit after the task and are lost if the
+# process dies before the next flush. Only enable where that window is acceptable.
+TASK_AUDIT_ASYNC = os.environ.get("TASK_AUDIT_ASYNC", "false").lower() == "true"
 
 EVENTGRID_TOPIC_URL = os.environ.get("EVENTGRID_TOPIC_URL")
 EVENTGRID_KEY = os.environ.get("EVENTGRID_KEY")
 EVENTGRID_SCOPE = os.environ.get("EVENTGRID_SCOPE", "https://eventgrid.azure.net/.default")
 EVENTGRID_DATA_VERSION = os.environ.get("EVENTGRID_DATA_VERSION", "1.0")
+HTTP_TIMEOUT_SECONDS = float(os.environ.get("HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+BLOCKING_WORKERS = int(os.environ.get("MCP_BLOCKING_WORKERS", "8"))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("MCP_BATCH_CONCURRENCY", "16"))
+GRACEFUL_TIMEOUT_SECONDS = int(os.environ.get("GRACEFUL_TIMEOUT_SECONDS", "30"))
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_SECONDS = float(os.environ.get("OUTBOX_POLL_SECONDS", "1.0"))
+OUTBOX_RETAIN_HOURS = float(os.environ.get("OUTBOX_RETAIN_HOURS", "24"))
+AUDIT_ROLLOVER_HOURS = float(os.environ.get("AUDIT_ROLLOVER_HOURS", "24"))
+AUDIT_RETAIN_MONTHS = int(os.environ.get("AUDIT_RETAIN_MONTHS", "3"))
+
+# Outgoing payloads for event types with a schema in events/schemas are
+# validated before publishing; other event types pass through.
+EVENT_SCHEMAS = load_event_schemas()
 
 _CREDENTIAL: DefaultAzureCredential | None = None
+_OUTBOX_HTTP: Any = None
+_TASK_STORE: SqliteTaskStore | AzureSqlTaskStore | PostgresTaskStore | None = None
+_TASK_STORE_LOCK = Lock()
 
 
 def _get_default_credential() -> DefaultAzureCredential:
+    # azure-identity is imported on first use: it is only needed for Event Grid
+    # without a SAS key, and importing it dominates cold start.
     global _CREDENTIAL
     if _CREDENTIAL is None:
+        from azure.identity import DefaultAzureCredential
+
         _CREDENTIAL = DefaultAzureCredential(
             managed_identity_client_id=AZURE_CLIENT_ID,
             exclude_interactive_browser_credential=True,
@@ -43,36 +83,60 @@ def _get_default_credential() -> DefaultAzureCredential:
     return _CREDENTIAL
 
 
-TASK_STORE = create_task_store(
-    mode=TASK_DB_MODE,
-    sqlite_path=TASK_DB_PATH,
-    sql_server=SQL_SERVER,
-    sql_database=SQL_DATABASE,
-    sql_username=SQL_USERNAME,
-    sql_password=SQL_PASSWORD,
-    sql_connection_string=SQL_CONNECTION_STRING,
-    managed_identity_client_id=AZURE_CLIENT_ID,
-)
+def get_task_store() -> SqliteTaskStore | AzureSqlTaskStore | PostgresTaskStore:
+    """Build the task store on the first tool call instead of at import."""
+    global _TASK_STORE
+    if _TASK_STORE is None:
+        with _TASK_STORE_LOCK:
+            if _TASK_STORE is None:
+                _TASK_STORE = create_task_store(
+                    mode=TASK_DB_MODE,
+                    sqlite_path=TASK_DB_PATH,
+                    sql_server=SQL_SERVER,
+                    sql_database=SQL_DATABASE,
+                    sql_username=SQL_USERNAME,
+                    sql_password=SQL_PASSWORD,
+                    sql_connection_string=SQL_CONNECTION_STRING,
+                    managed_identity_client_id=AZURE_CLIENT_ID,
+                    postgres_dsn=TASK_DB_DSN,
+                    postgres_pool_min=TASK_DB_POOL_MIN,
+                    postgres_pool_max=TASK_DB_POOL_MAX,
+                    audit_async=TASK_AUDIT_ASYNC,
+                )
+    return _TASK_STORE
 
 
-def _fetch_json(url: str) -> dict[str, Any]:
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-    return response.json()
+RUNTIME = AsyncToolRuntime(
+    blocking_workers=BLOCKING_WORKERS,
+    timeout=HTTP_TIMEOUT_SECONDS,
+    max_connections=HTTP_MAX_CONNECTIONS,
+)
 
 
 @tool
-def get_fhir_document(patientId: str, encounterId: str | None, documentId: str) -> dict[str, Any]:
+async def get_fhir_document(patientId: str, encounterId: str | None, documentId: str) -> dict[str, Any]:
     """Fetch a DocumentReference payload from the mock FHIR service."""
     url = f"{FHIR_BASE_URL}/DocumentReference/{documentId}"
-    document = _fetch_json(url)
-    return document
+    return await RUNTIME.get_json(url)
+
+
+def _validate_event(eventType: str, data: dict[str, Any]) -> None:
+    schema = EVENT_SCHEMAS.get(eventType)
+    if schema is not None:
+        errors = schema.errors(data, "data")
+        if errors:
+            raise ValueError(f"{eventType} payload failed schema validation: {'; '.join(errors)}")
 
 
 @tool
-def upsert_task(taskJson: dict[str, Any]) -> dict[str, str]:
-    """Insert or update a care task using the configured task store."""
-    return TASK_STORE.upsert(taskJson)
+async def upsert_task(taskJson: dict[str, Any], event: dict[str, Any] | None = None) -> dict[str, str]:
+    """Insert or update a care task; ``event`` ({eventType, subject, data}) is queued atomically if the task is new."""
+    if event is not None:
+        _validate_event(event.get("eventType"), event.get("data"))
+    result = await RUNTIME.run_blocking(lambda: get_task_store().upsert(taskJson, event=event))
+    if event is not None:
+        OUTBOX_RELAY.notify()
+    return result
 
 
 def _build_eventgrid_headers() -> dict[str, str]:
@@ -87,8 +151,9 @@ def _build_eventgrid_headers() -> dict[str, str]:
 
 
 @tool
-def emit_eventgrid(eventType: str, subject: str, data: dict[str, Any]) -> dict[str, Any]:
+async def emit_eventgrid(eventType: str, subject: str, data: dict[str, Any]) -> dict[str, Any]:
     """Publish an Event Grid event either to Azure or log locally when not configured."""
+    _validate_event(eventType, data)
     if not EVENTGRID_TOPIC_URL:
         if SAFE_MODE:
             print(f"[eventgrid] {eventType} subject={subject}")
@@ -105,14 +170,9 @@ def emit_eventgrid(eventType: str, subject: str, data: dict[str, Any]) -> dict[s
         "data": data,
         "dataVersion": EVENTGRID_DATA_VERSION,
     }
-    headers = _build_eventgrid_headers()
-    response = requests.post(
-        EVENTGRID_TOPIC_URL,
-        json=[event],
-        headers=headers,
-        timeout=10,
-    )
-    response.raise_for_status()
+    # Token refresh in azure-identity is blocking; keep it off the event loop.
+    headers = await RUNTIME.run_blocking(_build_eventgrid_headers)
+    await RUNTIME.post_json(EVENTGRID_TOPIC_URL, [event], headers)
     if SAFE_MODE:
         print(f"[eventgrid] {eventType} subject={subject} id={event_id}")
     else:
@@ -120,11 +180,86 @@ def emit_eventgrid(eventType: str, subject: str, data: dict[str, Any]) -> dict[s
     return {"published": True, "eventId": event_id}
 
 
+def _publish_outbox(events: list[dict[str, Any]]) -> None:
+    """Relay publisher: one Event Grid POST per outbox batch (runs on the relay thread)."""
+    global _OUTBOX_HTTP
+    if not EVENTGRID_TOPIC_URL:
+        for event in events:
+            if SAFE_MODE:
+                print(f"[eventgrid] {event['eventType']} subject={event['subject']} id={event['id']} (outbox)")
+            else:
+                print(f"[eventgrid] {event['eventType']} subject={event['subject']} data={json.dumps(event['data'])}")
+        return
+    if _OUTBOX_HTTP is None:
+        import httpx
+
+        _OUTBOX_HTTP = httpx.Client(timeout=HTTP_TIMEOUT_SECONDS)
+    body = [{**event, "dataVersion": EVENTGRID_DATA_VERSION} for event in events]
+    response = _OUTBOX_HTTP.post(EVENTGRID_TOPIC_URL, content=dumps(body), headers=_build_eventgrid_headers())
+    response.raise_for_status()
+    if SAFE_MODE:
+        print(f"[eventgrid] published {len(events)} outbox events")
+    else:
+        print(f"[eventgrid] published {json.dumps(body)}")
+
+
+# Outbox rows written by upsert_task are published here, off the tool-call path.
+OUTBOX_RELAY = OutboxRelay(
+    get_task_store,
+    _publish_outbox,
+    batch_size=OUTBOX_BATCH_SIZE,
+    interval=OUTBOX_POLL_SECONDS,
+    retain_sent=timedelta(hours=OUTBOX_RETAIN_HOURS),
+)
+
+
 @tool
 def phi_scrub(text: str) -> str:
-    """Light PII/PHI scrubbing (demo-grade)."""
-    return text.replace("MRN:", "MRN:***")
+    """Mask MRNs, DOBs, header patient names, SSNs, phones, emails and addresses in one pass."""
+    return scrub(text)
+
+
+BATCH_TOOLS = {
+    "tools/get_fhir_document": get_fhir_document,
+    "tools/upsert_task": upsert_task,
+    "tools/emit_eventgrid": emit_eventgrid,
+    "tools/phi_scrub": phi_scrub,
+}
+
+
+@tool
+async def batch(requests: list[dict[str, Any]]) -> dict[str, Any]:
+    """Execute a JSON-RPC 2.0 batch of tool calls in a single round trip.
+
+    ``timingsMs`` carries each call's server-side time so callers can break
+    down a slow batch per upsert and emit.
+    """
+    timings: dict[Any, float] = {}
+    responses = await dispatch_batch(requests, BATCH_TOOLS, max_concurrency=BATCH_MAX_CONCURRENCY, timings=timings)
+    return {"responses": responses, "timingsMs": {key: round(1000 * value, 3) for key, value in timings.items()}}
+
+
+# Archives old audit rows (SQLite/PostgreSQL) and extends the Azure SQL audit partitions.
+AUDIT_ROLLOVER = (
+    AuditRolloverJob(get_task_store, every=AUDIT_ROLLOVER_HOURS * 3600, retain_months=AUDIT_RETAIN_MONTHS)
+    if AUDIT_ROLLOVER_HOURS > 0
+    else None
+)
+
+
+def _flush_task_audit() -> None:
+    if _TASK_STORE is not None:
+        _TASK_STORE.flush_audit(GRACEFUL_TIMEOUT_SECONDS)
 
 
 if __name__ == "__main__":
-    MCP_APP.run(host="0.0.0.0", port=9000)
+    # A single async process: tool calls already overlap on the event loop and
+    # the SQLite store has one writer. Scale out with replicas on Azure SQL.
+    register_shutdown(_flush_task_audit)
+    register_shutdown(lambda: OUTBOX_RELAY.stop(GRACEFUL_TIMEOUT_SECONDS))
+    exit_on_sigterm()
+    OUTBOX_RELAY.start()
+    if AUDIT_ROLLOVER is not None:
+        register_shutdown(lambda: AUDIT_ROLLOVER.stop(GRACEFUL_TIMEOUT_SECONDS))
+        AUDIT_ROLLOVER.start()
+    MCP_APP.run(host="0.0.0.0", port=int(os.environ.get("PORT", "9000")))
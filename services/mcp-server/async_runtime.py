@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncToolRuntime:
+    """Shared async I/O for MCP tools.
+
+    HTTP goes through one pooled ``httpx.AsyncClient`` so a slow FHIR or Event
+    Grid round trip only parks a coroutine. Blocking work (pyodbc/sqlite writes,
+    azure-identity token refresh) is pushed onto a bounded thread pool so the
+    number of concurrent database sessions stays capped regardless of how many
+    tool calls are in flight.
+    """
+
+    def __init__(
+        self,
+        *,
+        blocking_workers: int = 8,
+        timeout: float = 10.0,
+        max_connections: int = 100,
+        client: Any | None = None,
+    ) -> None:
+        self._timeout = timeout
+        self._max_connections = max_connections
+        self._client = client
+        self._executor = ThreadPoolExecutor(max_workers=blocking_workers, thread_name_prefix="mcp-blocking")
+
+    def _http(self) -> Any:
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout,
+                limits=httpx.Limits(max_connections=self._max_connections),
+            )
+        return self._client
+
+    async def get_json(self, url: str) -> dict[str, Any]:
+        response = await self._http().get(url)
+        response.raise_for_status()
+        return response.json()
+
+    async def post_json(self, url: str, payload: Any, headers: dict[str, str]) -> None:
+        response = await self._http().post(url, json=payload, headers=headers)
+        response.raise_for_status()
+
+    async def run_blocking(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def aclose(self) -> None:
+        if self._client is not None and hasattr(self._client, "aclose"):
+            await self._client.aclose()
+        self._executor.shutdown(wait=True)
+
+
+__all__ = ["AsyncToolRuntime"]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from threading import Event, Thread
+from typing import Any, Callable
+
+logger = logging.getLogger("audit_rollover")
+
+
+class AuditRolloverJob:
+    """Runs ``rollover_audit`` on the task store every ``every`` seconds from a background thread.
+
+    On SQLite and PostgreSQL this moves audit rows older than
+    ``retain_months`` into monthly archive tables; on Azure SQL it splits off
+    next month's ``task_audit`` partition ahead of time, so inserts never land
+    in the open-ended last partition. The first pass runs at startup.
+    """
+
+    def __init__(self, store: Callable[[], Any], *, every: float = 86400.0, retain_months: int = 3) -> None:
+        if every <= 0:
+            raise ValueError("every must be positive")
+        self._store = store
+        self.every = every
+        self.retain_months = retain_months
+        self._stop = Event()
+        self._thread: Thread | None = None
+        self.runs = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name="audit-rollover", daemon=True)
+            self._thread.start()
+
+    def run_once(self) -> int:
+        moved = self._store().rollover_audit(retain_months=self.retain_months)
+        self.runs += 1
+        return moved
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                moved = self.run_once()
+                if moved:
+                    logger.info("archived %d audit rows", moved)
+            except Exception as exc:
+                self.failures += 1
+                logger.warning("audit rollover failed (%s); retrying in %.0fs", type(exc).__name__, self.every)
+            self._stop.wait(self.every)
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Archive old task_audit rows and pre-create next month's audit partition."
+    )
+    parser.add_argument("--retain-months", type=int, default=3, help="months kept in the live audit table")
+    args = parser.parse_args(argv)
+
+    # Imported lazily so --help works without the MCP stack configured.
+    from app import get_task_store
+
+    moved = AuditRolloverJob(get_task_store, retain_months=args.retain_months).run_once()
+    print(json.dumps({"moved": moved}))
+    return 0
+
+
+__all__ = ["AuditRolloverJob", "main"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
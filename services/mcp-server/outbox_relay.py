@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger("outbox_relay")
+
+
+class OutboxRelay:
+    """Publishes task-store outbox rows to Event Grid from a background thread.
+
+    ``upsert`` queues the TaskCreated event in the same transaction that
+    creates the task, and this relay publishes unsent rows in ``batch_size`` batches and
+    marks them sent, so no tool call waits on Event Grid. Delivery is
+    at-least-once: a crash between publishing and marking republishes the
+    batch with the same event ids. Failures back off exponentially up to
+    ``max_backoff``; ``notify()`` wakes the relay early after a write.
+    Published rows are purged once older than ``retain_sent``.
+    """
+
+    def __init__(
+        self,
+        store: Callable[[], Any],
+        publish: Callable[[List[Dict[str, Any]]], None],
+        *,
+        batch_size: int = 100,
+        interval: float = 1.0,
+        max_backoff: float = 60.0,
+        retain_sent: timedelta = timedelta(days=1),
+        purge_every: float = 3600.0,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self._store = store
+        self._publish = publish
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.retain_sent = retain_sent
+        self.purge_every = purge_every
+        self._wake = Event()
+        self._stopping = False
+        self._thread: Thread | None = None
+        self._lock = Lock()
+        self._last_purge = time.monotonic()
+        self.counts: Dict[str, int] = {"published": 0, "batches": 0, "failures": 0}
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None and not self._stopping:
+                self._thread = Thread(target=self._run, name="outbox-relay", daemon=True)
+                self._thread.start()
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def run_once(self) -> int:
+        """Publish one batch of pending rows; returns how many were published. Raises on publish failure."""
+        store = self._store()
+        rows = store.pending_outbox(self.batch_size)
+        if rows:
+            self._publish([{key: value for key, value in row.items() if key != "outboxId"} for row in rows])
+            store.mark_outbox_sent([row["outboxId"] for row in rows])
+            with self._lock:
+                self.counts["published"] += len(rows)
+                self.counts["batches"] += 1
+        if time.monotonic() - self._last_purge >= self.purge_every:
+            self._last_purge = time.monotonic()
+            store.purge_outbox(sent_before=datetime.now(timezone.utc) - self.retain_sent)
+        return len(rows)
+
+    def _run(self) -> None:
+        backoff = self.interval
+        while True:
+            # A stop requested mid-pass gets one more pass, so rows committed before stop() are sent.
+            final_pass = self._stopping
+            try:
+                published = self.run_once()
+            except Exception as exc:
+                with self._lock:
+                    self.counts["failures"] += 1
+                # Exception type only: messages from HTTP clients can echo payloads.
+                logger.warning("outbox publish failed (%s); retrying in %.1fs", type(exc).__name__, backoff)
+                wait, backoff = backoff, min(backoff * 2, self.max_backoff)
+            else:
+                backoff = self.interval
+                if published == self.batch_size:
+                    continue  # more may be waiting, including while stopping
+                wait = self.interval
+            if final_pass:
+                return
+            if self._stopping:
+                continue
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def stop(self, timeout: float | None = None) -> bool:
+        """Drain what can be published, then stop; returns False if the thread outlived ``timeout``."""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        self._wake.set()
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+__all__ = ["OutboxRelay"]
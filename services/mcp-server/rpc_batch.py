@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Mapping
+
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+# Tool raised ValueError/TypeError: the payload was rejected (schema, task
+# validation) and a retry cannot succeed. Any other exception is TOOL_ERROR,
+# i.e. the tool's downstream (SQL, Event Grid, FHIR) failed.
+INVALID_PARAMS = -32602
+TOOL_ERROR = -32000
+DEPENDENCY_FAILED = -32001
+
+
+def _error(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+async def dispatch_batch(
+    requests: list[Any],
+    tools: Mapping[str, Callable[..., Any]],
+    *,
+    max_concurrency: int = 16,
+    timings: dict[Any, float] | None = None,
+) -> list[dict[str, Any]]:
+    """Execute a JSON-RPC 2.0 batch of tool calls and return one response per request.
+
+    Members run concurrently (at most ``max_concurrency`` at a time). A member
+    may name another member's id in ``dependsOn``; it then waits for that call
+    and is skipped with a ``DEPENDENCY_FAILED`` error if the dependency errored.
+    Dependencies must appear earlier in the batch, which rules out cycles. This
+    is how callers order an emit after the upsert it describes. Requests
+    without an id are notifications and get no response entry. A tool raising
+    ValueError/TypeError yields ``INVALID_PARAMS``, any other exception
+    ``TOOL_ERROR``, so callers can tell rejected payloads from failing
+    downstreams. If ``timings``
+    is given it receives each executed call's tool time in seconds, by id.
+    """
+    gate = asyncio.Semaphore(max_concurrency)
+    outcomes: dict[Any, asyncio.Future[bool]] = {}
+    positions: dict[Any, int] = {}
+    loop = asyncio.get_running_loop()
+    for index, member in enumerate(requests):
+        if isinstance(member, dict) and member.get("id") is not None:
+            outcomes.setdefault(member["id"], loop.create_future())
+            positions.setdefault(member["id"], index)
+
+    async def run(index: int, member: Any) -> dict[str, Any] | None:
+        request_id = member.get("id") if isinstance(member, dict) else None
+        invalid = not isinstance(member, dict) or member.get("jsonrpc") != "2.0" or "method" not in member
+        if invalid:
+            response = _error(request_id, INVALID_REQUEST, "invalid request")
+        else:
+            response = await _execute(index, member, request_id)
+        done = outcomes.get(request_id)
+        if done is not None and not done.done():
+            done.set_result("error" not in response)
+        return response if invalid or request_id is not None else None
+
+    async def _execute(index: int, member: dict[str, Any], request_id: Any) -> dict[str, Any]:
+        dependency = member.get("dependsOn")
+        if dependency is not None:
+            if positions.get(dependency, index) >= index:
+                return _error(request_id, INVALID_REQUEST, f"unknown dependency: {dependency}")
+            if not await outcomes[dependency]:
+                return _error(request_id, DEPENDENCY_FAILED, f"dependency failed: {dependency}")
+
+        tool = tools.get(member["method"])
+        if tool is None:
+            return _error(request_id, METHOD_NOT_FOUND, f"method not found: {member['method']}")
+        params = member.get("params") or {}
+        if not isinstance(params, dict):
+            return _error(request_id, INVALID_REQUEST, "params must be an object")
+
+        async with gate:
+            started = time.perf_counter()
+            try:
+                result: Any = tool(**params)
+                if inspect.isawaitable(result):
+                    result = await result
+            except (ValueError, TypeError) as exc:
+                return _error(request_id, INVALID_PARAMS, f"{type(exc).__name__}: {exc}")
+            except Exception as exc:
+                return _error(request_id, TOOL_ERROR, f"{type(exc).__name__}: {exc}")
+            finally:
+                if timings is not None and request_id is not None:
+                    timings[request_id] = time.perf_counter() - started
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    responses = await asyncio.gather(*(run(index, member) for index, member in enumerate(requests)))
+    return [response for response in responses if response is not None]
+
+
+__all__ = ["dispatch_batch"]
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Recount care_tasks and compare against patient_task_summary."
+    )
+    parser.add_argument("--repair", action="store_true", help="rebuild the summary when it has drifted")
+    args = parser.parse_args(argv)
+
+    # Imported lazily so --help works without the MCP stack configured.
+    from app import get_task_store
+
+    diffs = get_task_store().check_task_summary(repair=args.repair)
+    for diff in diffs:
+        print(json.dumps(diff))
+    print(json.dumps({"mismatches": len(diffs), "repaired": bool(diffs and args.repair)}))
+    return 1 if diffs and not args.repair else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,35 +2,70 @@ from __future__ import annotations
 
 import os
 import sqlite3
+from datetime import date
+from threading import BoundedSemaphore
 from typing import Any
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
+
+from change_feed import ChangeFeed
+from common.serialization import dumps
+from common.server import ServerOptions, register_drain, serve_wsgi
+from common.task_model import TASK_SELECT_COLUMNS, TASK_STATUSES, rows_to_json
+from common.task_store import TaskVersionConflict, create_task_store
 
 app = Flask(__name__)
 
 TASK_DB_PATH = os.environ.get("TASK_DB_PATH", "/data/tasks.db")
-VALID_STATUS = {"open", "done", "cancelled"}
+TASK_DB_MODE = os.environ.get("TASK_DB_MODE", "sqlite")
+SQL_SERVER = os.environ.get("SQL_SERVER")
+SQL_DATABASE = os.environ.get("SQL_DATABASE")
+SQL_USERNAME = os.environ.get("SQL_USERNAME")
+SQL_PASSWORD = os.environ.get("SQL_PASSWORD")
+SQL_CONNECTION_STRING = os.environ.get("SQL_CONNECTION_STRING")
+AZURE_CLIENT_ID = os.environ.get("AZURE_CLIENT_ID")
+TASK_DB_DSN = os.environ.get("TASK_DB_DSN")
+TASK_DB_POOL_MIN = int(os.environ.get("TASK_DB_POOL_MIN", "1"))
+TASK_DB_POOL_MAX = int(os.environ.get("TASK_DB_POOL_MAX", "10"))
+VALID_STATUS = set(TASK_STATUSES)
+CHANGE_POLL_SECONDS = float(os.environ.get("CHANGE_POLL_SECONDS", "1.0"))
+MAX_LONG_POLL_SECONDS = 60.0
+CHANGE_FEED = ChangeFeed(TASK_DB_PATH, poll_interval=CHANGE_POLL_SECONDS)
+# Open streams would otherwise hold the worker until the graceful timeout.
+register_drain(CHANGE_FEED.close)
+# SSE streams and long polls park a gthread worker thread for their whole
+# duration; past this many per worker they get 503 so reads and PATCHes always
+# have threads left.
+WEB_THREADS = ServerOptions.from_env(7100).threads
+MAX_OPEN_STREAMS = int(os.environ.get("MAX_OPEN_STREAMS", WEB_THREADS // 2))
+if not 0 <= MAX_OPEN_STREAMS < WEB_THREADS:
+    raise ValueError("MAX_OPEN_STREAMS must be between 0 and WEB_THREADS - 1")
+STREAM_RETRY_AFTER_SECONDS = 5
+_STREAM_SLOTS = BoundedSemaphore(MAX_OPEN_STREAMS) if MAX_OPEN_STREAMS else None
+# Status changes, summaries and audit reads go to the same backend mcp-server
+# writes; the task list and change feed below still read the SQLite file.
+TASK_STORE = create_task_store(
+    mode=TASK_DB_MODE,
+    sqlite_path=TASK_DB_PATH,
+    sql_server=SQL_SERVER,
+    sql_database=SQL_DATABASE,
+    sql_username=SQL_USERNAME,
+    sql_password=SQL_PASSWORD,
+    sql_connection_string=SQL_CONNECTION_STRING,
+    managed_identity_client_id=AZURE_CLIENT_ID,
+    postgres_dsn=TASK_DB_DSN,
+    postgres_pool_min=TASK_DB_POOL_MIN,
+    postgres_pool_max=TASK_DB_POOL_MAX,
+)
+MAX_AUDIT_LIMIT = 1000
+MAX_SUMMARY_PATIENTS = 500
+MAX_BULK_STATUS_CHANGES = 500
 
 
 def _get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(TASK_DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-def _row_to_dict(row: sqlite3.Row) -> dict[str, Any]:
-    return {
-        "taskId": row["task_id"],
-        "patientId": row["patient_id"],
-        "category": row["category"],
-        "title": row["title"],
-        "dueDate": row["due_date"],
-        "priority": row["priority"],
-        "status": row["status"],
-        "sourceEncounterId": row["source_encounter_id"],
-        "createdUtc": row["created_utc"],
-        "updatedUtc": row["updated_utc"],
-    }
+    # Plain tuple rows: columns are selected in TASK_SELECT_COLUMNS order and
+    # zipped straight into the response shape.
+    return sqlite3.connect(TASK_DB_PATH)
 
 
 @app.get("/patients/<patient_id>/tasks")
@@ -39,7 +74,7 @@ def get_tasks(patient_id: str):
     if status and status not in VALID_STATUS:
         return jsonify({"error": "invalid status"}), 400
 
-    query = "select * from care_tasks where patient_id = ?"
+    query = f"select {TASK_SELECT_COLUMNS} from care_tasks where patient_id = ?"
     params: list[Any] = [patient_id]
     if status:
         query += " and status = ?"
@@ -50,8 +85,142 @@ def get_tasks(patient_id: str):
     with _get_connection() as conn:
         rows = conn.execute(query, params).fetchall()
 
-    tasks = [_row_to_dict(row) for row in rows]
-    return jsonify(tasks)
+    return app.response_class(dumps(rows_to_json(rows)), mimetype="application/json")
+
+
+@app.post("/patients/task-summary")
+def get_task_summaries():
+    """Open/overdue task counts for many patients in one call, read from the maintained summary."""
+    body = request.get_json(silent=True) or {}
+    patient_ids = body.get("patientIds")
+    if not isinstance(patient_ids, list) or not all(isinstance(pid, str) for pid in patient_ids):
+        return jsonify({"error": "patientIds must be a list of strings"}), 400
+    if len(patient_ids) > MAX_SUMMARY_PATIENTS:
+        return jsonify({"error": f"at most {MAX_SUMMARY_PATIENTS} patientIds per call"}), 400
+    as_of = body.get("asOf") or date.today().isoformat()
+    summaries = TASK_STORE.summarize_patients(patient_ids, as_of=as_of)
+    empty = {"open": 0, "overdue": 0, "byCategory": {}}
+    result = {pid: summaries.get(pid, empty) for pid in patient_ids}
+    return app.response_class(dumps(result), mimetype="application/json")
+
+
+def _actor() -> str:
+    return request.headers.get("X-Actor") or "tasks-api"
+
+
+@app.patch("/tasks/<task_id>")
+def update_task_status(task_id: str):
+    """Change one task's status; ``version`` (or If-Match) must match the task's current version."""
+    body = request.get_json(silent=True) or {}
+    version = body.get("version")
+    if version is None and request.headers.get("If-Match"):
+        etag = request.headers["If-Match"].strip('"')
+        version = int(etag) if etag.isascii() and etag.isdigit() else etag
+    if version is None:
+        return jsonify({"error": "version is required"}), 400
+    # bool is an int subclass and 1.9 would truncate, so only exact ints match.
+    if type(version) is not int:
+        return jsonify({"error": "version must be an integer"}), 400
+    try:
+        result = TASK_STORE.update_status(task_id, body.get("status"), expected_version=version, actor=_actor())
+    except TaskVersionConflict as exc:
+        if exc.current_version is None:
+            return jsonify({"error": "task not found"}), 404
+        return jsonify({"error": "version conflict", "currentVersion": exc.current_version}), 409
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    response = jsonify(result)
+    response.headers["ETag"] = f'"{result["version"]}"'
+    return response
+
+
+@app.patch("/tasks")
+def bulk_update_task_status():
+    """Apply many status changes in one transaction; stale entries are listed under ``conflicts``."""
+    body = request.get_json(silent=True) or {}
+    changes = body.get("changes")
+    if not isinstance(changes, list) or not all(isinstance(change, dict) for change in changes):
+        return jsonify({"error": "changes must be a list of objects"}), 400
+    if len(changes) > MAX_BULK_STATUS_CHANGES:
+        return jsonify({"error": f"at most {MAX_BULK_STATUS_CHANGES} changes per call"}), 400
+    try:
+        result = TASK_STORE.bulk_update_status(changes, actor=_actor())
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return app.response_class(dumps(result), mimetype="application/json")
+
+
+@app.get("/tasks/<task_id>/audit")
+def get_task_audit(task_id: str):
+    """Audit trail for one task, newest first; ``since``/``until`` are ISO-8601 bounds."""
+    limit = request.args.get("limit", default=100, type=int)
+    if limit < 1:
+        return jsonify({"error": "limit must be at least 1"}), 400
+    entries = TASK_STORE.query_audit(
+        task_id,
+        since=request.args.get("since"),
+        until=request.args.get("until"),
+        limit=min(limit, MAX_AUDIT_LIMIT),
+    )
+    return app.response_class(dumps(entries), mimetype="application/json")
+
+
+def _take_stream_slot() -> bool:
+    return _STREAM_SLOTS is not None and _STREAM_SLOTS.acquire(blocking=False)
+
+
+def _streams_busy() -> tuple[Response, int]:
+    response = jsonify({"error": "too many open streams"})
+    response.headers["Retry-After"] = str(STREAM_RETRY_AFTER_SECONDS)
+    return response, 503
+
+
+def _resume_from() -> int | None:
+    raw = request.headers.get("Last-Event-ID") or request.args.get("since") or "0"
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return None
+
+
+@app.get("/patients/<patient_id>/tasks/changes")
+def get_task_changes(patient_id: str):
+    """Long-poll for task changes after ``since`` (or Last-Event-ID)."""
+    since = _resume_from()
+    if since is None:
+        return jsonify({"error": "invalid since"}), 400
+    wait = min(request.args.get("wait", default=0.0, type=float), MAX_LONG_POLL_SECONDS)
+    if wait > 0:
+        if not _take_stream_slot():
+            return _streams_busy()
+        try:
+            changes = CHANGE_FEED.wait_for_changes(patient_id, since, timeout=wait)
+        finally:
+            _STREAM_SLOTS.release()
+    else:
+        changes = CHANGE_FEED.fetch_since(patient_id, since)
+    last_event_id = changes[-1]["seq"] if changes else since
+    body = {"changes": changes, "lastEventId": last_event_id}
+    return app.response_class(dumps(body), mimetype="application/json")
+
+
+@app.get("/patients/<patient_id>/tasks/stream")
+def stream_task_changes(patient_id: str):
+    """Server-Sent Events stream of task changes; reconnecting clients resume via Last-Event-ID."""
+    since = _resume_from()
+    if since is None:
+        return jsonify({"error": "invalid Last-Event-ID"}), 400
+    if not _take_stream_slot():
+        return _streams_busy()
+    response = Response(
+        stream_with_context(CHANGE_FEED.stream(patient_id, since)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Runs when the server closes the response, including a client that
+    # disconnects before the first frame.
+    response.call_on_close(_STREAM_SLOTS.release)
+    return response
 
 
 @app.get("/healthz")
@@ -61,4 +230,5 @@ def health() -> tuple[str, int]:
 
 if __name__ == "__main__":
     os.makedirs(os.path.dirname(TASK_DB_PATH), exist_ok=True)
-    app.run(host="0.0.0.0", port=7100)
+    # Reads are per-request WAL connections, so worker processes scale them freely.
+    serve_wsgi(app, default_port=7100, default_workers=os.cpu_count() or 1)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+from threading import Condition, Event, Thread
+from typing import Any, Iterator
+
+from common.serialization import dumps_str
+from common.task_model import TASK_COLUMNS, row_to_json
+
+_CHANGE_QUERY = f"""
+select c.seq, c.action, c.changed_utc, {", ".join(f"t.{column}" for column in TASK_COLUMNS)}
+from task_changes c
+join care_tasks t on t.task_id = c.task_id
+where c.patient_id = ? and c.seq > ?
+order by c.seq
+limit ?
+"""
+
+
+class ChangeFeed:
+    """Per-patient task change stream backed by the ``task_changes`` sequence.
+
+    One background thread polls ``max(seq)`` and wakes waiters only when the
+    sequence moves, so open streams cost nothing between changes and each
+    wake-up is a single indexed (patient_id, seq) range read. The poller only
+    runs while someone is waiting, so idle workers do not poll at all.
+    """
+
+    def __init__(self, db_path: str | Path, *, poll_interval: float = 1.0) -> None:
+        self.path = Path(db_path)
+        self.poll_interval = poll_interval
+        self._changed = Condition()
+        self._latest_seq = 0
+        self._poller: Thread | None = None
+        self._waiters = 0
+        self._closed = Event()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _read_latest_seq(self) -> int:
+        try:
+            with self._connect() as conn:
+                row = conn.execute("select max(seq) from task_changes").fetchone()
+        except sqlite3.OperationalError:
+            return 0  # mcp-server has not created the table yet
+        return int(row[0] or 0)
+
+    def _poll(self) -> None:
+        while not self._closed.wait(self.poll_interval):
+            latest = self._read_latest_seq()
+            with self._changed:
+                if latest != self._latest_seq:
+                    self._latest_seq = latest
+                    self._changed.notify_all()
+                if self._waiters == 0:
+                    self._poller = None
+                    return
+        with self._changed:
+            self._poller = None
+
+    def _add_waiter(self) -> None:
+        with self._changed:
+            self._waiters += 1
+            if self._poller is None and not self._closed.is_set():
+                self._latest_seq = self._read_latest_seq()
+                self._poller = Thread(target=self._poll, name="task-change-poller", daemon=True)
+                self._poller.start()
+
+    def _remove_waiter(self) -> None:
+        with self._changed:
+            self._waiters -= 1
+
+    @property
+    def polling(self) -> bool:
+        with self._changed:
+            return self._poller is not None
+
+    def close(self) -> None:
+        """Stop the poller and release waiters; later waits return immediately."""
+        self._closed.set()
+        with self._changed:
+            self._changed.notify_all()
+
+    def fetch_since(self, patient_id: str, since: int, limit: int = 100) -> list[dict[str, Any]]:
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(_CHANGE_QUERY, (patient_id, since, limit)).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        return [
+            {"seq": row[0], "action": row[1], "changedUtc": row[2], "task": row_to_json(row[3:])}
+            for row in rows
+        ]
+
+    def wait_for_changes(
+        self, patient_id: str, since: int, *, timeout: float, limit: int = 100
+    ) -> list[dict[str, Any]]:
+        """Long-poll: return changes after ``since``, blocking up to ``timeout`` seconds for new ones."""
+        self._add_waiter()
+        try:
+            deadline = time.monotonic() + timeout
+            seen_seq = -1
+            while not self._closed.is_set():
+                with self._changed:
+                    if self._latest_seq == seen_seq:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return []
+                        self._changed.wait(remaining)
+                    seen_seq = self._latest_seq
+                if seen_seq > since:
+                    changes = self.fetch_since(patient_id, since, limit)
+                    if changes:
+                        return changes
+                if time.monotonic() >= deadline:
+                    return []
+            return []
+        finally:
+            self._remove_waiter()
+
+    def stream(self, patient_id: str, since: int, *, heartbeat: float = 15.0) -> Iterator[str]:
+        """Yield Server-Sent Events frames until ``close()``, with comment heartbeats to keep proxies open."""
+        while not self._closed.is_set():
+            changes = self.wait_for_changes(patient_id, since, timeout=heartbeat)
+            if not changes:
+                yield ": keep-alive\n\n"
+                continue
+            for change in changes:
+                since = change["seq"]
+                yield format_sse(change)
+
+
+def format_sse(change: dict[str, Any]) -> str:
+    return f"id: {change['seq']}\nevent: task\ndata: {dumps_str(change)}\n\n"
+
+
+__all__ = ["ChangeFeed", "format_sse"]
@@ -0,0 +1,87 @@
+import sys
+import unittest
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services" / "fhir-listener"))
+
+from admission import AdmissionController  # noqa: E402
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class AdmissionControllerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = _Clock()
+        self.depth = 0
+        self.controller = AdmissionController(
+            rate=10,
+            burst=20,
+            patient_rate=1,
+            patient_burst=3,
+            latency_target=1.0,
+            max_queue_depth=100,
+            queue_depth=lambda: self.depth,
+            clock=self.clock,
+        )
+
+    def test_burst_then_global_rejection_with_retry_after(self) -> None:
+        for index in range(20):
+            self.assertTrue(self.controller.admit({f"P{index}": 1}).admitted)
+        decision = self.controller.admit({"P99": 2})
+        self.assertFalse(decision.admitted)
+        self.assertEqual(decision.reason, "global")
+        self.assertAlmostEqual(decision.retry_after, 0.2)
+        self.assertEqual(decision.retry_after_header, "1")
+
+        self.clock.now += 0.2
+        self.assertTrue(self.controller.admit({"P99": 2}).admitted)
+
+    def test_noisy_patient_is_limited_without_spending_global_budget(self) -> None:
+        self.assertTrue(self.controller.admit({"P1": 3}).admitted)
+        decision = self.controller.admit({"P1": 1, "P2": 1})
+        self.assertEqual((decision.admitted, decision.reason), (False, "patient"))
+        self.assertAlmostEqual(decision.retry_after, 1.0)
+        # The rejected delivery took nothing: 17 global tokens remain.
+        self.assertTrue(self.controller.admit({f"Q{i}": 1 for i in range(17)}).admitted)
+        self.assertFalse(self.controller.admit({"Q99": 1}).admitted)
+
+    def test_slow_downstream_and_queue_depth_shrink_the_rate(self) -> None:
+        self.assertEqual(self.controller.pressure(), 1.0)
+        for _ in range(20):
+            self.controller.observe(4.0)
+        self.assertAlmostEqual(self.controller.pressure(), 0.25, places=2)
+        self.depth = 50
+        self.assertAlmostEqual(self.controller.pressure(), 0.125, places=2)
+
+        self.controller.admit({f"P{i}": 1 for i in range(20)})
+        decision = self.controller.admit({"P99": 1})
+        # At 1/8 of 10 events/s one token takes ~0.8s instead of 0.1s.
+        self.assertAlmostEqual(decision.retry_after, 0.8, delta=0.01)
+
+    def test_full_queue_rejects_outright(self) -> None:
+        self.depth = 100
+        decision = self.controller.admit({"P1": 1})
+        self.assertEqual((decision.admitted, decision.reason), (False, "queue"))
+        self.assertGreaterEqual(decision.retry_after, 1.0)
+        self.assertIn('listener_admission_total{outcome="queue"} 1', self.controller.render_metrics())
+
+    def test_delivery_larger_than_burst_is_admitted_when_bucket_is_full(self) -> None:
+        self.assertTrue(self.controller.admit({f"P{i}": 1 for i in range(50)}).admitted)
+        self.assertFalse(self.controller.admit({"P99": 1}).admitted)
+
+    def test_patient_buckets_are_bounded(self) -> None:
+        controller = AdmissionController(rate=1000, burst=1000, max_patients=5, clock=self.clock)
+        for index in range(20):
+            controller.admit({f"P{index}": 1})
+        self.assertEqual(len(controller._patients), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+import unittest
+from importlib import util
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RUNTIME_MODULE = BASE_DIR / "services" / "mcp-server" / "async_runtime.py"
+
+spec = util.spec_from_file_location("async_runtime", RUNTIME_MODULE)
+assert spec and spec.loader
+module = util.module_from_spec(spec)
+spec.loader.exec_module(module)
+AsyncToolRuntime = module.AsyncToolRuntime
+
+
+class _StubResponse:
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return {"id": "D789"}
+
+
+class _StubClient:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get(self, url: str) -> _StubResponse:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return _StubResponse()
+
+
+class AsyncToolRuntimeTests(unittest.TestCase):
+    def test_http_calls_overlap_and_blocking_work_is_bounded(self) -> None:
+        client = _StubClient()
+        runtime = AsyncToolRuntime(blocking_workers=2, client=client)
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def db_write() -> str:
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.01)
+            with lock:
+                active["now"] -= 1
+            return "ok"
+
+        async def scenario() -> list:
+            fetches = [runtime.get_json("http://fhir/DocumentReference/D789") for _ in range(20)]
+            writes = [runtime.run_blocking(db_write) for _ in range(6)]
+            results = await asyncio.gather(*fetches, *writes)
+            await runtime.aclose()
+            return results
+
+        results = asyncio.run(scenario())
+
+        self.assertEqual(results[0], {"id": "D789"})
+        self.assertEqual(results[-1], "ok")
+        self.assertEqual(client.peak, 20)
+        self.assertEqual(active["peak"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
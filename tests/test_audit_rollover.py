@@ -0,0 +1,69 @@
+import sqlite3
+import sys
+import time
+import unittest
+from importlib import util
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+AUDIT_ROLLOVER_MODULE = BASE_DIR / "services" / "mcp-server" / "audit_rollover.py"
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+spec = util.spec_from_file_location("audit_rollover", AUDIT_ROLLOVER_MODULE)
+assert spec and spec.loader
+module = util.module_from_spec(spec)
+spec.loader.exec_module(module)
+AuditRolloverJob = module.AuditRolloverJob
+
+from common.task_store import SqliteTaskStore  # noqa: E402
+
+
+class AuditRolloverJobTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = Path(tmp.name) / "tasks.db"
+        self.store = SqliteTaskStore(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "insert into task_audit(task_id, action, actor, timestamp_utc, payload_json) values (?, 'upsert', 'test', ?, '{}')",
+                [("T1", "2020-01-15T08:00:00+00:00"), ("T1", "2020-02-20T08:00:00+00:00")],
+            )
+
+    def test_background_job_archives_on_start_and_stops(self) -> None:
+        job = AuditRolloverJob(lambda: self.store, every=3600, retain_months=3)
+        job.start()
+        deadline = time.monotonic() + 5
+        while job.runs == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        job.stop(timeout=5)
+
+        self.assertEqual((job.runs, job.failures), (1, 0))
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("select count(*) from task_audit").fetchone()[0], 0)
+            self.assertEqual(conn.execute("select count(*) from task_audit_202001").fetchone()[0], 1)
+
+    def test_failures_are_counted_and_retried(self) -> None:
+        calls = []
+
+        class _Broken:
+            def rollover_audit(self, *, retain_months: int) -> int:
+                calls.append(retain_months)
+                raise sqlite3.OperationalError("database is locked")
+
+        job = AuditRolloverJob(_Broken, every=0.01, retain_months=6)
+        job.start()
+        deadline = time.monotonic() + 5
+        while job.failures < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        job.stop(timeout=5)
+
+        self.assertGreaterEqual(job.failures, 2)
+        self.assertEqual(set(calls), {6})
+        with self.assertRaises(ValueError):
+            AuditRolloverJob(_Broken, every=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import sys
+import threading
+import time
+import unittest
+from importlib import util
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+
+def _load(name: str, path: Path):
+    spec = util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+task_store = _load("task_store", BASE_DIR / "services" / "common" / "task_store.py")
+change_feed = _load("change_feed", BASE_DIR / "services" / "tasks-api" / "change_feed.py")
+
+
+class ChangeFeedTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_path = Path(tmp.name) / "tasks.db"
+        self.store = task_store.SqliteTaskStore(db_path)
+        self.feed = change_feed.ChangeFeed(db_path, poll_interval=0.01)
+
+    def test_fetch_since_is_per_patient_and_resumable(self) -> None:
+        first = self.store.upsert({"patientId": "P123", "title": "BMP in 3 days"})
+        self.store.upsert({"patientId": "P999", "title": "Other patient"})
+        self.store.upsert({"patientId": "P123", "title": "Cardiology visit"})
+
+        changes = self.feed.fetch_since("P123", 0)
+        self.assertEqual([change["task"]["title"] for change in changes], ["BMP in 3 days", "Cardiology visit"])
+        self.assertEqual(changes[0]["task"]["taskId"], first["taskId"])
+
+        resumed = self.feed.fetch_since("P123", changes[0]["seq"])
+        self.assertEqual([change["seq"] for change in resumed], [changes[1]["seq"]])
+
+        frame = change_feed.format_sse(changes[1])
+        self.assertTrue(frame.startswith(f"id: {changes[1]['seq']}\nevent: task\ndata: {{"))
+        self.assertTrue(frame.endswith("\n\n"))
+
+    def test_long_poll_wakes_on_new_change(self) -> None:
+        self.assertEqual(self.feed.wait_for_changes("P123", 0, timeout=0.05), [])
+
+        timer = threading.Timer(0.05, self.store.upsert, args=({"patientId": "P123", "title": "BMP"},))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        started = time.monotonic()
+        changes = self.feed.wait_for_changes("P123", 0, timeout=5)
+
+        self.assertEqual(len(changes), 1)
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_poller_only_runs_while_someone_waits(self) -> None:
+        self.assertFalse(self.feed.polling)
+        self.feed.wait_for_changes("P123", 0, timeout=0.05)
+
+        deadline = time.monotonic() + 5
+        while self.feed.polling and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.feed.polling)
+
+    def test_close_releases_waiters_and_ends_streams(self) -> None:
+        waiter = threading.Thread(target=self.feed.wait_for_changes, args=("P123", 0), kwargs={"timeout": 30})
+        waiter.start()
+        time.sleep(0.05)
+        self.feed.close()
+        waiter.join(timeout=5)
+
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(list(self.feed.stream("P123", 0)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import base64
+import os
+import sys
+import threading
+import unittest
+from importlib import util
+from importlib.util import find_spec
+from pathlib import Path
+from unittest import mock
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services" / "copilot"))
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+from cache import ResponseCache  # noqa: E402
+from common.llm import StubLlmBackend, validate_followups  # noqa: E402
+from summarizer import Summarizer  # noqa: E402
+
+NOTE = (BASE_DIR / "ai" / "samples" / "note1.txt").read_text(encoding="utf-8")
+
+
+def _document(text: str, version: str | None = None) -> dict:
+    document = {
+        "resourceType": "DocumentReference",
+        "content": [{"attachment": {"contentType": "text/plain", "data": base64.b64encode(text.encode()).decode()}}],
+    }
+    if version:
+        document["meta"] = {"versionId": version}
+    return document
+
+
+class CopilotSummarizerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.documents = {"D789": _document(NOTE, "1")}
+        self.backend = StubLlmBackend(latency=0.05)
+        self.summarizer = Summarizer(self.backend, lambda patient, encounter, doc: self.documents[doc])
+
+    def test_result_matches_golden_schema_and_is_cached_per_version(self) -> None:
+        first = self.summarizer.summarize("P123", "E456", "D789")
+        self.assertEqual(validate_followups({"followUps": first["followUps"]}), [])
+        self.assertEqual([f["dueDate"] for f in first["followUps"]], ["2024-02-15", "2024-02-19", "2024-02-14"])
+        self.assertIn("Primary Diagnosis", first["summary"])
+        again = self.summarizer.summarize("P123", "E456", "D789")
+        self.assertEqual(again, first)
+        again["followUps"].clear()
+        self.assertEqual(self.summarizer.summarize("P123", "E456", "D789"), first)
+        self.assertEqual(self.backend.calls, 2)
+
+        self.documents["D789"] = _document(NOTE + "Addendum: weight up 2 kg.\n", "2")
+        self.summarizer.summarize("P123", "E456", "D789")
+        self.assertEqual(self.backend.calls, 4)
+        self.assertEqual(self.summarizer.stats["hits"], 2)
+
+    def test_concurrent_identical_requests_share_one_backend_call(self) -> None:
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.summarizer.summarize("P123", "E456", "D789")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 8)
+        self.assertEqual(self.backend.calls, 2)
+        self.assertEqual(self.summarizer.stats["misses"] + self.summarizer.stats["coalesced"], 8)
+
+    def test_model_only_sees_the_scrubbed_note(self) -> None:
+        prompts: list[str] = []
+        model = StubLlmBackend()
+        backend = StubLlmBackend(responder=lambda system, user: prompts.append(user) or model.complete(system, user))
+        summarizer = Summarizer(backend, lambda patient, encounter, doc: self.documents[doc])
+        summarizer.summarize("P123", "E456", "D789")
+        self.assertEqual(len(prompts), 2)
+        for prompt in prompts:
+            self.assertNotIn("Sarah", prompt)
+            self.assertIn("MRN: [MRN]", prompt)
+
+    def test_invalid_extraction_is_not_cached(self) -> None:
+        backend = StubLlmBackend(responder=lambda system, user: '{"followUps": [{"category": "x"}]}')
+        summarizer = Summarizer(backend, lambda patient, encounter, doc: self.documents[doc])
+        self.assertEqual(summarizer.summarize("P123", "E456", "D789")["followUps"], [])
+        summarizer.summarize("P123", "E456", "D789")
+        self.assertEqual(backend.calls, 4)
+
+    def test_cache_expires_and_evicts(self) -> None:
+        now = [0.0]
+        cache = ResponseCache(max_entries=2, ttl=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        now[0] = 11
+        self.assertIsNone(cache.get("a"))
+
+
+@unittest.skipUnless(find_spec("flask") and find_spec("requests"), "flask and requests are required")
+class CopilotAppErrorTests(unittest.TestCase):
+    BODY = {"patientId": "P123", "encounterId": "E456", "documentId": "D789"}
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        import requests
+
+        cls.requests = requests
+        with mock.patch.dict(os.environ, {"LLM_BACKEND": "stub", "LLM_ALLOW_STUB": "true"}):
+            spec = util.spec_from_file_location("copilot_app", BASE_DIR / "services" / "copilot" / "app.py")
+            assert spec and spec.loader
+            cls.app = util.module_from_spec(spec)
+            spec.loader.exec_module(cls.app)
+
+    def _post(self, fetch, complete=None):
+        summarizer = Summarizer(StubLlmBackend(responder=complete), fetch)
+        with mock.patch.object(self.app, "SUMMARIZER", summarizer):
+            response = self.app.app.test_client().post("/copilot/summarize", json=self.BODY)
+        return response.status_code, response.get_json()
+
+    def test_fetch_and_model_failures_are_reported_separately(self) -> None:
+        def fetch_fails(*args):
+            raise self.app.DocumentFetchError("document D789: HTTPError")
+
+        def model_times_out(system, user):
+            raise self.requests.Timeout("read timed out")
+
+        def model_fails(system, user):
+            raise self.requests.ConnectionError("refused")
+
+        fetch = lambda *args: _document(NOTE, "1")  # noqa: E731
+        self.assertEqual(self._post(fetch_fails), (502, {"error": "document fetch failed"}))
+        self.assertEqual(self._post(fetch, model_times_out), (504, {"error": "summarizer model timed out"}))
+        self.assertEqual(self._post(fetch, model_fails), (502, {"error": "summarizer model request failed"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import unittest
+from importlib import util
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LISTENER_DIR = BASE_DIR / "services" / "fhir-listener"
+sys.path.insert(0, str(LISTENER_DIR))
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+spec = util.spec_from_file_location("replay", LISTENER_DIR / "replay.py")
+assert spec and spec.loader
+module = util.module_from_spec(spec)
+spec.loader.exec_module(module)
+replay_dead_letters = module.replay_dead_letters
+EventStore = module.EventStore
+
+EVENT = {
+    "id": "evt-1",
+    "eventType": "DischargeCreated",
+    "data": {"patientId": "P123", "encounterId": "E456", "documentId": "D789"},
+}
+
+
+class DeadLetterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = EventStore(Path(tmp.name) / "listener.db")
+
+    def test_record_failure_counts_attempts(self) -> None:
+        self.assertEqual(self.store.failure_attempts("evt-1"), 0)
+        self.assertEqual(self.store.record_failure(EVENT, "boom"), 1)
+        self.assertEqual(self.store.record_failure(EVENT, "boom again"), 2)
+
+        [entry] = self.store.list_dead_letters()
+        self.assertEqual(entry["attempts"], 2)
+        self.assertEqual(entry["failureReason"], "boom again")
+        self.assertEqual(entry["patientId"], "P123")
+        self.assertEqual(entry["event"], EVENT)
+
+    def test_min_attempts_dead_letters_at_once(self) -> None:
+        self.assertEqual(self.store.record_failure(EVENT, "schema", min_attempts=5), 5)
+        self.assertEqual(self.store.record_failure(EVENT, "schema", min_attempts=5), 6)
+        self.assertEqual(self.store.failure_attempts("evt-1"), 6)
+
+    def test_replay_clears_successes_and_keeps_failures(self) -> None:
+        poison = dict(EVENT, id="evt-2")
+        self.store.record_failure(EVENT, "transient")
+        self.store.record_failure(poison, "poison")
+
+        def handler(evt: dict) -> None:
+            if evt["id"] == "evt-2":
+                raise ValueError("still broken")
+
+        summary = replay_dead_letters(self.store, handler, concurrency=2)
+
+        self.assertEqual(summary["replayed"], 2)
+        self.assertEqual(summary["succeeded"], 1)
+        self.assertEqual(summary["failed"], ["evt-2"])
+        self.assertEqual(self.store.failure_attempts("evt-1"), 0)
+        self.assertEqual(self.store.failure_attempts("evt-2"), 2)
+
+    def test_replay_skips_events_still_inside_inline_retries(self) -> None:
+        retrying = dict(EVENT, id="evt-2")
+        self.store.record_failure(EVENT, "poison", min_attempts=5)
+        self.store.record_failure(retrying, "transient")
+        replayed: list[str] = []
+
+        summary = replay_dead_letters(self.store, lambda evt: replayed.append(evt["id"]), min_attempts=5)
+
+        self.assertEqual(summary["replayed"], 1)
+        self.assertEqual(replayed, ["evt-1"])
+        self.assertEqual(self.store.failure_attempts("evt-2"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import unittest
+from importlib import util
+from importlib.util import find_spec
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LISTENER_DIR = BASE_DIR / "services" / "fhir-listener"
+sys.path.insert(0, str(LISTENER_DIR))
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+EVENT = {
+    "id": "evt-1",
+    "eventType": "DischargeCreated",
+    "data": {"patientId": "P123", "encounterId": "E456", "documentId": "D789"},
+}
+VALID = {"category": "lab", "title": "BMP in 3 days", "dueDate": None, "priority": "normal", "patientId": "P123"}
+
+
+@unittest.skipUnless(find_spec("flask") and find_spec("jsonschema"), "flask and jsonschema are required")
+class FollowUpValidationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        tmp = TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        cls.tmp = Path(tmp.name)
+        with mock.patch.dict(os.environ, {"EVENT_STORE_PATH": str(cls.tmp / "listener.db"), "EXTRACTION_MODE": "rules"}):
+            spec = util.spec_from_file_location("listener_app", LISTENER_DIR / "app.py")
+            assert spec and spec.loader
+            cls.app = util.module_from_spec(spec)
+            spec.loader.exec_module(cls.app)
+
+    def setUp(self) -> None:
+        self.batches: list[list[dict]] = []
+        self.app.EVENT_STORE = self.app.EventStore(self.tmp / f"{self._testMethodName}.db")
+        for name, value in (
+            ("mcp_call", lambda method, params: {"content": []}),
+            ("decode_document_text", lambda document: "note"),
+            ("mcp_batch", lambda calls: self.batches.append(calls) or [{"result": {}} for _ in calls]),
+        ):
+            patcher = mock.patch.object(self.app, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _extract(self, followups: list[dict]) -> None:
+        patcher = mock.patch.object(self.app, "extract_followups", lambda *args, **kwargs: followups)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_invalid_followup_is_dropped_and_the_rest_are_written(self) -> None:
+        self._extract([dict(VALID, category="imaging"), VALID])
+        self.app.handle_discharge_created(EVENT)
+
+        [calls] = self.batches
+        self.assertEqual([call["params"]["taskJson"]["taskId"] for call in calls], [self.app._task_id_for("evt-1", 1)])
+        self.assertTrue(self.app.EVENT_STORE.has_seen("evt-1"))
+
+    def test_discharge_with_no_valid_followups_is_rejected(self) -> None:
+        self._extract([dict(VALID, category="imaging"), dict(VALID, title=None)])
+        with self.assertRaises(self.app.EventValidationError) as raised:
+            self.app.handle_discharge_created(EVENT)
+
+        self.assertEqual(
+            raised.exception.errors,
+            ['followUps[0].category: must be one of ["lab", "med", "visit", "other"]', "followUps[1].title: expected string"],
+        )
+        self.assertEqual(self.batches, [])
+        self.assertFalse(self.app.EVENT_STORE.has_seen("evt-1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
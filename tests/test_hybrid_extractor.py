@@ -0,0 +1,97 @@
+import base64
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from importlib import util
+from pathlib import Path
+from unittest import mock
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LISTENER_DIR = BASE_DIR / "services" / "fhir-listener"
+sys.path.insert(0, str(LISTENER_DIR))
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+from common.llm import StubLlmBackend, create_llm_backend, validate_followups  # noqa: E402
+
+spec = util.spec_from_file_location("hybrid_extractor", LISTENER_DIR / "hybrid_extractor.py")
+assert spec and spec.loader
+module = util.module_from_spec(spec)
+spec.loader.exec_module(module)
+HybridExtractor = module.HybridExtractor
+
+NOTE = (BASE_DIR / "ai" / "samples" / "note1.txt").read_text(encoding="utf-8")
+UNUSUAL_NOTE = (
+    "Patient: John Doe (P777)\n"
+    "Encounter: E900 | Discharge Date: 2024-03-01\n"
+    "Follow-up Instructions:\n"
+    "1. Labs: Repeat CBC in 5 days.\n"
+    "2. Imaging: Chest x-ray in 2 weeks to confirm resolution of pneumonia.\n"
+)
+
+
+def _document(text: str) -> dict:
+    return {"content": [{"attachment": {"data": base64.b64encode(text.encode()).decode()}}]}
+
+
+class HybridExtractorTests(unittest.TestCase):
+    def test_confident_rules_skip_the_model(self) -> None:
+        backend = StubLlmBackend()
+        extractor = HybridExtractor(backend, max_wait=0.01)
+        followups = extractor.extract(_document(NOTE), "P123", "E456")
+        self.assertEqual([f["category"] for f in followups], ["lab", "visit", "med"])
+        self.assertEqual(backend.calls, 0)
+        self.assertEqual(extractor.stats()["cheapFraction"], 1.0)
+
+    def test_pre_decoded_note_is_used_as_is(self) -> None:
+        extractor = HybridExtractor(StubLlmBackend(), max_wait=0.01)
+        self.assertEqual(
+            extractor.extract({}, "P123", "E456", note_text=NOTE),
+            extractor.extract(_document(NOTE), "P123", "E456"),
+        )
+
+    def test_unconfident_notes_are_batched_and_schema_checked(self) -> None:
+        backend = StubLlmBackend(latency=0.02)
+        extractor = HybridExtractor(backend, max_batch=4, max_wait=0.2)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: extractor.extract(_document(UNUSUAL_NOTE), "P777", "E900"), range(4)))
+        self.assertEqual(backend.calls, 1)
+        for followups in results:
+            self.assertEqual([(f["category"], f["dueDate"]) for f in followups], [("lab", "2024-03-06"), ("other", "2024-03-15")])
+            stripped = [{k: v for k, v in f.items() if k not in ("patientId", "sourceEncounterId")} for f in followups]
+            self.assertEqual(validate_followups({"followUps": stripped}), [])
+        self.assertEqual(extractor.stats()["tiers"]["llm"]["count"], 4)
+
+    def test_invalid_model_output_falls_back_to_rules(self) -> None:
+        backend = StubLlmBackend(responder=lambda system, user: '{"results": {}}')
+        extractor = HybridExtractor(backend, max_wait=0.01)
+        followups = extractor.extract(_document(UNUSUAL_NOTE), "P777", "E900")
+        self.assertEqual([f["category"] for f in followups], ["lab"])
+        self.assertEqual(extractor.stats()["tiers"]["llm_failed"]["count"], 1)
+
+    def test_model_only_sees_the_scrubbed_note(self) -> None:
+        prompts: list[str] = []
+        model = StubLlmBackend()
+        backend = StubLlmBackend(responder=lambda system, user: prompts.append(user) or model.complete(system, user))
+        extractor = HybridExtractor(backend, max_wait=0.01)
+        note = UNUSUAL_NOTE.replace("Follow-up", "MRN: 555443\nFollow-up")
+
+        followups = extractor.extract(_document(note), "P777", "E900")
+
+        self.assertEqual(len(followups), 2)
+        [prompt] = prompts
+        for leaked in ("John", "Doe", "555443"):
+            self.assertNotIn(leaked, prompt)
+        self.assertIn("Patient: [NAME] (P777)", prompt)
+        self.assertIn("Discharge Date: 2024-03-01", prompt)
+
+    def test_stub_backend_is_refused_unless_allowed(self) -> None:
+        with self.assertRaises(ValueError):
+            create_llm_backend("stub", allow_stub=False)
+        with mock.patch.dict(os.environ, {}, clear=True), self.assertRaises(ValueError):
+            create_llm_backend(allow_stub=True)
+        self.assertIsInstance(create_llm_backend("stub", allow_stub=True), StubLlmBackend)
+
+
+if __name__ == "__main__":
+    unittest.main()
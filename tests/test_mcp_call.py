@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+import unittest
+from importlib import util
+from importlib.util import find_spec
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LISTENER_DIR = BASE_DIR / "services" / "fhir-listener"
+sys.path.insert(0, str(LISTENER_DIR))
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+
+class _Response:
+    def __init__(self, body: dict | None = None, status: int = 200) -> None:
+        self.content = json.dumps(body or {}).encode("utf-8")
+        self.status = status
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+
+class _StubHttp:
+    """Answers every POST with ``reply(payload)``; counts the calls."""
+
+    def __init__(self, reply) -> None:
+        self.reply = reply
+        self.calls = 0
+
+    def post(self, url: str, data: bytes | None = None, **kwargs) -> _Response:
+        self.calls += 1
+        return self.reply(json.loads(data))
+
+
+@unittest.skipUnless(find_spec("flask") and find_spec("jsonschema"), "flask and jsonschema are required")
+class McpCallResilienceTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        tmp = TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        env = {
+            "EVENT_STORE_PATH": str(Path(tmp.name) / "listener.db"),
+            "BREAKER_FAILURE_THRESHOLD": "3",
+            "CONCURRENCY_INITIAL_LIMIT": "16",
+            "MCP_RETRIES": "1",
+        }
+        with mock.patch.dict(os.environ, env):
+            spec = util.spec_from_file_location("listener_app", LISTENER_DIR / "app.py")
+            assert spec and spec.loader
+            cls.app = util.module_from_spec(spec)
+            spec.loader.exec_module(cls.app)
+
+    def setUp(self) -> None:
+        self.app.RESILIENCE = self.app.ResilienceRegistry(failure_threshold=3, reset_timeout=60, initial_limit=16)
+
+    def _stub(self, reply) -> _StubHttp:
+        stub = _StubHttp(reply)
+        patcher = mock.patch.object(self.app, "_HTTP", stub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return stub
+
+    def test_downstream_failures_open_the_breaker_and_shrink_the_limiter(self) -> None:
+        stub = self._stub(lambda payload: _Response({"id": payload["id"], "error": {"code": -32000, "message": "sql down"}}))
+        for _ in range(3):
+            with self.assertRaises(self.app.McpToolError):
+                self.app.mcp_call("upsert_task", {"taskJson": {}})
+
+        self.assertEqual(self.app.RESILIENCE.breaker("mcp:upsert_task").state, "open")
+        self.assertEqual(self.app.RESILIENCE.breaker("sql").state, "open")
+        self.assertLess(self.app.RESILIENCE.limiter("sql").limit, 16)
+        with self.assertRaises(self.app.CircuitOpenError):
+            self.app.mcp_call("upsert_task", {"taskJson": {}})
+        self.assertEqual(stub.calls, 3)
+
+    def test_rejected_payloads_do_not_count_against_the_downstream(self) -> None:
+        self._stub(lambda payload: _Response({"id": payload["id"], "error": {"code": -32602, "message": "invalid"}}))
+        for _ in range(5):
+            with self.assertRaises(self.app.McpToolError):
+                self.app.mcp_call("upsert_task", {"taskJson": {}})
+
+        self.assertEqual(self.app.RESILIENCE.breaker("sql").state, "closed")
+        self.assertEqual(self.app.RESILIENCE.limiter("sql").limit, 16)
+
+    def test_http_errors_are_retried_without_sleeping(self) -> None:
+        stub = self._stub(lambda payload: _Response(status=503))
+        with mock.patch.object(self.app.time, "sleep") as sleep:
+            with self.assertRaises(RuntimeError):
+                self.app.mcp_call("emit_eventgrid", {}, retries=2)
+        self.assertEqual(stub.calls, 2)
+        sleep.assert_not_called()
+        self.assertEqual(self.app.RESILIENCE.breaker("eventgrid").state, "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
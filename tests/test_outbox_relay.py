@@ -0,0 +1,93 @@
+import sys
+import time
+import unittest
+from importlib import util
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+OUTBOX_RELAY_MODULE = BASE_DIR / "services" / "mcp-server" / "outbox_relay.py"
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+spec = util.spec_from_file_location("outbox_relay", OUTBOX_RELAY_MODULE)
+assert spec and spec.loader
+module = util.module_from_spec(spec)
+spec.loader.exec_module(module)
+OutboxRelay = module.OutboxRelay
+
+from common.task_store import SqliteTaskStore  # noqa: E402
+
+
+def _event(task_id: str) -> dict:
+    return {
+        "eventType": "TaskCreated",
+        "subject": f"patients/P123/tasks/{task_id}",
+        "data": {"patientId": "P123", "taskId": task_id, "category": "lab", "title": "BMP"},
+    }
+
+
+class OutboxRelayTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = SqliteTaskStore(Path(tmp.name) / "tasks.db")
+        for index in range(5):
+            self.store.upsert({"taskId": f"T{index}", "patientId": "P123", "title": "BMP"}, event=_event(f"T{index}"))
+        self.published: list[list[dict]] = []
+
+    def _publish(self, events: list[dict]) -> None:
+        self.published.append(events)
+
+    def test_publishes_in_batches_in_commit_order_and_marks_sent(self) -> None:
+        relay = OutboxRelay(lambda: self.store, self._publish, batch_size=2)
+
+        self.assertEqual([relay.run_once() for _ in range(4)], [2, 2, 1, 0])
+
+        subjects = [event["subject"].rsplit("/", 1)[1] for batch in self.published for event in batch]
+        self.assertEqual(subjects, ["T0", "T1", "T2", "T3", "T4"])
+        self.assertNotIn("outboxId", self.published[0][0])
+        self.assertEqual(self.store.pending_outbox(), [])
+        self.assertEqual(relay.stats(), {"published": 5, "batches": 3, "failures": 0})
+
+    def test_failed_publish_is_retried_with_the_same_event_ids(self) -> None:
+        attempts: list[list[str]] = []
+
+        def flaky(events: list[dict]) -> None:
+            attempts.append([event["id"] for event in events])
+            if len(attempts) == 1:
+                raise ConnectionError("event grid unavailable")
+
+        relay = OutboxRelay(lambda: self.store, flaky, batch_size=10)
+        with self.assertRaises(ConnectionError):
+            relay.run_once()
+        self.assertEqual(len(self.store.pending_outbox()), 5)
+
+        self.assertEqual(relay.run_once(), 5)
+        self.assertEqual(attempts[0], attempts[1])
+
+    def test_background_thread_backs_off_and_drains_before_stopping(self) -> None:
+        failures = []
+
+        def fail_twice(events: list[dict]) -> None:
+            if len(failures) < 2:
+                failures.append(len(events))
+                raise ConnectionError("event grid unavailable")
+            self.published.append(events)
+
+        relay = OutboxRelay(lambda: self.store, fail_twice, batch_size=2, interval=0.01, max_backoff=0.02)
+        relay.start()
+        deadline = time.monotonic() + 5
+        while relay.stats()["published"] < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.store.upsert({"taskId": "T9", "patientId": "P123", "title": "BMP"}, event=_event("T9"))
+        relay.notify()
+        self.assertTrue(relay.stop(timeout=5))
+
+        self.assertEqual(failures, [2, 2])
+        self.assertEqual(sum(len(batch) for batch in self.published), 6)
+        self.assertEqual(self.store.pending_outbox(), [])
+        self.assertEqual(relay.stats()["failures"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import random
+import sys
+import threading
+import time
+import unittest
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services" / "fhir-listener"))
+
+from partitioner import PartitionedExecutor  # noqa: E402
+
+
+class PartitionedExecutorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.executor = PartitionedExecutor(8)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_same_patient_events_apply_in_order_under_concurrent_load(self) -> None:
+        patients = [f"P{i}" for i in range(40)]
+        applied: dict[str, list[int]] = defaultdict(list)
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+        rng = random.Random(7)
+        delays = [rng.uniform(0, 0.002) for _ in range(4096)]
+
+        def apply(patient: str, seq: int) -> None:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(delays[(seq * 31 + len(patient)) % len(delays)])
+            with lock:
+                running -= 1
+                applied[patient].append(seq)
+
+        # Each submitter owns a slice of patients and interleaves them, so
+        # several request threads feed the lanes at once.
+        def submitter(owned: list[str]) -> list:
+            futures = []
+            for seq in range(25):
+                for patient in owned:
+                    futures.append(self.executor.submit(patient, apply, patient, seq))
+            return futures
+
+        results: list = []
+        threads = [
+            threading.Thread(target=lambda chunk=patients[i::5]: results.extend(submitter(chunk))) for i in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for future in results:
+            future.result(timeout=30)
+
+        self.assertEqual(len(results), 40 * 25)
+        for patient in patients:
+            self.assertEqual(applied[patient], list(range(25)), patient)
+        self.assertGreater(peak, 1, "different patients should run in parallel")
+
+    def test_failure_is_reported_and_does_not_block_the_lane(self) -> None:
+        def boom() -> None:
+            raise ValueError("bad event")
+
+        failed = self.executor.submit("P1", boom)
+        ok = self.executor.submit("P1", lambda: "next")
+        with self.assertRaises(ValueError):
+            failed.result(timeout=5)
+        self.assertEqual(ok.result(timeout=5), "next")
+
+    def test_shutdown_finishes_queued_work_then_rejects(self) -> None:
+        done: list[int] = []
+        for seq in range(5):
+            self.executor.submit("P1", lambda seq=seq: (time.sleep(0.01), done.append(seq)))
+        self.executor.shutdown()
+        self.assertEqual(done, [0, 1, 2, 3, 4])
+        self.assertEqual(self.executor.depths(), [0] * 8)
+        with self.assertRaises(RuntimeError):
+            self.executor.submit("P1", lambda: None)
+
+    def test_partition_is_stable_per_key(self) -> None:
+        self.assertEqual(self.executor.partition_for("P123"), self.executor.partition_for("P123"))
+        self.assertEqual({self.executor.partition_for(f"P{i}") for i in range(200)}, set(range(8)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import unittest
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+from common import phi  # noqa: E402
+
+NOTE = (BASE_DIR / "ai" / "samples" / "note1.txt").read_text(encoding="utf-8")
+
+
+class PhiScrubTests(unittest.TestCase):
+    def test_sample_note_masks_identifiers_and_keeps_clinical_text(self) -> None:
+        note = NOTE + (
+            "DOB: 03/14/1961. Call Ms. Connor at (555) 123-4567 or 1-800-555-1212.\n"
+            "Lives at 1200 Oak Tree Lane; email sarah.c@example.com; SSN 123-45-6789.\n"
+        )
+        scrubbed = phi.scrub(note)
+        for leaked in ("Sarah", "Connor", "555443", "1961", "123-4567", "1-800", "Oak Tree", "example.com", "6789"):
+            self.assertNotIn(leaked, scrubbed)
+        self.assertIn("Patient: [NAME] (P123)", scrubbed)
+        self.assertIn("MRN: [MRN]", scrubbed)
+        self.assertIn("DOB: [DOB]", scrubbed)
+        self.assertIn("Discharge Date: 2024-02-12", scrubbed)
+        self.assertIn("basic metabolic panel in 3 days", scrubbed)
+
+    def test_lowercase_labels_honorifics_bare_phones_and_spelled_out_dobs(self) -> None:
+        note = (
+            "name: Dr. Smith\n"
+            "mrn: 12345; Date of birth: 14 March 1961\n"
+            "Seen by Dr. Smith. Call 5551234567 or 15551234567.\n"
+            "She was born March 14, 1961. Discharge Date: February 12, 2024.\n"
+        )
+        self.assertEqual(phi.header_names(note), ("Smith",))
+        self.assertEqual(
+            phi.scrub(note),
+            "name: [NAME]\n"
+            "mrn: [MRN]; Date of birth: [DOB]\n"
+            "Seen by Dr. [NAME]. Call [PHONE] or [PHONE].\n"
+            "She was born [DOB]. Discharge Date: February 12, 2024.\n",
+        )
+
+    def test_clinical_phrases_after_numbers_are_not_addresses(self) -> None:
+        for phrase in (
+            "Follow up in 2 Weeks With Dr. Patel.",
+            "Take 1 Tablet Twice Daily Per Dr. Lee.",
+            "Recheck in 3 Days At St Luke Clinic.",
+        ):
+            self.assertEqual(phi.scrub(phrase, names=()), phrase)
+        self.assertEqual(
+            phi.scrub("Lives at 1200 Oak Tree Lane, 12 Main St. and 4 Elm Dr", names=()),
+            "Lives at [ADDRESS], [ADDRESS] and [ADDRESS]",
+        )
+        self.assertEqual(phi.scrub("Seen at 123456 Big Road", names=()), "Seen at 123456 Big Road")
+
+    def test_stream_matches_whole_note_across_chunk_boundaries(self) -> None:
+        note = NOTE + "Follow-up call to Sarah at 555-987-6543 confirmed.\n" * 200
+        expected = phi.scrub(note)
+        for size in (7, 1000, 4096):
+            chunks = (note[i : i + size] for i in range(0, len(note), size))
+            self.assertEqual("".join(phi.scrub_stream(chunks)), expected)
+
+    def test_scrub_value_walks_log_fields(self) -> None:
+        fields = {"eventId": "e1", "reason": "ValueError: MRN 555443", "extra": [1, "cb 555-123-4567"]}
+        self.assertEqual(
+            phi.scrub_value(fields),
+            {"eventId": "e1", "reason": "ValueError: MRN [MRN]", "extra": [1, "cb [PHONE]"]},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services" / "fhir-listener"))
+
+from profiling import EventProfiler, record_stage, stage  # noqa: E402
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+EVENT = {"id": "evt-1", "eventType": "DischargeCreated", "data": {"patientId": "P123", "documentId": "D789"}}
+
+
+class EventProfilerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = _Clock()
+        self.logged: list = []
+        self.profiler = EventProfiler(
+            slow_threshold=1.0,
+            log=lambda message, **fields: self.logged.append((message, fields)),
+            clock=self.clock,
+        )
+
+    def _handler(self, fetch: float, upserts: int):
+        @self.profiler.profiled
+        def handle(evt: dict) -> str:
+            with stage("fetch"):
+                self.clock.now += fetch
+            with stage("mcp_batch"):
+                self.clock.now += 0.1
+                for index in range(upserts):
+                    record_stage(f"upsert_task[{index}]", 0.02)
+            return evt["id"]
+
+        return handle
+
+    def test_slow_event_logs_stage_breakdown_without_payload(self) -> None:
+        self.assertEqual(self._handler(fetch=0.2, upserts=1)(EVENT), "evt-1")
+        self.assertEqual(self.logged, [])
+
+        self._handler(fetch=1.5, upserts=2)(EVENT)
+
+        [(message, fields)] = self.logged
+        self.assertEqual(message, "slow event")
+        self.assertEqual(fields["event_id"], "evt-1")
+        self.assertEqual(fields["total_ms"], 1600.0)
+        self.assertEqual(
+            fields["stages_ms"], {"fetch": 1500.0, "mcp_batch": 100.0, "upsert_task[0]": 20.0, "upsert_task[1]": 20.0}
+        )
+        self.assertNotIn("P123", repr(fields))
+
+    def test_stages_outside_a_tracked_event_are_ignored(self) -> None:
+        with stage("fetch"):
+            record_stage("upsert_task[0]", 1.0)
+        self.assertNotIn("stage=", self.profiler.render_metrics())
+
+    def test_metrics_aggregate_indexed_stages(self) -> None:
+        self._handler(fetch=0.2, upserts=3)(EVENT)
+        self._handler(fetch=1.5, upserts=1)(EVENT)
+
+        metrics = self.profiler.render_metrics()
+        self.assertIn('listener_event_stage_seconds_total{stage="fetch"} 1.700000', metrics)
+        self.assertIn('listener_event_stage_count_total{stage="upsert_task"} 4', metrics)
+        self.assertIn("listener_slow_events_total 1", metrics)
+
+    def test_profiling_keeps_cprofile_stats_for_slow_events(self) -> None:
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.profiler.profile_dir = Path(tmp.name)
+        self.profiler.set_profiling(True, slow_threshold=0.5)
+
+        self._handler(fetch=0.1, upserts=0)(EVENT)
+        self._handler(fetch=1.0, upserts=0)({"id": "../evt/2"})
+
+        [profile] = self.profiler.recent_profiles()
+        self.assertEqual(profile["eventId"], "../evt/2")
+        self.assertIn("function calls", profile["stats"])
+        self.assertEqual(Path(profile["file"]).parent, Path(tmp.name))
+        self.assertTrue(Path(profile["file"]).is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
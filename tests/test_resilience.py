@@ -0,0 +1,118 @@
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import util
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESILIENCE_MODULE = BASE_DIR / "services" / "fhir-listener" / "resilience.py"
+
+spec = util.spec_from_file_location("resilience", RESILIENCE_MODULE)
+assert spec and spec.loader
+module = util.module_from_spec(spec)
+spec.loader.exec_module(module)
+ResilienceRegistry = module.ResilienceRegistry
+CircuitOpenError = module.CircuitOpenError
+ConcurrencyLimitExceeded = module.ConcurrencyLimitExceeded
+
+
+class _FaultyHandler(BaseHTTPRequestHandler):
+    """Stand-in dependency whose latency and error rate the test controls."""
+
+    fail = False
+    latency = 0.0
+    hits = 0
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        type(self).hits += 1
+        time.sleep(self.latency)
+        self.send_response(503 if self.fail else 200)
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class ResilienceTests(unittest.TestCase):
+    def setUp(self) -> None:
+        _FaultyHandler.fail = False
+        _FaultyHandler.latency = 0.0
+        _FaultyHandler.hits = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _FaultyHandler)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def _call(self, registry) -> None:
+        with registry.guard("mcp:get_fhir_document", "fhir", limiter_name="fhir"):
+            urllib.request.urlopen(self.url, timeout=2).read()
+
+    def test_breaker_opens_and_recovers_through_half_open_probe(self) -> None:
+        registry = ResilienceRegistry(failure_threshold=3, reset_timeout=0.05)
+        _FaultyHandler.fail = True
+        for _ in range(3):
+            with self.assertRaises(urllib.error.HTTPError):
+                self._call(registry)
+        self.assertEqual(registry.breaker("fhir").state, "open")
+
+        with self.assertRaises(CircuitOpenError):
+            self._call(registry)
+        self.assertEqual(_FaultyHandler.hits, 3)
+
+        _FaultyHandler.fail = False
+        time.sleep(0.06)
+        self.assertEqual(registry.breaker("fhir").state, "half_open")
+        self._call(registry)
+        self.assertEqual(registry.breaker("fhir").state, "closed")
+        self.assertIn('listener_circuit_state{name="fhir"} 0', registry.render_metrics())
+
+    def test_limiter_backs_off_on_latency_and_sheds(self) -> None:
+        registry = ResilienceRegistry(initial_limit=8, latency_target=0.02)
+        _FaultyHandler.latency = 0.05
+        self._call(registry)
+        self._call(registry)
+        limiter = registry.limiter("fhir")
+        self.assertEqual(limiter.limit, 2)
+
+        limiter.acquire()
+        limiter.acquire()
+        with self.assertRaises(ConcurrencyLimitExceeded):
+            self._call(registry)
+        self.assertEqual(registry.breaker("fhir").state, "closed")
+
+        _FaultyHandler.latency = 0.0
+        limiter.cancel()
+        limiter.cancel()
+        for _ in range(10):
+            self._call(registry)
+        self.assertGreater(limiter.limit, 2)
+
+    def test_batch_member_outcomes_feed_their_own_breakers_and_limiters(self) -> None:
+        registry = ResilienceRegistry(failure_threshold=2, reset_timeout=0.05, initial_limit=8, latency_target=0.5)
+        for _ in range(2):
+            registry.admit("mcp:upsert_task", "sql")
+            registry.record("mcp:upsert_task", "sql", limiter_name="sql", latency=0.01, ok=False)
+        self.assertEqual(registry.breaker("sql").state, "open")
+        self.assertEqual(registry.limiter("sql").limit, 2)
+        with self.assertRaises(CircuitOpenError):
+            registry.admit("mcp:emit_eventgrid", "eventgrid", "mcp:upsert_task", "sql")
+
+        time.sleep(0.06)
+        registry.admit("mcp:upsert_task", "sql")
+        # A member skipped before reaching SQL hands its probe back untouched.
+        registry.record("mcp:upsert_task", "sql", limiter_name="sql", latency=0.0, ok=None)
+        self.assertEqual(registry.breaker("sql").state, "half_open")
+        registry.admit("mcp:upsert_task", "sql")
+        registry.record("mcp:upsert_task", "sql", limiter_name="sql", latency=0.01, ok=True)
+        self.assertEqual(registry.breaker("sql").state, "closed")
+        self.assertEqual(registry.breaker("eventgrid").state, "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
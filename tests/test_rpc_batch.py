@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+from importlib import util
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RPC_BATCH_MODULE = BASE_DIR / "services" / "mcp-server" / "rpc_batch.py"
+
+spec = util.spec_from_file_location("rpc_batch", RPC_BATCH_MODULE)
+assert spec and spec.loader
+module = util.module_from_spec(spec)
+spec.loader.exec_module(module)
+dispatch_batch = module.dispatch_batch
+
+
+def _member(request_id, method, params, depends_on=None):
+    member = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+    if depends_on is not None:
+        member["dependsOn"] = depends_on
+    return member
+
+
+class DispatchBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.emitted: list[str] = []
+        self.active = 0
+        self.peak = 0
+
+        async def upsert_task(taskJson: dict) -> dict:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            if taskJson.get("title") is None:
+                raise ValueError("taskJson.title is required")
+            return {"taskId": taskJson["taskId"]}
+
+        def emit_eventgrid(eventType: str, subject: str, data: dict) -> dict:
+            self.emitted.append(subject)
+            return {"published": False}
+
+        self.tools = {"tools/upsert_task": upsert_task, "tools/emit_eventgrid": emit_eventgrid}
+
+    def test_members_run_concurrently_and_dependents_follow_their_dependency(self) -> None:
+        requests = [
+            _member("u1", "tools/upsert_task", {"taskJson": {"taskId": "T1", "title": "BMP"}}),
+            _member("e1", "tools/emit_eventgrid", {"eventType": "TaskCreated", "subject": "t/T1", "data": {}}, "u1"),
+            _member("u2", "tools/upsert_task", {"taskJson": {"taskId": "T2", "title": None}}),
+            _member("e2", "tools/emit_eventgrid", {"eventType": "TaskCreated", "subject": "t/T2", "data": {}}, "u2"),
+        ]
+
+        timings: dict = {}
+        responses = asyncio.run(dispatch_batch(requests, self.tools, timings=timings))
+        by_id = {response["id"]: response for response in responses}
+
+        self.assertEqual(self.peak, 2)
+        self.assertEqual(by_id["u1"]["result"], {"taskId": "T1"})
+        self.assertEqual(by_id["e1"]["result"], {"published": False})
+        self.assertEqual(by_id["u2"]["error"]["code"], -32602)
+        self.assertEqual(by_id["e2"]["error"]["code"], -32001)
+        self.assertEqual(self.emitted, ["t/T1"])
+        # Skipped dependents never ran, so they have no timing.
+        self.assertEqual(set(timings), {"u1", "e1", "u2"})
+
+    def test_invalid_members_unknown_methods_and_notifications(self) -> None:
+        requests = [
+            "not-an-object",
+            _member("x", "tools/nope", {}),
+            _member("fwd", "tools/emit_eventgrid", {"eventType": "E", "subject": "s", "data": {}}, "later"),
+            {"jsonrpc": "2.0", "method": "tools/emit_eventgrid", "params": {"eventType": "E", "subject": "n", "data": {}}},
+            _member("later", "tools/emit_eventgrid", {"eventType": "E", "subject": "s", "data": {}}),
+        ]
+
+        responses = asyncio.run(dispatch_batch(requests, self.tools))
+        codes = {response["id"]: response.get("error", {}).get("code") for response in responses}
+
+        self.assertEqual(codes, {None: -32600, "x": -32601, "fwd": -32600, "later": None})
+        self.assertIn("n", self.emitted)
+
+    def test_downstream_failures_are_told_apart_from_rejected_payloads(self) -> None:
+        def upsert_task(taskJson: dict) -> dict:
+            if taskJson.get("title") is None:
+                raise ValueError("TaskCreated payload failed schema validation")
+            raise ConnectionError("sql unavailable")
+
+        requests = [
+            _member("bad", "tools/upsert_task", {"taskJson": {"taskId": "T1", "title": None}}),
+            _member("down", "tools/upsert_task", {"taskJson": {"taskId": "T2", "title": "BMP"}}),
+            _member("typo", "tools/upsert_task", {"task": {}}),
+        ]
+
+        responses = asyncio.run(dispatch_batch(requests, {"tools/upsert_task": upsert_task}))
+        codes = {response["id"]: response["error"]["code"] for response in responses}
+
+        self.assertEqual(codes, {"bad": -32602, "down": -32000, "typo": -32602})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+from common.schemas import SchemaError, compile_schema, load_event_schemas  # noqa: E402
+
+SAMPLE = json.loads((BASE_DIR / "events" / "samples" / "dischargeCreated.json").read_text(encoding="utf-8"))
+
+
+class EventSchemaTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.schemas = load_event_schemas(BASE_DIR / "events" / "schemas")
+
+    def test_repo_schemas_compile_and_accept_sample(self) -> None:
+        self.assertEqual(set(self.schemas), {"DischargeCreated", "TaskCreated"})
+        self.assertEqual(self.schemas["DischargeCreated"].errors(SAMPLE["data"]), [])
+
+    def test_discharge_errors_name_paths_not_values(self) -> None:
+        errors = self.schemas["DischargeCreated"].errors({"patientId": 12345, "encounterId": "E456"}, "data")
+        self.assertEqual(errors, ["data.documentId: is required", "data.patientId: expected string"])
+        self.assertFalse(any("12345" in error for error in errors))
+        self.assertEqual(self.schemas["DischargeCreated"].errors(None, "data"), ["data: expected object"])
+
+    def test_task_created_category_enum(self) -> None:
+        task = {"patientId": "P1", "taskId": "T1", "category": "lab", "title": "BMP"}
+        self.assertTrue(self.schemas["TaskCreated"].is_valid(task))
+        self.assertEqual(
+            self.schemas["TaskCreated"].errors(dict(task, category="imaging")),
+            ['$.category: must be one of ["lab", "med", "visit", "other"]'],
+        )
+
+
+class CompilerTests(unittest.TestCase):
+    def test_supported_keywords(self) -> None:
+        schema = compile_schema(
+            {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string", "minLength": 2, "pattern": "^T"},
+                    "n": {"type": "integer", "minimum": 0, "maximum": 3},
+                    "tags": {"type": "array", "items": {"enum": ["a", "b"]}, "maxItems": 2},
+                    "flag": {"const": True},
+                },
+                "additionalProperties": False,
+            }
+        )
+        self.assertEqual(schema.errors({"id": "T1", "n": 2, "tags": ["a"], "flag": True}), [])
+        self.assertEqual(
+            sorted(schema.errors({"id": "x", "n": True, "tags": ["a", "c", "b"], "flag": 1, "extra": 0})),
+            [
+                "$.extra: unexpected property",
+                "$.flag: must equal true",
+                "$.id: does not match ^T",
+                "$.id: shorter than 2",
+                "$.n: expected integer",
+                "$.tags: more than 2 items",
+                "$.tags[1]: must be one of [\"a\", \"b\"]",
+            ],
+        )
+
+    def test_enum_keeps_json_bool_and_number_apart(self) -> None:
+        self.assertFalse(compile_schema({"enum": [1]}).is_valid(True))
+        self.assertTrue(compile_schema({"enum": [1]}).is_valid(1.0))
+
+    def test_other_draft7_keywords_report_without_values(self) -> None:
+        schema = compile_schema({"type": "object", "properties": {"v": {"oneOf": [{"type": "string"}]}}})
+        self.assertEqual(schema.errors({"v": 12345}), ["$.v: fails oneOf"])
+
+    def test_invalid_schema_fails_at_compile_time(self) -> None:
+        with self.assertRaises(SchemaError):
+            compile_schema({"type": "nope"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import unittest
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+from common import serialization  # noqa: E402
+
+
+class SerializationTests(unittest.TestCase):
+    def test_every_available_backend_round_trips(self) -> None:
+        payload = {"taskId": "T1", "title": "Café follow-up", "dueDate": None, "tags": [1, 2.5]}
+        for name in ("json", "auto"):
+            codec = serialization.select_codec(name)
+            encoded = codec.dumps(payload)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(codec.loads(encoded), payload)
+            self.assertEqual(codec.loads(codec.dumps_str(payload)), payload)
+
+    def test_default_hook_and_unknown_backend(self) -> None:
+        from datetime import date
+
+        codec = serialization.select_codec("json")
+        self.assertEqual(codec.dumps({"d": date(2024, 2, 15)}, default=str), b'{"d":"2024-02-15"}')
+        with self.assertRaises(ValueError):
+            serialization.select_codec("yaml")
+
+    def test_decode_events_accepts_object_or_array(self) -> None:
+        single = serialization.decode_events(b'{"id": "e1", "eventType": "DischargeCreated", "data": {}}')
+        self.assertEqual(single[0]["id"], "e1")
+
+        batch = serialization.decode_events(b'[{"id": "e1", "data": {"patientId": "P123"}}, {"id": "e2"}]')
+        self.assertEqual([event["id"] for event in batch], ["e1", "e2"])
+        self.assertEqual(batch[0]["data"]["patientId"], "P123")
+
+        with self.assertRaises(serialization.PayloadError):
+            serialization.decode_events(b"{not json")
+
+    def test_decode_events_keeps_unknown_envelope_fields(self) -> None:
+        [event] = serialization.decode_events(
+            b'{"id": "e1", "topic": "/subscriptions/s/topics/t", "metadataVersion": "1", "data": {}}'
+        )
+        self.assertEqual(event["topic"], "/subscriptions/s/topics/t")
+        self.assertEqual(event["metadataVersion"], "1")
+
+    @unittest.skipIf(serialization.orjson is None, "orjson is not installed")
+    def test_backends_write_datetimes_alike_in_raw_json(self) -> None:
+        from datetime import date, datetime, timezone
+
+        task_json = {
+            "taskId": "T1",
+            "dueDate": date(2024, 2, 15),
+            "dischargedAt": datetime(2024, 2, 1, 8, 30, tzinfo=timezone.utc),
+        }
+        stdlib = serialization.select_codec("json").dumps_str(task_json, default=str)
+        fast = serialization.select_codec("orjson").dumps_str(task_json, default=str)
+
+        self.assertEqual(fast, stdlib)
+        self.assertIn('"dischargedAt":"2024-02-01 08:30:00+00:00"', fast)
+
+
+if __name__ == "__main__":
+    unittest.main()
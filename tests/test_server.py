@@ -0,0 +1,68 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest import mock
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+from common.server import ServerOptions  # noqa: E402
+
+_SIGTERM_CHILD = textwrap.dedent(
+    """
+    import atexit, sys, time
+    from common.server import exit_on_sigterm, register_drain, register_shutdown
+
+    out = open(sys.argv[1], "a")
+    register_shutdown(lambda: out.write("hook\\n"))
+    register_drain(lambda: out.write("drain\\n"))
+    atexit.register(lambda: (out.write("atexit\\n"), out.close()))
+    exit_on_sigterm()
+    print("ready", flush=True)
+    time.sleep(30)
+    """
+)
+
+
+class ServerOptionsTests(unittest.TestCase):
+    def test_defaults_and_environment_overrides(self) -> None:
+        with mock.patch.dict(os.environ, {}, clear=True):
+            options = ServerOptions.from_env(7100, default_workers=4)
+        self.assertEqual((options.port, options.workers, options.threads, options.graceful_timeout), (7100, 4, 8, 30))
+
+        env = {"PORT": "8000", "WEB_CONCURRENCY": "2", "WEB_THREADS": "16", "GRACEFUL_TIMEOUT_SECONDS": "5"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            options = ServerOptions.from_env(7100, default_workers=4)
+        self.assertEqual((options.port, options.workers, options.threads, options.graceful_timeout), (8000, 2, 16, 5))
+
+    def test_rejects_zero_workers(self) -> None:
+        with mock.patch.dict(os.environ, {"WEB_CONCURRENCY": "0"}, clear=True):
+            with self.assertRaises(ValueError):
+                ServerOptions.from_env(7100)
+
+
+@unittest.skipUnless(hasattr(signal, "SIGTERM") and os.name == "posix", "POSIX signals required")
+class SigtermDrainTests(unittest.TestCase):
+    def test_sigterm_runs_drain_then_shutdown_hooks_and_atexit(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            marker = Path(tmp) / "drained.txt"
+            child = subprocess.Popen(
+                [sys.executable, "-c", _SIGTERM_CHILD, str(marker)],
+                env={**os.environ, "PYTHONPATH": str(BASE_DIR / "services")},
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            self.assertEqual(child.stdout.readline().strip(), "ready")
+            child.send_signal(signal.SIGTERM)
+            self.assertEqual(child.wait(timeout=10), 0)
+            child.stdout.close()
+            self.assertEqual(marker.read_text().split(), ["drain", "hook", "atexit"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import unittest
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "services"))
+
+from common.task_model import TASK_COLUMNS, Task, row_to_json  # noqa: E402
+
+
+class TaskModelTests(unittest.TestCase):
+    def test_from_json_accepts_both_key_styles(self) -> None:
+        camel = Task.from_json(
+            {"patientId": "P123", "title": "BMP", "category": "LAB", "dueDate": "2024-02-15", "taskId": "T1"},
+            now="2024-02-12T00:00:00+00:00",
+        )
+        snake = Task.from_json(
+            {"patient_id": "P123", "title": "BMP", "category": "lab", "due_date": "2024-02-15", "task_id": "T1"},
+            now="2024-02-12T00:00:00+00:00",
+        )
+        self.assertEqual(camel, snake)
+        self.assertEqual(camel.priority, "normal")
+        self.assertEqual(
+            camel.upsert_params(),
+            ("T1", "P123", "lab", "BMP", "2024-02-15", "normal", None, "2024-02-12T00:00:00+00:00"),
+        )
+
+    def test_missing_required_fields(self) -> None:
+        with self.assertRaises(ValueError):
+            Task.from_json({"title": "BMP"})
+        with self.assertRaises(ValueError):
+            Task.from_json({"patientId": "P123"})
+
+    def test_due_date_is_normalised_to_an_iso_date(self) -> None:
+        from datetime import date
+
+        def due(value):
+            return Task.from_json({"patientId": "P123", "title": "BMP", "dueDate": value}).due_date
+
+        self.assertEqual(due("2024-02-15"), "2024-02-15")
+        self.assertEqual(due("2024-02-15T09:30:00+00:00"), "2024-02-15")
+        self.assertEqual(due(date(2024, 2, 15)), "2024-02-15")
+        self.assertIsNone(due(""))
+        for bad in ("in 3 days", "02/15/2024", "2024-02-30", 20240215):
+            with self.assertRaises(ValueError):
+                due(bad)
+
+    def test_row_round_trip(self) -> None:
+        task = Task.from_json({"patientId": "P123", "title": "BMP"})
+        row = tuple(getattr(task, column) for column in TASK_COLUMNS)
+        self.assertEqual(Task.from_row(row), task)
+        self.assertEqual(row_to_json(row), task.to_json())
+        self.assertFalse(hasattr(task, "__dict__"))
+
+
+if __name__ == "__main__":
+    unittest.main()
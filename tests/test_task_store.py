@@ -1,10 +1,14 @@
+import json
 import sqlite3
+import sys
 import unittest
+from datetime import datetime, timezone
 from importlib import util
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-TASK_STORE_MODULE = BASE_DIR / "services" / "mcp-server" / "task_store.py"
+TASK_STORE_MODULE = BASE_DIR / "services" / "common" / "task_store.py"
+sys.path.insert(0, str(BASE_DIR / "services"))
 
 spec = util.spec_from_file_location("task_store", TASK_STORE_MODULE)
 assert spec and spec.loader
@@ -53,6 +57,199 @@ class TaskStoreTests(unittest.TestCase):
         self.addCleanup(tmp.cleanup)
         return tmp.name
 
+    def test_async_audit_is_ordered_and_queryable(self) -> None:
+        db_path = Path(self._get_tempdir()) / "tasks.db"
+        store = TaskStore(db_path, audit_async=True)
+        self.addCleanup(store._audit_writer.close)
+
+        for title in ("first", "second", "third"):
+            store.upsert({"taskId": "T1", "patientId": "P123", "title": title})
+        self.assertTrue(store.flush_audit(timeout=5))
+
+        entries = store.query_audit("T1")
+        self.assertEqual([json.loads(e["payloadJson"])["title"] for e in entries], ["third", "second", "first"])
+        self.assertEqual(store.query_audit("T1", limit=1)[0]["action"], "upsert")
+
+    def test_rollover_moves_old_audit_rows_to_monthly_tables(self) -> None:
+        db_path = Path(self._get_tempdir()) / "tasks.db"
+        store = TaskStore(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany(
+                "insert into task_audit(task_id, action, actor, timestamp_utc, payload_json) values (?, 'upsert', 'test', ?, '{}')",
+                [
+                    ("T1", "2024-01-15T08:00:00+00:00"),
+                    ("T1", "2024-02-20T08:00:00+00:00"),
+                    ("T1", "2024-06-01T08:00:00+00:00"),
+                ],
+            )
+
+        moved = store.rollover_audit(now=datetime(2024, 6, 10, tzinfo=timezone.utc), retain_months=3)
+
+        self.assertEqual(moved, 2)
+        with sqlite3.connect(db_path) as conn:
+            live = conn.execute("select count(*) from task_audit").fetchone()[0]
+            january = conn.execute("select count(*) from task_audit_202401").fetchone()[0]
+        self.assertEqual((live, january), (1, 1))
+        self.assertEqual(len(store.query_audit("T1")), 3)
+        recent = store.query_audit("T1", since="2024-02-01", until="2024-07-01")
+        self.assertEqual([e["timestampUtc"][:7] for e in recent], ["2024-06", "2024-02"])
+
+    def test_summary_tracks_upserts_and_check_repairs_drift(self) -> None:
+        db_path = Path(self._get_tempdir()) / "tasks.db"
+        store = TaskStore(db_path)
+        store.upsert({"taskId": "T1", "patientId": "P123", "title": "BMP", "category": "lab", "dueDate": "2024-02-15"})
+        store.upsert({"taskId": "T2", "patientId": "P123", "title": "Visit", "category": "visit", "dueDate": "2024-03-01"})
+        store.upsert({"taskId": "T3", "patientId": "P999", "title": "Call", "category": "med"})
+        # Moving T1 to a later due date must decrement the old bucket, not double count.
+        store.upsert({"taskId": "T1", "patientId": "P123", "title": "BMP", "category": "lab", "dueDate": "2024-02-20"})
+
+        summary = store.summarize_patients(["P123", "P999"], as_of="2024-02-25")
+        self.assertEqual(summary["P123"]["open"], 2)
+        self.assertEqual(summary["P123"]["overdue"], 1)
+        self.assertEqual(summary["P123"]["byCategory"]["visit"], {"open": 1, "overdue": 0})
+        self.assertEqual(summary["P999"], {"open": 1, "overdue": 0, "byCategory": {"med": {"open": 1, "overdue": 0}}})
+        self.assertEqual(store.check_task_summary(), [])
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("update patient_task_summary set task_count = 5 where patient_id = 'P999'")
+        diffs = store.check_task_summary(repair=True)
+        self.assertEqual([(d["patientId"], d["expected"], d["actual"]) for d in diffs], [("P999", 1, 5)])
+        self.assertEqual(store.check_task_summary(), [])
+
+    def test_summary_is_backfilled_for_databases_that_predate_it(self) -> None:
+        db_path = Path(self._get_tempdir()) / "tasks.db"
+        store = TaskStore(db_path)
+        store.upsert({"taskId": "T1", "patientId": "P123", "title": "BMP", "category": "lab", "dueDate": "2024-02-15"})
+        store.upsert({"taskId": "T2", "patientId": "P123", "title": "Call", "category": "med"})
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("drop table patient_task_summary")
+            conn.execute("pragma user_version = 0")
+
+        reopened = TaskStore(db_path)
+        self.assertEqual(reopened.check_task_summary(), [])
+        self.assertEqual(reopened.summarize_patients(["P123"], as_of="2024-03-01")["P123"]["overdue"], 1)
+
+    def test_status_updates_compare_and_swap_on_version(self) -> None:
+        db_path = Path(self._get_tempdir()) / "tasks.db"
+        store = TaskStore(db_path)
+        store.upsert({"taskId": "T1", "patientId": "P123", "title": "BMP", "category": "lab"})
+        store.upsert({"taskId": "T1", "patientId": "P123", "title": "BMP (corrected)", "category": "lab"})
+        store.upsert({"taskId": "T2", "patientId": "P123", "title": "Visit", "category": "visit"})
+
+        with self.assertRaises(module.TaskVersionConflict) as stale:
+            store.update_status("T1", "done", expected_version=1)
+        self.assertEqual(stale.exception.current_version, 2)
+        self.assertEqual(store.update_status("T1", "done", expected_version=2), {"taskId": "T1", "status": "done", "version": 3})
+
+        result = store.bulk_update_status(
+            [
+                {"taskId": "T1", "status": "cancelled", "version": 2},
+                {"taskId": "T2", "status": "done", "version": 1},
+                {"taskId": "T404", "status": "done", "version": 1},
+            ]
+        )
+        self.assertEqual(result["updated"], [{"taskId": "T2", "status": "done", "version": 2}])
+        self.assertEqual(
+            result["conflicts"],
+            [{"taskId": "T1", "currentVersion": 3}, {"taskId": "T404", "currentVersion": None}],
+        )
+        with self.assertRaises(ValueError):
+            store.bulk_update_status([{"taskId": "T2", "status": "archived", "version": 2}])
+
+        self.assertEqual(store.summarize_patients(["P123"], as_of="2024-01-01")["P123"]["open"], 0)
+        self.assertEqual(store.check_task_summary(), [])
+        audit = store.query_audit("T1")
+        self.assertEqual(audit[0]["action"], "status")
+        self.assertEqual(json.loads(audit[0]["payloadJson"]), {"previousStatus": "open", "status": "done", "version": 3})
+        with sqlite3.connect(db_path) as conn:
+            actions = [row[0] for row in conn.execute("select action from task_changes order by seq")]
+        self.assertEqual(actions, ["upsert", "upsert", "upsert", "status", "status"])
+
+    def test_bulk_upsert_matches_repeated_upserts(self) -> None:
+        db_path = Path(self._get_tempdir()) / "tasks.db"
+        store = TaskStore(db_path)
+        store.upsert({"taskId": "T1", "patientId": "P123", "title": "BMP", "category": "lab"})
+
+        result = store.bulk_upsert(
+            [
+                {"taskId": "T1", "patientId": "P123", "title": "BMP (corrected)", "category": "lab"},
+                {"taskId": "T2", "patientId": "P123", "title": "Visit", "category": "visit"},
+                {"taskId": "T2", "patientId": "P123", "title": "Visit", "category": "visit", "dueDate": "2024-03-01"},
+            ],
+            actor="backfill",
+        )
+
+        self.assertEqual(result, {"upserted": 3})
+        summary = store.summarize_patients(["P123"], as_of="2024-04-01")["P123"]
+        self.assertEqual((summary["open"], summary["overdue"]), (2, 1))
+        self.assertEqual(summary["byCategory"]["visit"], {"open": 1, "overdue": 1})
+        self.assertEqual(store.check_task_summary(), [])
+        self.assertEqual(store.query_audit("T1")[0]["actor"], "backfill")
+        self.assertEqual(store.update_status("T2", "done", expected_version=2)["version"], 3)
+
+    def test_upsert_queues_outbox_event_in_same_transaction(self) -> None:
+        db_path = Path(self._get_tempdir()) / "tasks.db"
+        store = TaskStore(db_path)
+        event = {"eventType": "TaskCreated", "subject": "patients/P123/tasks/T1", "data": {"taskId": "T1"}}
+        store.upsert({"taskId": "T1", "patientId": "P123", "title": "BMP"}, event=event)
+        store.upsert({"taskId": "T2", "patientId": "P123", "title": "Visit"})
+        with self.assertRaises(ValueError):
+            store.upsert({"taskId": "T3", "patientId": "P123", "title": "Call"}, event={"eventType": "TaskCreated"})
+
+        [pending] = store.pending_outbox()
+        self.assertEqual((pending["eventType"], pending["subject"], pending["data"]), tuple(event.values()))
+        with sqlite3.connect(db_path) as conn:
+            self.assertIsNone(conn.execute("select 1 from care_tasks where task_id = 'T3'").fetchone())
+
+        store.mark_outbox_sent([pending["outboxId"]])
+        self.assertEqual(store.pending_outbox(), [])
+        self.assertEqual(store.purge_outbox(sent_before=datetime(2000, 1, 1, tzinfo=timezone.utc)), 0)
+        self.assertEqual(store.purge_outbox(sent_before=datetime.now(timezone.utc)), 1)
+
+    def test_replayed_upsert_does_not_queue_a_second_event(self) -> None:
+        store = TaskStore(Path(self._get_tempdir()) / "tasks.db")
+        task = {"taskId": "T1", "patientId": "P123", "title": "BMP"}
+        event = {"eventType": "TaskCreated", "subject": "patients/P123/tasks/T1", "data": {"taskId": "T1"}}
+        store.upsert(task, event=event)
+        [first] = store.pending_outbox()
+        store.mark_outbox_sent([first["outboxId"]])
+
+        store.upsert(task, event=event)
+        self.assertEqual(store.pending_outbox(), [])
+
+        other = TaskStore(Path(self._get_tempdir()) / "tasks.db")
+        other.upsert(task, event=event)
+        self.assertEqual(other.pending_outbox()[0]["id"], first["id"])
+
+    def test_existing_database_gains_version_column(self) -> None:
+        db_path = Path(self._get_tempdir()) / "tasks.db"
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                """
+                create table care_tasks (
+                  task_id text primary key, patient_id text not null, category text not null,
+                  title text not null, due_date text, priority text not null, source_encounter_id text,
+                  status text not null, created_utc text not null, updated_utc text not null
+                )
+                """
+            )
+            conn.execute(
+                "insert into care_tasks values ('T1', 'P123', 'lab', 'BMP', null, 'normal', null, 'open', 'x', 'x')"
+            )
+        store = TaskStore(db_path)
+        self.assertEqual(store.update_status("T1", "done", expected_version=1)["version"], 2)
+
+    def test_schema_marker_skips_ddl_on_reopen(self) -> None:
+        db_path = Path(self._get_tempdir()) / "tasks.db"
+        TaskStore(db_path)
+        with sqlite3.connect(db_path) as conn:
+            self.assertEqual(conn.execute("pragma user_version").fetchone()[0], module.SQLITE_SCHEMA_VERSION)
+            conn.execute("drop index ix_task_changes_patient_seq")
+        TaskStore(db_path)  # marker matches, so the dropped index is not recreated
+        with sqlite3.connect(db_path) as conn:
+            indexes = {row[1] for row in conn.execute("pragma index_list(task_changes)")}
+        self.assertNotIn("ix_task_changes_patient_seq", indexes)
+
     def test_create_task_store_requires_sql_coordinates(self) -> None:
         with self.assertRaises(ValueError):
             create_task_store(